@@ -0,0 +1,165 @@
+import contextlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import DatabaseError, connection
+from django.db.models import Q
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, query, profile=False):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.profile = profile  # run under the manager's profiler
+        self.profile_id = None
+        self.status = "queued"  # queued -> running -> done / failed
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.timings = None  # pipeline stages, when the manager has a tracer
+
+    def as_dict(self):
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.timings is not None:
+            data["timings"] = self.timings
+        if self.profile_id:
+            data["profile_id"] = self.profile_id
+        if self.status == "done":
+            data["result"] = self.result
+        if self.status == "failed":
+            data["error"] = self.error
+        return data
+
+
+# Runs schedule generation off the request thread.
+#
+# `runner(query, work_dir)` does the actual work; every job gets its own
+# work_dir so concurrent jobs never share output files (removed afterwards
+# unless keep_work_dirs is set). Finished jobs are kept for `ttl` seconds so
+# the client can come back for the result. Every state change is also
+# written to scheduler.ScheduleJob, so with several web workers status() works
+# from whichever one the poll lands on. A row still queued or running after
+# `ttl + max_runtime` seconds belongs to a process that died (a deploy, a
+# max-requests restart, the OOM killer): it is reported failed, then pruned
+# like a finished one. With `tracer` (tracing.trace) each
+# job's stage timings are kept on it too, and `profiler(job)` (a context
+# manager, or None to skip) can profile the jobs that ask for it.
+class JobManager:
+    def __init__(self, runner, work_root, max_workers=2, max_queued=100, ttl=600, max_runtime=120,
+                 keep_work_dirs=False, tracer=None, profiler=None):
+        self.runner = runner
+        self.tracer = tracer
+        self.profiler = profiler
+        self.work_root = work_root
+        self.keep_work_dirs = keep_work_dirs
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.max_runtime = max_runtime
+
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="schedule-job")
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at and job.finished_at < cutoff:
+                del self._jobs[job_id]
+        return cutoff
+
+    def _abandoned_before(self):
+        # created before this and still unfinished: its process is gone
+        return time.time() - self.ttl - self.max_runtime
+
+    def _persist(self, job, prune_before=None):
+        # a failed write only costs the other workers their view of the job,
+        # this process still answers from memory
+        from scheduler.models import ScheduleJob
+        try:
+            if prune_before is not None:
+                ScheduleJob.objects.filter(
+                    Q(finished_at__lt=prune_before)
+                    | Q(finished_at__isnull=True, created_at__lt=self._abandoned_before() - self.ttl)
+                ).delete()
+            ScheduleJob.objects.update_or_create(
+                id=job.id, defaults={"status": job.status, "state": job.as_dict(),
+                                     "created_at": job.created_at, "finished_at": job.finished_at},
+            )
+        except DatabaseError:
+            pass
+
+    def pending(self):
+        # this process's queue; the limit is about its own threads
+        return sum(1 for job in self._jobs.values() if job.status in ("queued", "running"))
+
+    def submit(self, query, profile=False):
+        job = Job(query, profile)
+        with self._lock:
+            cutoff = self._prune()
+            if self.pending() >= self.max_queued:
+                raise QueueFull("Too many schedules are being generated, try again shortly.")
+            self._jobs[job.id] = job
+        self._persist(job, prune_before=cutoff)
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        """A job submitted by this process (None for other processes' jobs)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        """Job.as_dict() for a job submitted by any process, or None."""
+        job = self.get(job_id)
+        if job is not None:
+            return job.as_dict()
+        from scheduler.models import ScheduleJob
+        row = ScheduleJob.objects.filter(id=job_id).first()
+        if row is None:
+            return None
+        state = row.state
+        if row.finished_at is None and row.created_at < self._abandoned_before():
+            state.update(status="failed", error="The server running this job stopped, please submit it again.")
+        return state
+
+    def _run(self, job):
+        work_dir = os.path.join(self.work_root, job.id)
+        job.status = "running"
+        job.started_at = time.time()
+        self._persist(job)
+        trace = self.tracer() if self.tracer else contextlib.nullcontext()
+        profile = self.profiler(job) if self.profiler else None
+        try:
+            with profile or contextlib.nullcontext(), trace as spans:
+                job.result = self.runner(job.query, work_dir)
+            if spans is not None:
+                job.timings = spans.as_list()
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            if profile is not None:
+                job.profile_id = profile.profile_id
+            job.finished_at = time.time()
+            self._persist(job)
+            if not self.keep_work_dirs:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            # worker threads open their own DB connection, don't leak it
+            connection.close()
@@ -0,0 +1,141 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils.functional import SimpleLazyObject
+
+# Request timing, built on scheduler-test/tracing.py so endpoint and pipeline
+# stage numbers come out in the same shape.
+#
+# ServerTimingMiddleware adds a Server-Timing header to every response and
+# feeds the per-endpoint histograms that /api/metrics/ exports. Everyone gets
+# "total"; the database time and query count and the pipeline stages that ran
+# in the request thread only go to staff, or to everyone with DEBUG on. For
+# streaming responses "total" stops when the response starts; the stream's
+# own stage timings go out in its final event.
+#
+# /api/metrics/ itself answers staff and METRICS_ALLOWED_IPS only.
+
+_endpoints = None
+
+
+def get_tracing():
+    from backend.views import import_scheduler
+    return import_scheduler("tracing")
+
+
+def endpoints():
+    """Latency histograms per "METHOD route", counters per status class."""
+    global _endpoints
+    if _endpoints is None:
+        _endpoints = get_tracing().Registry()
+    return _endpoints
+
+
+def is_staff(request):
+    # remembered on the request, so the middlewares and the view look once
+    if not hasattr(request, '_is_staff'):
+        request._is_staff = _lookup_staff(request)
+    return request._is_staff
+
+
+def _lookup_staff(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    # a DRF view replaces Django's lazy user with the one it authenticated,
+    # so an anonymous user here means the view already rejected the header
+    if user is not None and not isinstance(user, SimpleLazyObject):
+        return False
+    # otherwise the API's JWT hasn't been looked at yet (we run before the view)
+    if not request.META.get('HTTP_AUTHORIZATION', '').startswith('Bearer '):
+        return False
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import TokenError
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, TokenError):  # malformed, expired, inactive or deleted user
+        return False
+    return bool(authenticated and authenticated[0].is_staff)
+
+
+def can_see_metrics(request):
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS or is_staff(request)
+
+
+def endpoint_name(request):
+    # the URL pattern, not the path, so /cs/courses/1/ and /2/ share one entry
+    match = getattr(request, 'resolver_match', None)
+    return f"{request.method} /{match.route}" if match and match.route else f"{request.method} unmatched"
+
+
+class QueryTimer:
+    # connection.execute_wrapper hook: time spent in the database
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.tracing = get_tracing()
+
+    def __call__(self, request):
+        database = QueryTimer()
+        start = time.perf_counter()
+        with self.tracing.trace() as trace, connection.execute_wrapper(database):
+            response = self.get_response(request)
+        seconds = time.perf_counter() - start
+
+        name = endpoint_name(request)
+        registry = endpoints()
+        registry.observe(name, seconds)
+        registry.incr(f"{name} {response.status_code // 100}xx")
+
+        timings = [f'total;dur={seconds * 1000:.1f}']
+        if settings.DEBUG or is_staff(request):
+            timings.append(f'db;dur={database.seconds * 1000:.1f};desc="{database.count} queries"')
+            timings += trace.server_timing()
+        response['Server-Timing'] = ', '.join(timings)
+        return response
+
+
+def _labels(**labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels.items())
+
+
+def _histogram_lines(metric, label, snapshot):
+    lines = []
+    for name, histogram in snapshot['histograms'].items():
+        for bound, count in histogram['buckets_ms'].items():
+            le = bound if bound == '+Inf' else repr(float(bound) / 1000)
+            lines.append(f'{metric}_bucket{{{_labels(**{label: name}, le=le)}}} {count}')
+        lines.append(f'{metric}_sum{{{_labels(**{label: name})}}} {histogram["sum_ms"] / 1000}')
+        lines.append(f'{metric}_count{{{_labels(**{label: name})}}} {histogram["count"]}')
+    return lines
+
+
+def prometheus_text(endpoint_snapshot, stage_snapshot):
+    """Both registries in the Prometheus text exposition format."""
+    lines = ['# TYPE schedulesooner_request_seconds histogram']
+    lines += _histogram_lines('schedulesooner_request_seconds', 'endpoint', endpoint_snapshot)
+    lines.append('# TYPE schedulesooner_responses_total counter')
+    for key, count in endpoint_snapshot['counters'].items():
+        name, status = key.rsplit(' ', 1)
+        lines.append(f'schedulesooner_responses_total{{{_labels(endpoint=name, status=status)}}} {count}')
+    lines.append('# TYPE schedulesooner_stage_seconds histogram')
+    lines += _histogram_lines('schedulesooner_stage_seconds', 'stage', stage_snapshot)
+    return '\n'.join(lines) + '\n'
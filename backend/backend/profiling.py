@@ -0,0 +1,248 @@
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from backend.metrics import is_staff
+
+# Opt-in cProfile runs of single requests.
+#
+# ProfilingMiddleware profiles a random PROFILING_SAMPLE_RATE of requests,
+# plus any request from a staff user carrying "X-Profile: 1". Each profile is
+# written to PROFILING_DIR as <id>.prof (pstats) next to <id>.json (endpoint,
+# path, query, status, duration, ...); only the newest PROFILING_MAX_FILES
+# are kept. The response says which one it was in X-Profile-Id.
+#
+# Before Python 3.12 cProfile only sees the thread it runs in, so a profiled
+# /api/user-input/ also profiles its schedule job (see JobManager's profiler),
+# and a streaming response is profiled while its body is produced. From 3.12
+# on cProfile is process-wide (sys.monitoring) and a second enable() raises
+# ValueError, so only one profile runs at a time there; a request or job that
+# can't get one simply runs unprofiled, as does one that finds another
+# profiling tool active.
+#
+# `manage.py profiles` lists and summarizes what was captured.
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+logger = logging.getLogger(__name__)
+
+# one profile per process at a time where cProfile is process-wide
+EXCLUSIVE = sys.version_info >= (3, 12)
+_slot = threading.Lock()
+
+
+def _claim():
+    return not EXCLUSIVE or _slot.acquire(blocking=False)
+
+
+def _release():
+    if EXCLUSIVE:
+        _slot.release()
+
+
+def _enable(profiler):
+    try:
+        profiler.enable()
+    except ValueError:  # "Another profiling tool is already active"
+        return False
+    return True
+
+
+def profile_dir():
+    return settings.PROFILING_DIR
+
+
+def _slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '-', text).strip('-')[:60] or 'root'
+
+
+def new_profile_id(endpoint):
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{_slug(endpoint)}-{uuid.uuid4().hex[:6]}"
+
+
+def save_profile(profiler, tags, profile_id=None):
+    """Write one profile and its tags; returns the profile id."""
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    profile_id = profile_id or new_profile_id(tags.get('endpoint', ''))
+    profiler.dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+    with open(os.path.join(directory, f'{profile_id}.json'), 'w') as f:
+        json.dump(dict(tags, id=profile_id, created_at=time.time()), f, indent=2)
+    prune(directory, settings.PROFILING_MAX_FILES)
+    return profile_id
+
+
+def _save(profiler, tags, profile_id=None):
+    # a full or unwritable PROFILING_DIR loses the profile, never the request
+    try:
+        return save_profile(profiler, tags, profile_id)
+    except OSError:
+        logger.exception('Could not save profile of %s', tags.get('endpoint'))
+        return None
+
+
+def prune(directory, keep):
+    """Delete all but the newest `keep` profiles."""
+    profiles = [name for name in os.listdir(directory) if name.endswith('.prof')]
+    profiles.sort(key=lambda name: os.path.getmtime(os.path.join(directory, name)))
+    for name in profiles[:max(len(profiles) - keep, 0)]:
+        for path in (name, name[:-len('.prof')] + '.json'):
+            try:
+                os.remove(os.path.join(directory, path))
+            except FileNotFoundError:
+                pass
+
+
+class ProfiledBlock:
+    """Profile the block in this thread and save it with `tags`.
+
+    When no profile can be taken the block just runs, and profile_id stays None.
+    """
+
+    def __init__(self, tags):
+        self.tags = tags
+        self.profiler = cProfile.Profile()
+        self.profile_id = None
+        self._running = False
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        if _claim():
+            self._running = _enable(self.profiler)
+            if not self._running:
+                _release()
+        return self
+
+    def __exit__(self, *exc):
+        if not self._running:
+            return
+        self.profiler.disable()
+        try:
+            self.tags['duration_ms'] = round((time.perf_counter() - self._start) * 1000, 3)
+            self.profile_id = _save(self.profiler, self.tags)
+        finally:
+            _release()
+
+
+def profile_job(job):
+    """JobManager profiler: jobs submitted from a profiled request are profiled too."""
+    if not getattr(job, 'profile', False):
+        return None
+    return ProfiledBlock({'endpoint': 'schedule job', 'method': 'JOB', 'query': job.query, 'job_id': job.id})
+
+
+class ProfiledStream:
+    """A streaming body, profiled as it is produced and saved on close().
+
+    Django closes the response when it is done with it, even one whose body
+    was never read, so this is where a streamed profile's slot is released.
+    """
+
+    def __init__(self, content, profiler, tags, started, profile_id):
+        self.content = iter(content)
+        self.profiler = profiler
+        self.tags = tags
+        self.started = started
+        self.profile_id = profile_id
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        enabled = _enable(self.profiler)
+        try:
+            return next(self.content)
+        finally:
+            if enabled:
+                self.profiler.disable()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.tags['duration_ms'] = round((time.perf_counter() - self.started) * 1000, 3)
+            _save(self.profiler, self.tags, self.profile_id)
+        finally:
+            _release()
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+
+    def trigger(self, request):
+        if request.META.get(PROFILE_HEADER) == '1' and is_staff(request):
+            return 'header'
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    def __call__(self, request):
+        trigger = self.trigger(request)
+        if trigger is None or not _claim():
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        if not _enable(profiler):
+            _release()
+            return self.get_response(request)
+        response = None
+        try:
+            response = self.profile(request, profiler, trigger)
+            return response
+        finally:
+            # a streamed profile releases the slot itself, from its close()
+            if response is None or not response.streaming:
+                _release()
+
+    def profile(self, request, profiler, trigger):
+        # profiler is running; __call__ owns the slot
+        request.profile_requested = True
+        tags = {
+            'endpoint': request.path,
+            'method': request.method,
+            'query_string': request.META.get('QUERY_STRING', ''),
+            'trigger': trigger,
+        }
+        if request.method == 'POST' and request.content_type == 'application/json':
+            # the scheduling query is what makes /api/user-input/ fast or slow
+            try:
+                tags['query'] = json.loads(request.body).get('query')
+            except (ValueError, AttributeError):
+                pass
+
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        match = getattr(request, 'resolver_match', None)
+        if match and match.route:
+            tags['route'] = match.route
+        tags['status'] = response.status_code
+
+        if response.streaming:
+            tags['streaming'] = True
+            profile_id = new_profile_id(request.path)
+            response.streaming_content = ProfiledStream(response.streaming_content, profiler, tags, started, profile_id)
+            response['X-Profile-Id'] = profile_id
+            return response
+        tags['duration_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        profile_id = _save(profiler, tags)
+        if profile_id:
+            response['X-Profile-Id'] = profile_id
+        return response
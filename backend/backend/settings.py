@@ -57,6 +57,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'courses',
+    'scheduler',
     'rest_framework', # this will be used for the API (i added this line and the one below)
     'rest_framework_simplejwt.token_blacklist',
     'drf_yasg', # trying out swagger ui cause fuck whatever django's rest framework browsable api is
@@ -82,11 +83,13 @@ REST_FRAMEWORK = {
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # very top
+    'backend.metrics.ServerTimingMiddleware',  # times everything below it
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'backend.profiling.ProfilingMiddleware',  # needs request.user for the X-Profile check
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -137,6 +140,28 @@ DATABASES = {
     'default': env.db('DATABASE_URL'),
 }
 
+# trigram lookups for ?q= course search (courses/search.py)
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    INSTALLED_APPS.append('django.contrib.postgres')
+
+# locmem is per process; a shared backend (redis://, pymemcache://, dbcache://) lets
+# workers share rendered responses. Either way entries are keyed by the catalog
+# version read from the database, so none outlive an import
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# rendered /cs/courses/ responses, keyed by query and catalog version (courses/cache.py)
+COURSES_CACHE_ENABLED = env.bool('COURSES_CACHE_ENABLED', default=True)
+COURSES_CACHE_ALIAS = 'default'
+COURSES_CACHE_TIMEOUT = env.int('COURSES_CACHE_TIMEOUT', default=3600)  # seconds
+# build course lists from .values() rows instead of CourseSerializer (same JSON, less CPU)
+COURSES_FAST_JSON = env.bool('COURSES_FAST_JSON', default=False)
+
+# ?q= search without PostgreSQL: minimum word similarity, and how many matches are returned at most
+COURSES_SEARCH_THRESHOLD = env.float('COURSES_SEARCH_THRESHOLD', default=0.3)
+COURSES_SEARCH_LIMIT = env.int('COURSES_SEARCH_LIMIT', default=500)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -178,6 +203,36 @@ SWAGGER_SETTINGS = {
 
 CORS_ALLOW_ALL_ORIGINS = True # cause fuck it, we dont care about security right now
 
+# load TinyLlama in a background thread when the app starts instead of on the first LLM request
+SCHEDULER_WARM_MODEL = env.bool('SCHEDULER_WARM_MODEL', default=False)
+
+# background schedule generation (/api/user-input/ -> /api/jobs/<job_id>/)
+SCHEDULER_WORKERS = env.int('SCHEDULER_WORKERS', default=2)
+SCHEDULER_MAX_QUEUED = env.int('SCHEDULER_MAX_QUEUED', default=100)
+SCHEDULER_JOB_TTL = env.int('SCHEDULER_JOB_TTL', default=600)  # seconds a finished job is kept
+# write every pipeline stage to scheduler-test/outputs/jobs/<job_id>/ for debugging
+SCHEDULER_DEBUG_DUMP = env.bool('SCHEDULER_DEBUG_DUMP', default=False)
+
+# run schedule jobs on a preforked worker pool (`manage.py run_scheduler_pool`)
+# at this address, "host:port" or a socket path; empty runs them in-process
+SCHEDULER_POOL_ADDRESS = env.str('SCHEDULER_POOL_ADDRESS', default='')
+# shared by the pool and the web servers; required with an address, since the
+# socket carries pickles (and never the SECRET_KEY, which signs other things)
+SCHEDULER_POOL_AUTHKEY = env.str('SCHEDULER_POOL_AUTHKEY', default='')
+SCHEDULER_POOL_TIMEOUT = env.int('SCHEDULER_POOL_TIMEOUT', default=120)  # seconds a job may take there
+
+# Server-Timing headers and the /api/metrics/ histograms
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=True)
+# who may read /api/metrics/ without being staff (e.g. a Prometheus on the same box)
+METRICS_ALLOWED_IPS = env.list('METRICS_ALLOWED_IPS', default=['127.0.0.1', '::1'])
+
+# cProfile a fraction of requests (0.0-1.0), plus staff requests sent with
+# "X-Profile: 1"; `manage.py profiles` summarizes them
+PROFILING_ENABLED = env.bool('PROFILING_ENABLED', default=True)
+PROFILING_SAMPLE_RATE = env.float('PROFILING_SAMPLE_RATE', default=0.0)
+PROFILING_DIR = env.str('PROFILING_DIR', default=os.path.join(BASE_DIR, 'profiles'))
+PROFILING_MAX_FILES = env.int('PROFILING_MAX_FILES', default=200)  # oldest are deleted first
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
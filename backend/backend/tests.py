@@ -1,12 +1,28 @@
+import cProfile
+import io
+import json
 import os
+import shutil
+import tempfile
+import time
+from unittest import mock
 
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
 
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import Client, TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 from django.db import connection
 
+from backend import profiling, views
+from backend.views import import_scheduler
+from courses.models import Course
+from scheduler.models import ScheduleJob
+
 # auto-close db connection after tests
 
 def tearDownModule():
@@ -36,3 +52,321 @@ class UserAuthTests(APITestCase):
         self.assertIn('access', response.data)
         self.assertIn('refresh', response.data)
     
+
+# tests for the in-process catalog used by the scheduler
+class InProcessCatalogTests(TestCase):
+
+    def setUp(self):
+        common = dict(subject='C S', instructor='Sridhar, Kamal', seats='9 out of 120', waitlist='0 Waiting')
+        Course.objects.create(crn='1', course='2413', section='10', title='Data Structures',
+                              meeting_time='1:30 pm - 2:45 pm', meeting_days='TR', **common)
+        Course.objects.create(crn='2', course='3113', section='10', title='Operating Systems',
+                              meeting_time='9:00 am - 9:50 am', meeting_days='MWF', **common)
+
+    def _catalog(self):
+        return import_scheduler('catalog')
+
+    def test_default_provider_is_in_process(self):
+        catalog = self._catalog()
+        catalog.set_provider(None)
+        self.assertIsInstance(catalog.get_provider(), catalog.DjangoCatalog)
+
+    def test_matches_api_results(self):
+        catalog = self._catalog()
+        courses = catalog.DjangoCatalog().get_courses('meeting_days', 'MWF')
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('catalog', password='x'))
+        response = client.get(reverse('course-list'), {'meeting_days': 'MWF'})
+        self.assertEqual(courses, response.json()['results'])
+        self.assertEqual([c['course'] for c in courses], ['3113'])
+
+# tests for the background schedule jobs behind /api/user-input/
+# (transactional: the job threads write job state on their own connections)
+class ScheduleJobTests(TransactionTestCase):
+
+    def setUp(self):
+        self.seen = []
+        patcher = mock.patch.object(views.jobs, 'runner', self._fake_runner)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.jobs = views.jobs
+
+    def _fake_runner(self, query, work_dir):
+        self.seen.append(work_dir)
+        if query == 'boom':
+            raise RuntimeError('solver exploded')
+        with import_scheduler('tracing').span('solve'):
+            pass
+        return [{'course': '2413', 'query': query}]
+
+    def _wait(self, job_id):
+        for _ in range(200):
+            data = self.client.get(reverse('job-status', args=[job_id])).json()
+            if data['status'] in ('done', 'failed'):
+                return data
+            time.sleep(0.01)
+        self.fail('job did not finish')
+
+    def test_returns_job_id_then_result(self):
+        response = self.client.post('/api/user-input/', {'query': 'CS 2413'}, content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        data = self._wait(response.json()['job_id'])
+        self.assertEqual(data['status'], 'done')
+        self.assertEqual(data['result'], [{'course': '2413', 'query': 'CS 2413'}])
+        self.assertEqual([span['stage'] for span in data['timings']], ['solve'])
+
+    def test_jobs_get_separate_work_dirs(self):
+        first = self.client.post('/api/user-input/', {'query': 'a'}, content_type='application/json').json()
+        second = self.client.post('/api/user-input/', {'query': 'b'}, content_type='application/json').json()
+        self._wait(first['job_id'])
+        self._wait(second['job_id'])
+        self.assertEqual(len(set(self.seen)), 2)
+
+    def test_failed_job_reports_error(self):
+        job_id = self.client.post('/api/user-input/', {'query': 'boom'}, content_type='application/json').json()['job_id']
+        data = self._wait(job_id)
+        self.assertEqual(data['status'], 'failed')
+        self.assertEqual(data['error'], 'solver exploded')
+
+    def test_status_from_another_worker(self):
+        # a poll that lands on a process that didn't run the job
+        job_id = self.client.post('/api/user-input/', {'query': 'CS 2413'}, content_type='application/json').json()['job_id']
+
+        local = self._wait(job_id)
+        # the job thread writes its final state right after finishing
+        for _ in range(200):
+            if ScheduleJob.objects.filter(id=job_id, status='done').exists():
+                break
+            time.sleep(0.01)
+        with self.jobs._lock:
+            del self.jobs._jobs[job_id]
+        data = self.client.get(reverse('job-status', args=[job_id])).json()
+        self.assertEqual(data, local)
+
+    def test_job_of_a_dead_process(self):
+        # queued by a web process that went away before the job finished
+        now = time.time()
+        expired = now - self.jobs.ttl - self.jobs.max_runtime
+        for job_id, created_at in (('recent', now), ('orphan', expired - 1), ('ancient', expired - self.jobs.ttl - 1)):
+            ScheduleJob.objects.create(id=job_id, status='running', created_at=created_at,
+                                       state={'job_id': job_id, 'status': 'running'})
+        self.assertEqual(self.client.get(reverse('job-status', args=['recent'])).json()['status'], 'running')
+        data = self.client.get(reverse('job-status', args=['orphan'])).json()
+        self.assertEqual(data['status'], 'failed')
+        self.assertIn('submit it again', data['error'])
+
+        job_id = self.client.post('/api/user-input/', {'query': 'a'}, content_type='application/json').json()['job_id']
+        self._wait(job_id)
+        self.assertEqual(set(ScheduleJob.objects.values_list('id', flat=True)), {'recent', 'orphan', job_id})
+
+    def test_unknown_job(self):
+        response = self.client.get(reverse('job-status', args=['nope']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_queue_limit(self):
+        with mock.patch.object(self.jobs, 'max_queued', 0):
+            response = self.client.post('/api/user-input/', {'query': 'a'}, content_type='application/json')
+        self.assertEqual(response.status_code, 503)
+
+    def test_runs_on_worker_pool_when_configured(self):
+        pool = mock.Mock()
+        pool.run.side_effect = lambda query, debug_dir=None: {
+            'result': [{'course': '2413'}] if query != 'boom' else None,
+            'error': 'solver exploded' if query == 'boom' else None,
+            'timings': [{'stage': 'solve', 'start_ms': 1.0, 'ms': 2.0}],
+            'worker': 1234,
+        }
+        with mock.patch.object(views, 'scheduler_pool', return_value=pool):
+            tracing = views.import_scheduler('tracing')
+            with tracing.trace() as trace:
+                self.assertEqual(views.run_schedule_job('CS 2413', '/tmp/x'), [{'course': '2413'}])
+            self.assertEqual([stage for stage, _, _ in trace.spans], ['solve'])
+            with self.assertRaisesMessage(RuntimeError, 'solver exploded'):
+                views.run_schedule_job('boom', '/tmp/x')
+        pool.run.assert_called_with('boom', debug_dir=None)
+
+    def test_worker_pool_requires_an_authkey(self):
+        with override_settings(SCHEDULER_POOL_ADDRESS='127.0.0.1:6010', SCHEDULER_POOL_AUTHKEY=''):
+            with self.assertRaises(ImproperlyConfigured):
+                views.scheduler_pool()
+            with self.assertRaises(ImproperlyConfigured):
+                call_command('run_scheduler_pool', '--no-preload')
+
+
+class RankedStreamTests(TestCase):
+
+    def setUp(self):
+        self.open_only = []
+
+        def fake_run_ranked(query, k=5, open_only=False):
+            self.open_only.append(open_only)
+            yield {'type': 'candidate', 'score': 2.0, 'schedule': [{'course': '2413'}]}
+            yield {'type': 'final', 'scored': 1, 'schedules': [{'score': 2.0}][:k]}
+
+        subset = views.import_scheduler()
+        patcher = mock.patch.object(subset, 'run_ranked', fake_run_ranked)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_streams_ndjson_events(self):
+        response = self.client.post(reverse('user-input-stream'), {'query': 'CS 2413', 'k': 3}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        events = [json.loads(line) for line in lines]
+        self.assertEqual([event['type'] for event in events], ['candidate', 'final'])
+
+    def test_missing_query(self):
+        response = self.client.post(reverse('user-input-stream'), {}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_open_only_parsing(self):
+        url = reverse('user-input-stream')
+        for value in (True, 'true', False, 'false'):
+            response = self.client.post(url, {'query': 'CS 2413', 'open_only': value}, content_type='application/json')
+            b''.join(response.streaming_content)
+        self.assertEqual(self.open_only, [True, True, False, False])
+        response = self.client.post(url, {'query': 'CS 2413', 'open_only': 'maybe'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class MetricsTests(TestCase):
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('course-list'))
+        timing = response['Server-Timing']
+        self.assertTrue(timing.startswith('total;dur='))
+        # the details are for staff and DEBUG only
+        self.assertNotIn('db;dur=', timing)
+        with override_settings(DEBUG=True):
+            self.assertIn('db;dur=', self.client.get(reverse('course-list'))['Server-Timing'])
+
+    def test_server_timing_details_for_staff(self):
+        token = RefreshToken.for_user(User.objects.create_user('ops', password='x', is_staff=True)).access_token
+        response = self.client.get(reverse('course-list'), HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+    def test_bad_authorization_is_not_staff(self):
+        user = User.objects.create_user('gone', password='x', is_staff=True)
+        token = RefreshToken.for_user(user).access_token
+        user.is_active = False
+        user.save()
+        for header in ('Bearer', 'Bearer a b', 'Bearer nonsense', f'Bearer {token}', 'Basic Zm9vOmJhcg=='):
+            for url in (reverse('course-list'), reverse('scheduler-status')):
+                response = self.client.get(url, HTTP_AUTHORIZATION=header)
+                self.assertNotEqual(response.status_code, 500, (header, url))
+                self.assertNotIn('db;dur=', response['Server-Timing'], (header, url))
+
+    def test_metrics_restricted(self):
+        outside = {'REMOTE_ADDR': '203.0.113.7'}
+        self.assertEqual(self.client.get(reverse('metrics'), **outside).status_code, 403)
+        self.client.force_login(User.objects.create_user('ops', password='x', is_staff=True))
+        self.assertEqual(self.client.get(reverse('metrics'), **outside).status_code, 200)
+
+    def test_endpoint_histograms(self):
+        self.client.get(reverse('course-list'))
+        self.client.get(reverse('course-list'), {'page': 1})
+        data = self.client.get(reverse('metrics')).json()
+        self.assertGreaterEqual(data['endpoints']['histograms']['GET /cs/courses/']['count'], 2)
+        self.assertGreaterEqual(data['endpoints']['counters']['GET /cs/courses/ 2xx'], 2)
+        self.assertIn('stages', data)
+
+    def test_prometheus_format(self):
+        self.client.get(reverse('course-list'))
+        response = self.client.get(reverse('metrics'), {'format': 'prometheus'})
+        body = response.content.decode()
+        self.assertIn('schedulesooner_request_seconds_bucket{endpoint="GET /cs/courses/",le="+Inf"}', body)
+        self.assertIn('schedulesooner_responses_total{endpoint="GET /cs/courses/",status="2xx"}', body)
+
+
+class ProfilingTests(TestCase):
+
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir, True)
+        self.settings_override = override_settings(PROFILING_DIR=self.profile_dir, PROFILING_MAX_FILES=2)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def profiles(self):
+        return sorted(name for name in os.listdir(self.profile_dir) if name.endswith('.prof'))
+
+    def test_staff_header_triggers_a_profile(self):
+        User.objects.create_user('staff', password='pw12345!', is_staff=True)
+        token = self.client.post(reverse('token_obtain_pair'), {'username': 'staff', 'password': 'pw12345!'}).json()['access']
+        response = self.client.get(reverse('course-list'), {'days_within': 'MWF'},
+                                   HTTP_X_PROFILE='1', HTTP_AUTHORIZATION=f'Bearer {token}')
+        profile_id = response['X-Profile-Id']
+        self.assertEqual(self.profiles(), [f'{profile_id}.prof'])
+        with open(os.path.join(self.profile_dir, f'{profile_id}.json')) as f:
+            tags = json.load(f)
+        self.assertEqual((tags['endpoint'], tags['query_string'], tags['trigger']), ('/cs/courses/', 'days_within=MWF', 'header'))
+
+    def test_header_ignored_for_other_users(self):
+        response = self.client.get(reverse('course-list'), HTTP_X_PROFILE='1')
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(self.profiles(), [])
+
+    def test_sampling_keeps_the_newest(self):
+        with override_settings(PROFILING_SAMPLE_RATE=1.0):
+            client = Client()
+            for _ in range(3):
+                client.get(reverse('course-list'))
+        self.assertEqual(len(self.profiles()), 2)
+
+        out = io.StringIO()
+        call_command('profiles', '--top', '5', stdout=out)
+        self.assertIn('2 profiles', out.getvalue())
+        out = io.StringIO()
+        call_command('profiles', '--list', '--endpoint', 'courses', stdout=out)
+        self.assertEqual(out.getvalue().count('/cs/courses/'), 2)
+
+    def test_busy_profiler_runs_the_request_unprofiled(self):
+        client = Client()
+        with override_settings(PROFILING_SAMPLE_RATE=1.0), mock.patch.object(profiling, 'EXCLUSIVE', True):
+            with profiling._slot:
+                response = client.get(reverse('course-list'))
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.has_header('X-Profile-Id'))
+            # the slot is free again once a profiled request is done
+            self.assertTrue(client.get(reverse('course-list')).has_header('X-Profile-Id'))
+            self.assertFalse(profiling._slot.locked())
+
+    def test_profiler_already_active(self):
+        with override_settings(PROFILING_SAMPLE_RATE=1.0), \
+                mock.patch.object(cProfile.Profile, 'enable', side_effect=ValueError('Another profiling tool is already active')):
+            response = Client().get(reverse('course-list'))
+            with profiling.ProfiledBlock({'job': 'x'}) as block:
+                pass
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertIsNone(block.profile_id)
+        self.assertEqual(self.profiles(), [])
+
+    def test_unwritable_profile_dir(self):
+        with tempfile.NamedTemporaryFile() as not_a_dir, \
+                override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_DIR=not_a_dir.name), \
+                mock.patch.object(profiling, 'EXCLUSIVE', True), \
+                self.assertLogs('backend.profiling', 'ERROR') as logs:
+            response = Client().get(reverse('course-list'))
+            with profiling.ProfiledBlock({'job': 'x'}) as block:
+                pass
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertIsNone(block.profile_id)
+        self.assertFalse(profiling._slot.locked())
+
+    def test_streamed_profile_releases_on_close(self):
+        client = Client()
+        with override_settings(PROFILING_SAMPLE_RATE=1.0), mock.patch.object(profiling, 'EXCLUSIVE', True):
+            response = client.get(reverse('course-list'), {'format': 'ndjson'})
+            self.assertTrue(response.streaming)
+            b''.join(response.streaming_content)
+            response.close()
+            self.assertFalse(profiling._slot.locked())
+            self.assertEqual(self.profiles(), [f"{response['X-Profile-Id']}.prof"])
+            # never read: closing it still gives the slot back
+            client.get(reverse('course-list'), {'format': 'ndjson'}).close()
+            self.assertFalse(profiling._slot.locked())
@@ -32,7 +32,7 @@ from backend.views import RegisterView
 #from backend.views import csrf  # import CSRF view
 
 from django.urls import path
-from backend.views import handle_user_input, download_file
+from backend.views import handle_user_input, stream_user_input, scheduler_status, job_status, metrics_view
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -71,6 +71,9 @@ urlpatterns = [
 
     # endpoint to user-input
     path('api/user-input/', handle_user_input),
-    path('api/download-file', download_file),  # <== NO trailing slash here
+    path('api/user-input/stream/', stream_user_input, name='user-input-stream'),
+    path('api/jobs/<str:job_id>/', job_status, name='job-status'),
+    path('api/scheduler/status/', scheduler_status, name='scheduler-status'),
+    path('api/metrics/', metrics_view, name='metrics'),
 ]
 
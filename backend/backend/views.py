@@ -1,6 +1,7 @@
 import os
 from django.http import JsonResponse
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -12,11 +13,17 @@ from django.http import FileResponse
 from django.contrib.auth.models import User
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.http import StreamingHttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 
+from backend import metrics, profiling
+from backend.jobs import JobManager, QueueFull
 
+
+import importlib
 import subprocess
 import json
+import sys
+import time
 
 # POST and GET User Input
 class UserInputView(APIView):
@@ -87,6 +94,57 @@ BASE_DIR = settings.BASE_DIR
 OUTPUTS_DIR = os.path.join(BASE_DIR, "scheduler-test", "outputs")
 SCHEDULER_TEST_DIR = os.path.join(BASE_DIR, "scheduler-test")
 
+# scheduler-test isn't a package, so put it on the path before importing from it
+def import_scheduler(module_name="subset"):
+    if SCHEDULER_TEST_DIR not in sys.path:
+        sys.path.append(SCHEDULER_TEST_DIR)
+    return importlib.import_module(module_name)
+
+_pool_client = None
+
+# the worker pool's client when SCHEDULER_POOL_ADDRESS is set, else None
+def scheduler_pool():
+    global _pool_client
+    if _pool_client is None and settings.SCHEDULER_POOL_ADDRESS:
+        if not settings.SCHEDULER_POOL_AUTHKEY:
+            raise ImproperlyConfigured("SCHEDULER_POOL_ADDRESS is set but SCHEDULER_POOL_AUTHKEY is empty")
+        worker_pool = import_scheduler("worker_pool")
+        _pool_client = worker_pool.PoolClient(
+            settings.SCHEDULER_POOL_ADDRESS,
+            settings.SCHEDULER_POOL_AUTHKEY.encode(),
+            timeout=settings.SCHEDULER_POOL_TIMEOUT,
+        )
+    return _pool_client
+
+def run_schedule_job(query, work_dir):
+    # nothing touches the disk unless we want the intermediate files
+    debug_dir = work_dir if settings.SCHEDULER_DEBUG_DUMP else None
+    pool = scheduler_pool()
+    if pool is None:
+        return import_scheduler().run(query, debug_dir=debug_dir)
+
+    # the job thread just waits while a pool worker does the work
+    started = time.perf_counter()
+    payload = pool.run(query, debug_dir=debug_dir)
+    import_scheduler("tracing").absorb(payload["timings"], started)
+    if payload["error"]:
+        raise RuntimeError(payload["error"])
+    return payload["result"]
+
+jobs = JobManager(
+    run_schedule_job,
+    os.path.join(OUTPUTS_DIR, "jobs"),
+    max_workers=settings.SCHEDULER_WORKERS,
+    max_queued=settings.SCHEDULER_MAX_QUEUED,
+    ttl=settings.SCHEDULER_JOB_TTL,
+    max_runtime=settings.SCHEDULER_POOL_TIMEOUT,
+    keep_work_dirs=settings.SCHEDULER_DEBUG_DUMP,
+    tracer=import_scheduler("tracing").trace,
+    profiler=profiling.profile_job,
+)
+
+# Queues schedule generation and returns a job id right away,
+# poll /api/jobs/<job_id>/ for the result
 @csrf_exempt
 def handle_user_input(request):
     if request.method != 'POST':
@@ -98,54 +156,105 @@ def handle_user_input(request):
         if not user_query:
             return JsonResponse({'error': 'Missing query'}, status=400)
 
-        os.makedirs(OUTPUTS_DIR, exist_ok=True)
-        input_path = os.path.join(OUTPUTS_DIR, 'user_input.json')
-        with open(input_path, "w") as f:
-            json.dump({"user_input": user_query}, f)
-
-        # Clear old schedule if it exists
-        final_schedule_path = os.path.join(OUTPUTS_DIR, "final_schedule.json")
-        if os.path.exists(final_schedule_path):
-            try:
-                os.remove(final_schedule_path)
-                print("🗑️ Old final_schedule.json deleted before processing")
-            except Exception as e:
-                print("⚠️ Could not delete old final_schedule.json:", e)
-
-        # ✅ Run schedule generation inline (Render-safe)
-        import sys
-        if SCHEDULER_TEST_DIR not in sys.path:
-            sys.path.append(SCHEDULER_TEST_DIR)
-        import subset
-
-        subset.main()
-
-        return JsonResponse({"status": "processing complete"})
+        job = jobs.submit(user_query, profile=getattr(request, 'profile_requested', False))
+        return JsonResponse({
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/api/jobs/{job.id}/",
+        }, status=202)
 
+    except QueueFull as e:
+        return JsonResponse({'error': str(e)}, status=503)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+# a JSON boolean, or "true"/"false" like the /cs/courses/ BooleanFilter;
+# None for anything else
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return {"true": True, "false": False, "1": True, "0": False}.get(value.strip().lower())
+    return None
+
+# Same query as /api/user-input/, but answered inline as NDJSON: one line
+# per schedule that enters the current top k, then a "final" line with the
+# best k in order. The first line goes out before the search is done.
 @csrf_exempt
-def download_file(request):
-    filename = request.GET.get("filename")
-    if not filename:
-        return JsonResponse({"error": "No filename provided"}, status=400)
-
-    file_path = os.path.join(OUTPUTS_DIR, filename)
-    if not os.path.exists(file_path):
-        return JsonResponse({"error": "File not found"}, status=404)
+def stream_user_input(request):
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST request required'}, status=400)
 
     try:
-        with open(file_path, "r") as f:
-            data = json.load(f)
-    except Exception as e:
-        return JsonResponse({"error": f"Could not read file: {str(e)}"}, status=500)
-
-    # ✅ Delete after reading
+        body = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    user_query = body.get("query")
+    if not user_query:
+        return JsonResponse({'error': 'Missing query'}, status=400)
     try:
-        os.remove(file_path)
-        print(f"🗑️ Deleted {filename} after sending it")
-    except Exception as e:
-        print(f"⚠️ Could not delete {filename}: {e}")
-
-    return JsonResponse(data, safe=False)
\ No newline at end of file
+        k = max(1, min(int(body.get("k", 5)), 50))
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'k must be an integer'}, status=400)
+    open_only = parse_bool(body.get("open_only", False))
+    if open_only is None:
+        return JsonResponse({'error': 'open_only must be true or false'}, status=400)
+
+    subset = import_scheduler()
+    tracing = import_scheduler("tracing")
+
+    def lines():
+        try:
+            # the stages run while streaming, after the Server-Timing header is out
+            with tracing.trace() as trace:
+                for event in subset.run_ranked(user_query, k=k, open_only=open_only):
+                    if event["type"] == "final":
+                        event["timings"] = trace.as_list()
+                    yield json.dumps(event) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "title": str(e)}) + "\n"
+
+    response = StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+    # keep proxies from buffering the stream
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+def job_status(request, job_id):
+    data = jobs.status(job_id)
+    if data is None:
+        return JsonResponse({"error": "Job not found"}, status=404)
+    return JsonResponse(data)
+
+# Is TinyLlama loaded yet, and how long did it take
+def scheduler_status(request):
+    model_manager = import_scheduler("model_manager")
+    inference = import_scheduler("inference")
+    data = {"model": model_manager.manager.status(), "llm": inference.LLM_BACKEND}
+    pool = scheduler_pool()
+    if pool is not None:
+        # the model that matters is the one loaded in the pool
+        try:
+            data["pool"] = pool.status()
+        except Exception as e:
+            data["pool"] = {"error": str(e)}
+    return JsonResponse(data)
+
+# Request latency per endpoint and per pipeline stage since the process
+# started, as JSON or (?format=prometheus) for a Prometheus scrape; staff and
+# METRICS_ALLOWED_IPS only
+def metrics_view(request):
+    if not metrics.can_see_metrics(request):
+        return JsonResponse({"error": "Metrics are for staff and internal addresses only"}, status=403)
+    tracing = import_scheduler("tracing")
+    endpoint_snapshot = metrics.endpoints().snapshot()
+    stage_snapshot = tracing.stages.snapshot()
+    if request.GET.get("format") == "prometheus":
+        return HttpResponse(metrics.prometheus_text(endpoint_snapshot, stage_snapshot),
+                            content_type="text/plain; version=0.0.4")
+    return JsonResponse({
+        "endpoints": endpoint_snapshot,
+        "stages": stage_snapshot,
+        "jobs": {"pending": jobs.pending()},
+        "llm": import_scheduler("inference").batcher.stats(),
+    })
@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Start loading TinyLlama in the background so the first request that needs
+# the LLM doesn't pay for the load (regex-only requests never wait on it)
+from django.conf import settings
+
+if settings.SCHEDULER_WARM_MODEL:
+    from backend.views import import_scheduler
+
+    import_scheduler("model_manager").manager.warm_up()
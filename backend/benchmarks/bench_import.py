@@ -0,0 +1,67 @@
+"""import_courses throughput on a generated CSV: a fresh import, an
+unchanged re-run, and a re-run with some rows edited and some dropped.
+
+    python benchmarks/bench_import.py --rows 1000000
+
+Rows are data/cs.csv cycled with unique crns. Peak RSS is printed so the
+streaming (flat memory) behaviour is visible as --rows grows.
+"""
+
+import argparse
+import csv
+import os
+import resource
+import time
+
+from scratch_db import CS_CSV, TMP_DIR  # sets up Django
+
+from courses.importer import import_rows  # noqa: E402
+from courses.models import CATALOG_FIELDS  # noqa: E402
+
+
+def write_csv(path, rows, template, edit_every=0, drop_every=0):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CATALOG_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for i in range(rows):
+            if drop_every and i % drop_every == 0:
+                continue
+            row = dict(template[i % len(template)], crn=str(100000 + i))
+            if edit_every and i % edit_every == 0:
+                row["seats"] = "0 out of 120"
+            writer.writerow(row)
+
+
+def run(label, path, batch_size):
+    start = time.perf_counter()
+    with open(path, newline="", encoding="utf-8") as f:
+        result = import_rows(csv.DictReader(f), batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    rows = result.total
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{label:<12}{elapsed:>9.1f}{rows / elapsed:>12,.0f}{peak_mb:>10.0f}   {result}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with open(CS_CSV, newline="", encoding="utf-8-sig") as f:
+        template = list(csv.DictReader(f))
+
+    fresh = os.path.join(TMP_DIR, "fresh.csv")
+    edited = os.path.join(TMP_DIR, "edited.csv")
+    write_csv(fresh, args.rows, template)
+    write_csv(edited, args.rows, template, edit_every=10, drop_every=20)
+    print(f"{args.rows:,} rows, batches of {args.batch_size}")
+    print(f"{'pass':<12}{'seconds':>9}{'rows/sec':>12}{'peak MB':>10}")
+
+    run("fresh", fresh, args.batch_size)
+    run("unchanged", fresh, args.batch_size)
+    run("edited", edited, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""?q= search latency on a large catalog: icontains scans vs the in-process
+trigram index (what SQLite gets; PostgreSQL uses pg_trgm instead).
+
+    python benchmarks/bench_search.py --scale 500
+
+Loads data/cs.csv `scale` times over (500x is ~100k sections).
+"""
+
+import argparse
+import statistics
+import time
+
+from scratch_db import CS_CSV, load  # sets up Django
+
+from django.db.models import Q  # noqa: E402
+
+from courses.models import Course  # noqa: E402
+from courses import search  # noqa: E402
+
+QUERIES = ["Sridhar", "Sridar", "operating sytems", "pythn programming", "Maliha"]
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=CS_CSV)
+    parser.add_argument("--scale", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    n = load(args.csv, args.scale)
+    build_ms, index = timed(search.build_index, 1)
+    print(f"{n} sections, index built in {build_ms:.0f} ms")
+    print(f"{'query':<22}{'icontains ms':>14}{'rows':>8}{'index ms':>10}{'rows':>8}{'+ fetch ms':>12}")
+
+    for query in QUERIES:
+        def scan():
+            return list(Course.objects.filter(Q(instructor__icontains=query) | Q(title__icontains=query))
+                        .values_list("pk", flat=True))
+
+        def fetch():
+            return list(search.search_queryset(Course.objects.all(), query).values_list("pk", flat=True))
+
+        scan_ms, scanned = timed(scan, args.repeat)
+        index_ms, found = timed(lambda: index.search(query), args.repeat)
+        fetch_ms, _ = timed(fetch, args.repeat)
+        print(f"{query:<22}{scan_ms:>14.1f}{len(scanned):>8}{index_ms:>10.1f}{len(found):>8}{fetch_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
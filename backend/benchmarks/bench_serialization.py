@@ -0,0 +1,64 @@
+"""Rows/sec of the course list serializer: CourseSerializer + JSONRenderer
+vs .values() rows + FastJSONRenderer (COURSES_FAST_JSON).
+
+    python benchmarks/bench_serialization.py --scale 500
+
+Loads data/cs.csv `scale` times over into a throwaway SQLite database and
+serializes the whole catalog both ways, checking the bytes match.
+"""
+
+import argparse
+import os
+import time
+
+from scratch_db import CS_CSV, load  # sets up Django
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from courses.models import Course  # noqa: E402
+from courses.renderers import FastJSONRenderer  # noqa: E402
+from courses.serializers import CourseSerializer, course_values_fields  # noqa: E402
+
+
+def slow_path():
+    data = CourseSerializer(Course.objects.order_by("pk"), many=True).data
+    return JSONRenderer().render(data)
+
+
+def fast_path():
+    rows = list(Course.objects.order_by("pk").values(*course_values_fields()))
+    return FastJSONRenderer().render(rows)
+
+
+def best_of(fn, repeat):
+    best, out = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=CS_CSV)
+    parser.add_argument("--scale", type=int, default=500, help="copies of the catalog to load")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    n = load(args.csv, args.scale)
+    print(f"{n} rows ({args.scale}x {os.path.basename(args.csv)})")
+
+    slow, slow_bytes = best_of(slow_path, args.repeat)
+    fast, fast_bytes = best_of(fast_path, args.repeat)
+    assert slow_bytes == fast_bytes, "fast path output differs"
+
+    print(f"{'path':<28}{'seconds':>10}{'rows/sec':>14}")
+    print(f"{'serializer + JSONRenderer':<28}{slow:>10.3f}{n / slow:>14,.0f}")
+    print(f"{'values() + orjson':<28}{fast:>10.3f}{n / fast:>14,.0f}")
+    print(f"speedup: {slow / fast:.1f}x, output identical ({len(fast_bytes):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
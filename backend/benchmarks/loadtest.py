@@ -0,0 +1,368 @@
+"""Load test of the whole API: mixed traffic at a fixed concurrency, with
+throughput and latency percentiles per endpoint.
+
+    python benchmarks/loadtest.py --concurrency 16 --duration 30
+    python benchmarks/loadtest.py --server gunicorn --workers 4
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000   # an already running server
+    python benchmarks/loadtest.py --compare benchmarks/results/loadtest-before.json
+
+Without --url it starts its own server (manage.py runserver, or gunicorn
+like render.yaml) on a throwaway SQLite database (or --database-url),
+migrates it and imports data/cs.csv and data/math.csv. The scheduler reads
+that database directly (SCHEDULE_CATALOG=django) and the LLM is the
+deterministic stub from inference.py (SCHEDULER_LLM=stub,
+SCHEDULER_LLM_STUB_MS of latency per batch), so nothing leaves the machine.
+
+Traffic is drawn by weight from the scenarios below. /api/user-input/ is
+reported twice: the submit (user_input) and the time until its job is done
+(user_input_job). Results go to benchmarks/results/loadtest-<time>.json;
+--compare exits 1 when an endpoint's p99 grew or its throughput fell by
+more than --threshold.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+DATA_FILES = [os.path.join(REPO_DIR, "data", name) for name in ("cs.csv", "math.csv")]
+
+USERNAME = "loadtest"
+PASSWORD = "loadtest-password"
+
+# query strings for /cs/courses/, one picked per request
+COURSE_FILTERS = [
+    {},
+    {"page": "2"},
+    {"course": "2413"},
+    {"meeting_days": "MWF"},
+    {"instructor": "Neeman"},
+    {"start_after": "10:00", "end_before": "14:00"},
+    {"days_within": "TR"},
+    {"open_only": "true"},
+    {"min_open_seats": "10", "days_within": "MWF"},
+    {"q": "data structures"},
+    {"q": "sridar"},
+    {"pagination": "cursor", "page_size": "100"},
+]
+
+# regex-parsed ones, and ones only the (stub) LLM answers
+QUERIES = [
+    "CS 2413 and CS 3113 on MWF",
+    "CS 4513 after 10:30 am",
+    "I want Data Structures with Radhakrishnan",
+    "CS 1213 and CS 2334 TR",
+    "something in the morning",
+    "no classes on fridays please",
+]
+
+WEIGHTS = {
+    "course_list": 50,
+    "course_detail": 25,
+    "login": 5,
+    "user_input": 10,
+    "user_input_stream": 10,
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """manage.py runserver / gunicorn on a seeded throwaway database."""
+
+    def __init__(self, args):
+        self.args = args
+        self.tmp_dir = tempfile.mkdtemp(prefix="loadtest-")
+        self.port = args.port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE="backend.settings",
+            DJANGO_SECRET_KEY=os.environ.get("DJANGO_SECRET_KEY", "loadtest"),
+            DJANGO_DEBUG="False",
+            DJANGO_ALLOWED_HOSTS="localhost,127.0.0.1",
+            DATABASE_URL=args.database_url or f"sqlite:///{os.path.join(self.tmp_dir, 'loadtest.sqlite3')}",
+            SCHEDULE_CATALOG="django",
+            SCHEDULER_LLM="stub",
+            SCHEDULER_LLM_STUB_MS=str(args.llm_latency_ms),
+        )
+        self.process = None
+        self.log = None
+
+    def manage(self, *command):
+        subprocess.run([sys.executable, "manage.py", *command], cwd=BACKEND_DIR, env=self.env, check=True,
+                       stdout=subprocess.DEVNULL)
+
+    def seed(self):
+        print("🗄️  Migrating and importing", ", ".join(os.path.basename(path) for path in self.args.data))
+        self.manage("migrate", "--noinput")
+        for path in self.args.data:
+            self.manage("import_courses", path, "--keep-missing")
+
+    def start(self):
+        self.seed()
+        if self.args.server == "gunicorn":
+            command = ["gunicorn", "backend.wsgi:application", "-b", f"127.0.0.1:{self.port}",
+                       "-w", str(self.args.workers), "--threads", str(self.args.threads)]
+        else:
+            command = [sys.executable, "manage.py", "runserver", f"127.0.0.1:{self.port}", "--noreload"]
+        self.log = open(os.path.join(self.tmp_dir, "server.log"), "w")
+        self.process = subprocess.Popen(command, cwd=BACKEND_DIR, env=self.env, stdout=self.log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"server exited, see {self.log.name}")
+            try:
+                requests.get(self.url + "/", timeout=1)
+                print(f"🚀 {self.args.server} up at {self.url}")
+                return
+            except requests.ConnectionError:
+                time.sleep(0.2)
+        raise RuntimeError(f"server didn't come up in 60s, see {self.log.name}")
+
+    def stop(self):
+        if self.process:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.log:
+            self.log.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}  # endpoint -> [(seconds, ok)]
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, seconds, ok):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append((seconds, ok))
+
+
+class Client:
+    """One simulated user: its own connection pool and JWT."""
+
+    def __init__(self, url, course_ids, recorder, rng, job_timeout):
+        self.url = url
+        self.course_ids = course_ids
+        self.recorder = recorder
+        self.rng = rng
+        self.job_timeout = job_timeout
+        self.session = requests.Session()
+        self.login()
+
+    def timed(self, endpoint, method, path, ok_status=(200,), **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.url + path, timeout=60, **kwargs)
+            response.content  # read streamed bodies to the end
+            ok = response.status_code in ok_status
+        except requests.RequestException:
+            response, ok = None, False
+        self.recorder.add(endpoint, time.perf_counter() - start, ok)
+        return response if ok else None
+
+    def login(self):
+        response = self.timed("login", "POST", "/api/login/", json={"username": USERNAME, "password": PASSWORD})
+        if response is not None:
+            self.session.headers["Authorization"] = f"Bearer {response.json()['access']}"
+
+    def course_list(self):
+        self.timed("course_list", "GET", "/cs/courses/", params=self.rng.choice(COURSE_FILTERS))
+
+    def course_detail(self):
+        self.timed("course_detail", "GET", f"/cs/courses/{self.rng.choice(self.course_ids)}/")
+
+    def user_input(self):
+        start = time.perf_counter()
+        response = self.timed("user_input", "POST", "/api/user-input/", ok_status=(202,),
+                              json={"query": self.rng.choice(QUERIES)})
+        if response is None:
+            return
+        status_url = response.json()["status_url"]
+        deadline = start + self.job_timeout
+        while time.perf_counter() < deadline:
+            job = self.session.get(self.url + status_url, timeout=60).json()
+            if job.get("status") in ("done", "failed"):
+                self.recorder.add("user_input_job", time.perf_counter() - start, job["status"] == "done")
+                return
+            time.sleep(0.05)
+        self.recorder.add("user_input_job", time.perf_counter() - start, False)
+
+    def user_input_stream(self):
+        self.timed("user_input_stream", "POST", "/api/user-input/stream/",
+                   json={"query": self.rng.choice(QUERIES), "k": 5})
+
+
+def setup_data(url):
+    """Create the load-test user and collect course ids for detail lookups."""
+    response = requests.post(url + "/api/register/", json={"username": USERNAME, "password": PASSWORD}, timeout=30)
+    if response.status_code not in (201, 400):  # 400: already registered
+        response.raise_for_status()
+    response = requests.get(url + "/cs/courses/", params={"format": "ndjson"}, timeout=60)
+    response.raise_for_status()
+    course_ids = [json.loads(line)["id"] for line in response.text.splitlines() if line]
+    if not course_ids:
+        raise RuntimeError("the catalog is empty; import some courses first")
+    return course_ids
+
+
+def run_load(url, course_ids, args):
+    recorder = Recorder()
+    scenarios = list(WEIGHTS)
+    weights = [WEIGHTS[name] for name in scenarios]
+    deadline = time.monotonic() + args.duration
+    errors = []
+
+    def user(index):
+        rng = random.Random(args.seed + index)
+        try:
+            client = Client(url, course_ids, recorder, rng, args.job_timeout)
+            while time.monotonic() < deadline:
+                getattr(client, rng.choices(scenarios, weights)[0])()
+        except Exception as e:  # keep the other users going, report at the end
+            errors.append(repr(e))
+
+    print(f"🔥 {args.concurrency} users for {args.duration:g}s")
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    for error in errors[:5]:
+        print(f"⚠️ user stopped: {error}")
+    return recorder, elapsed
+
+
+def percentile(sorted_values, fraction):
+    # nearest rank
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    times = sorted(seconds for seconds, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(times) * 1000, 2),
+        "p50_ms": round(percentile(times, 0.50) * 1000, 2),
+        "p90_ms": round(percentile(times, 0.90) * 1000, 2),
+        "p99_ms": round(percentile(times, 0.99) * 1000, 2),
+        "max_ms": round(times[-1] * 1000, 2),
+    }
+
+
+def compare(report, baseline, threshold):
+    """Print p99 and throughput against an earlier run; returns the endpoints that regressed."""
+    regressed = []
+    print(f"\n{'endpoint':20} {'p99 before':>11} {'p99 after':>10} {'rps before':>11} {'rps after':>10}")
+    for name, result in report["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        slower = before["p99_ms"] and result["p99_ms"] / before["p99_ms"] > threshold
+        fewer = result["rps"] and before["rps"] / result["rps"] > threshold
+        flag = "  <-- regressed" if slower or fewer else ""
+        if flag:
+            regressed.append(name)
+        print(f"{name:20} {before['p99_ms']:>11.2f} {result['p99_ms']:>10.2f} "
+              f"{before['rps']:>11.2f} {result['rps']:>10.2f}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--url", help="test a running server instead of starting one")
+    parser.add_argument("--server", choices=["runserver", "gunicorn"], default="runserver")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--database-url", help="seed and serve this database instead of a temporary SQLite one")
+    parser.add_argument("--data", nargs="+", default=DATA_FILES, help="catalog files to import")
+    parser.add_argument("--llm-latency-ms", type=float, default=50, help="stub LLM latency per batch")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="seconds")
+    parser.add_argument("--job-timeout", type=float, default=60, help="seconds to wait for a schedule job")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help=f"result file (default: {os.path.relpath(RESULTS_DIR)}/loadtest-<time>.json)")
+    parser.add_argument("--compare", metavar="RESULT_JSON", help="an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="ratio counted as a regression")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server = Server(args)
+        server.start()
+        url = server.url
+    try:
+        course_ids = setup_data(url)
+        recorder, elapsed = run_load(url, course_ids, args)
+    finally:
+        if server:
+            server.stop()
+
+    results = {name: summarize(samples, elapsed) for name, samples in sorted(recorder.samples.items())}
+    everything = [sample for name, samples in recorder.samples.items() if name != "user_input_job" for sample in samples]
+    if everything:
+        results["total"] = summarize(everything, elapsed)
+    report = {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "url": url if args.url else None,
+        "server": None if args.url else args.server,
+        "concurrency": args.concurrency,
+        "duration": round(elapsed, 2),
+        "llm_latency_ms": args.llm_latency_ms,
+        "weights": WEIGHTS,
+        "results": results,
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.datetime.now().strftime("loadtest-%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'endpoint':20} {'requests':>9} {'errors':>7} {'rps':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, result in results.items():
+        print(f"{name:20} {result['requests']:>9} {result['errors']:>7} {result['rps']:>8.2f} {result['p50_ms']:>8.1f} "
+              f"{result['p90_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['max_ms']:>8.1f}")
+    print(f"saved {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressed = compare(report, json.load(f), args.threshold)
+        if regressed:
+            print(f"regressions over {args.threshold}x: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""The scheduling and catalog hot paths on synthetic data, saved as JSON so
+two runs can be compared.
+
+    python benchmarks/suite.py                        # -> benchmarks/results/<time>.json
+    python benchmarks/suite.py --quick --only solver
+    python benchmarks/suite.py --compare benchmarks/results/before.json
+
+The catalog comes from scheduler-test/benchmarks/synthetic.py (shaped like
+data/cs.csv; --courses, --sections-per-course and --density control its
+size and how many sections overlap). Every case reports median/min/p95
+milliseconds and items per second. --compare exits 1 when a case's median
+is more than --threshold times slower than in the given run.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from scratch_db import BACKEND_DIR, REPO_DIR  # sets up Django
+
+SCHEDULER_DIR = os.path.join(REPO_DIR, "scheduler-test")
+sys.path.insert(0, SCHEDULER_DIR)
+sys.path.insert(0, os.path.join(SCHEDULER_DIR, "benchmarks"))
+
+import build_script  # noqa: E402
+import subset  # noqa: E402
+from synthetic import make_catalog  # noqa: E402
+
+from django.db import connection  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from courses.filters import CourseTimeFilter  # noqa: E402
+from courses.importer import import_rows  # noqa: E402
+from courses.models import CATALOG_FIELDS, Course  # noqa: E402
+from courses.serializers import CourseSerializer  # noqa: E402
+
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+QUERIES = [
+    "CS 2413 and CS 3113 on MWF",
+    "I want Data Structures with Neeman",
+    "CS 4513 after 10:30 am",
+    "Operating Systems and Computer Networks TR",
+    "something in the morning",
+]
+
+FILTERS = [
+    {"start_after": "10:00", "end_before": "14:00"},
+    {"days_within": "MWF"},
+    {"start_after": "09:00", "days_within": "TR"},
+    {"instructor": "Neeman"},
+    {"open_only": "true", "min_open_seats": "5"},
+]
+
+
+def measure(fn, repeat, setup=None):
+    """Wall-clock seconds of `repeat` calls to fn(), after one warm-up call."""
+    if setup:
+        setup()
+    fn()
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize(times, items, params):
+    times = sorted(times)
+    median = statistics.median(times)
+    return {
+        "median_ms": round(median * 1000, 3),
+        "min_ms": round(times[0] * 1000, 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 3),
+        "repeat": len(times),
+        "items": items,
+        "items_per_sec": round(items / median, 1) if median else None,
+        "params": params,
+    }
+
+
+# === scheduler-test ===
+
+def case_solver(args, catalog):
+    courses = sorted({section["course"] for section in catalog})
+    required = courses[:min(3, len(courses))]
+    picked = [section for section in catalog if section["course"] in courses[:7]]
+    times = measure(lambda: build_script.build_schedule(picked, max_classes=5, required_courses=required), args.repeat)
+    return summarize(times, 1, {"sections": len(picked), "required": required})
+
+
+def case_check_conflict(args, catalog):
+    rng = random.Random(0)
+    pairs = [(rng.choice(catalog), rng.choice(catalog)) for _ in range(args.pairs)]
+
+    def run():
+        for a, b in pairs:
+            build_script.check_conflict([a], b)
+
+    return summarize(measure(run, args.repeat), len(pairs), {"pairs": len(pairs)})
+
+
+def case_regex_parse(args, catalog):
+    def run():
+        for query in QUERIES:
+            subset.regex_parse_preferences(query, catalog, use_llm=False)
+
+    return summarize(measure(run, args.repeat), len(QUERIES), {"queries": len(QUERIES), "catalog": len(catalog)})
+
+
+def case_merge_courses(args, catalog):
+    # overlapping per-filter results, like fetch_filtered_courses returns
+    rng = random.Random(0)
+    lists = [rng.sample(catalog, min(len(catalog), args.merge_size)) for _ in range(args.merge_lists)]
+    times = measure(lambda: subset.merge_courses(lists), args.repeat)
+    return summarize(times, sum(map(len, lists)), {"lists": len(lists), "per_list": args.merge_size})
+
+
+# === backend ===
+
+def catalog_rows(catalog):
+    return [{name: section.get(name, "") for name in CATALOG_FIELDS} for section in catalog]
+
+
+def case_import(args, catalog):
+    rows = catalog_rows(catalog)
+    fresh = measure(lambda: import_rows(rows), args.db_repeat, setup=lambda: Course.objects.all().delete())
+    unchanged = measure(lambda: import_rows(rows), args.db_repeat)
+    return {
+        "import_fresh": summarize(fresh, len(rows), {"rows": len(rows)}),
+        "import_unchanged": summarize(unchanged, len(rows), {"rows": len(rows)}),
+    }
+
+
+def case_filters(args, catalog):
+    # leaves the catalog from case_import (or loads it) in the table
+    if Course.objects.count() != len(catalog):
+        Course.objects.all().delete()
+        import_rows(catalog_rows(catalog))
+    results = {}
+    for params in FILTERS:
+        name = "filter_" + "_".join(sorted(params))
+
+        def run(params=params):
+            filterset = CourseTimeFilter(params, queryset=Course.objects.order_by("pk"))
+            return len(filterset.qs)
+
+        matched = run()
+        results[name] = summarize(measure(run, args.db_repeat), matched, dict(params, catalog=len(catalog)))
+    return results
+
+
+def case_serializer(args, catalog):
+    queryset = Course.objects.order_by("pk")[:args.serialize_rows]
+    count = len(queryset)
+
+    def run():
+        return JSONRenderer().render(CourseSerializer(queryset, many=True).data)
+
+    return summarize(measure(run, args.db_repeat), count, {"rows": count})
+
+
+CASES = {
+    "solver": case_solver,
+    "check_conflict": case_check_conflict,
+    "regex_parse": case_regex_parse,
+    "merge_courses": case_merge_courses,
+    "import": case_import,
+    "filters": case_filters,
+    "serializer": case_serializer,
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args):
+    catalog = make_catalog(courses=args.courses, sections_per_course=args.sections_per_course,
+                           time_density=args.density, seed=args.seed)
+    results = {}
+    for name, case in CASES.items():
+        if args.only and name not in args.only:
+            continue
+        print(f"{name} ...", flush=True)
+        result = case(args, catalog)
+        # cases that time several variants return a dict of results
+        results.update(result if "median_ms" not in result else {name: result})
+    return {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": connection.vendor,
+        "catalog": {"courses": args.courses, "sections_per_course": args.sections_per_course,
+                    "density": args.density, "seed": args.seed, "sections": len(catalog)},
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Print old vs new medians; returns the names of cases that regressed."""
+    regressed = []
+    print(f"\n{'case':32} {'before ms':>10} {'after ms':>10} {'ratio':>7}")
+    for name, result in report["results"].items():
+        before = baseline["results"].get(name)
+        if not before or not before["median_ms"]:
+            print(f"{name:32} {'-':>10} {result['median_ms']:>10.3f}")
+            continue
+        ratio = result["median_ms"] / before["median_ms"]
+        flag = ""
+        if ratio > threshold:
+            regressed.append(name)
+            flag = "  <-- slower"
+        print(f"{name:32} {before['median_ms']:>10.3f} {result['median_ms']:>10.3f} {ratio:>6.2f}x{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--courses", type=int, default=40)
+    parser.add_argument("--sections-per-course", type=int, default=25)
+    parser.add_argument("--density", type=float, default=0.3, help="0 spreads sections over the day, 1 piles them up")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db-repeat", type=int, default=5)
+    parser.add_argument("--pairs", type=int, default=20000)
+    parser.add_argument("--merge-lists", type=int, default=8)
+    parser.add_argument("--merge-size", type=int, default=200)
+    parser.add_argument("--serialize-rows", type=int, default=1000)
+    parser.add_argument("--quick", action="store_true", help="small catalog and few repeats, for a smoke run")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES))
+    parser.add_argument("--output", help=f"result file (default: {os.path.relpath(RESULTS_DIR)}/<time>.json)")
+    parser.add_argument("--compare", metavar="RESULT_JSON", help="an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="ratio counted as a regression")
+    args = parser.parse_args()
+    if args.quick:
+        args.courses, args.sections_per_course = 10, 10
+        args.repeat, args.db_repeat, args.pairs = 3, 2, 2000
+
+    report = run_suite(args)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in report["results"].items():
+        print(f"{name:32} median {result['median_ms']:>10.3f} ms  {result['items_per_sec'] or 0:>12,.0f} items/s")
+    print(f"saved {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressed = compare(report, baseline, args.threshold)
+        if baseline.get("catalog") != report["catalog"]:
+            # different sizes time different work; the ratios are only a hint
+            print(f"catalog differs from the baseline ({baseline.get('catalog')}), not failing")
+        elif regressed:
+            print(f"regressions over {args.threshold}x: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
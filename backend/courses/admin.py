@@ -1,3 +1,12 @@
 from django.contrib import admin
 
+from .models import CatalogVersion
+
 # Register your models here.
+
+
+@admin.register(CatalogVersion)
+class CatalogVersionAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'created_at', 'source', 'inserted', 'updated', 'deleted', 'unchanged')
+    readonly_fields = list_display
+
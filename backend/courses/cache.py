@@ -0,0 +1,157 @@
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+def get_cache():
+    return caches[settings.COURSES_CACHE_ALIAS]
+
+
+# The newest CatalogVersion row (0 before the first import), read from the
+# database every time: an import_courses run in another process, or a single
+# edit in the admin, is seen by the very next request of every worker,
+# whatever the cache backend. One indexed query per request.
+def catalog_version():
+    from .models import CatalogVersion
+    return CatalogVersion.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+
+# same filters in any order, with or without blanks, share one entry
+def normalized_query(query_dict):
+    items = []
+    for key in sorted(query_dict):
+        for value in sorted(query_dict.getlist(key)):
+            value = value.strip()
+            if value:
+                items.append(f'{key}={value}')
+    return '&'.join(items)
+
+
+def response_cache_key(request, version):
+    # paginated bodies carry absolute next/previous links, so the host and
+    # scheme they were rendered for are part of the key
+    raw = '|'.join([
+        request.scheme,
+        request.get_host(),
+        request.path,
+        normalized_query(request.GET),
+        request.META.get('HTTP_ACCEPT', ''),
+    ])
+    digest = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    return f'courses:response:{version}:{digest}'
+
+
+def make_etag(body):
+    return '"%s"' % hashlib.sha256(body).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    return header.strip() == '*' or etag in [tag.strip() for tag in header.split(',')]
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit, not_modified=False):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if not_modified:
+                self.not_modified += 1
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            'catalog_version': catalog_version(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+stats = CacheStats()
+
+
+class CacheHit(Exception):
+    # raised from initial() to skip the handler, answered by handle_exception()
+    def __init__(self, response):
+        self.response = response
+
+
+# Serves GET/HEAD from the cache once DRF's initial() has run authentication,
+# permissions and throttling, but before the handler (no filters, queries or
+# serialization on a hit), and stores every 200 it renders. Entries are keyed
+# by the catalog version, so a new CatalogVersion retires all of them at once.
+# Streamed responses (format=ndjson) pass straight through, and so do
+# authenticated requests and the browsable API's HTML: the key doesn't say
+# who asked, and those pages show the user's name.
+class CachedResponseMixin:
+    cache_key = None
+    catalog_version = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.cache_key = None
+        if request.method not in ('GET', 'HEAD') or not settings.COURSES_CACHE_ENABLED:
+            return
+        if request.accepted_renderer.media_type == 'text/html' or request.user.is_authenticated:
+            return
+
+        self.catalog_version = catalog_version()
+        self.cache_key = response_cache_key(request, self.catalog_version)
+        entry = get_cache().get(self.cache_key)
+        if entry is not None:
+            self.cache_key = None  # nothing to store
+            not_modified = etag_matches(request, entry['etag'])
+            stats.record(hit=True, not_modified=not_modified)
+            if not_modified:
+                response = HttpResponseNotModified()
+            else:
+                response = HttpResponse(entry['body'], content_type=entry['content_type'])
+            raise CacheHit(self.tag(response, entry['etag'], 'HIT'))
+
+    def handle_exception(self, exc):
+        if isinstance(exc, CacheHit):
+            return exc.response
+        self.cache_key = None
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key, self.cache_key = self.cache_key, None
+        if key is None or response.status_code != 200 or response.streaming:
+            return response
+
+        if hasattr(response, 'render'):
+            response.render()
+        etag = make_etag(response.content)
+        get_cache().set(key, {
+            'body': response.content,
+            'content_type': response['Content-Type'],
+            'etag': etag,
+        }, settings.COURSES_CACHE_TIMEOUT)
+
+        not_modified = etag_matches(request, etag)
+        stats.record(hit=False, not_modified=not_modified)
+        if not_modified:
+            response = HttpResponseNotModified()
+        return self.tag(response, etag, 'MISS')
+
+    def tag(self, response, etag, result):
+        response['ETag'] = etag
+        response['X-Cache'] = result
+        # lets a client paging through the list notice an import in between
+        response['X-Catalog-Version'] = str(self.catalog_version)
+        patch_vary_headers(response, ['Accept'])
+        return response
@@ -1,5 +1,7 @@
 import django_filters
 from .models import Course
+from .search import search_queryset
+from .utils import day_mask, masks_within
 from datetime import datetime
 
 # this class is used to filter the courses based on the meeting days and times
@@ -10,6 +12,20 @@ class CourseTimeFilter(django_filters.FilterSet):
     instructor = django_filters.CharFilter(method='filter_by_instructor')
     course = django_filters.CharFilter(lookup_expr='icontains')
 
+    # range filters on the indexed integer columns
+    start_after = django_filters.TimeFilter(method='filter_start_after')
+    start_before = django_filters.TimeFilter(method='filter_start_before')
+    end_after = django_filters.TimeFilter(method='filter_end_after')
+    end_before = django_filters.TimeFilter(method='filter_end_before')
+    days_within = django_filters.CharFilter(method='filter_days_within')
+
+    # availability on the integer seat columns
+    open_only = django_filters.BooleanFilter(method='filter_open_only')
+    min_open_seats = django_filters.NumberFilter(field_name='seats_open', lookup_expr='gte')
+
+    # typo-tolerant instructor/title search, ranked best first
+    q = django_filters.CharFilter(method='filter_search')
+
     
     class Meta:
         model = Course
@@ -47,3 +63,31 @@ class CourseTimeFilter(django_filters.FilterSet):
     def filter_by_instructor(self, queryset, name, value):
         return queryset.filter(instructor__icontains=value.strip())
 
+    def filter_start_after(self, queryset, name, value):
+        return queryset.filter(start_minute__gte=value.hour * 60 + value.minute)
+
+    def filter_start_before(self, queryset, name, value):
+        return queryset.filter(start_minute__lte=value.hour * 60 + value.minute)
+
+    def filter_end_after(self, queryset, name, value):
+        return queryset.filter(end_minute__gte=value.hour * 60 + value.minute)
+
+    def filter_end_before(self, queryset, name, value):
+        return queryset.filter(end_minute__lte=value.hour * 60 + value.minute)
+
+    # every meeting day inside `value`: an IN over the (at most 127) subset masks
+    def filter_days_within(self, queryset, name, value):
+        mask = day_mask(value.strip())
+        if not mask:
+            return queryset.none()
+        return queryset.filter(day_mask__in=masks_within(mask))
+
+    def filter_open_only(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(seats_open__gt=0)
+
+    def filter_search(self, queryset, name, value):
+        if not value.strip():
+            return queryset
+        return search_queryset(queryset, value)
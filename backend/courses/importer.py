@@ -0,0 +1,178 @@
+from django.db import connection, transaction
+
+from .models import CATALOG_FIELDS, CatalogVersion, Course
+from .signals import catalog_changed
+from .utils import content_hash
+
+# Streaming, idempotent catalog import.
+#
+# Rows (dicts keyed by CATALOG_FIELDS) are consumed in fixed-size batches, so
+# only one batch is in memory at a time (plus the set of crns seen). Each batch
+# looks up the stored content_hash of its crns, skips rows that hash the same,
+# and upserts the rest with INSERT ... ON CONFLICT (crn) DO UPDATE. Courses of
+# the imported subjects that the import didn't mention are deleted at the end
+# (a MATH file leaves C S alone). It all runs in one transaction together with
+# the new CatalogVersion: a failed import leaves the catalog as it was, and
+# readers see either all of an import or none of it.
+
+UPSERT_FIELDS = [name for name in CATALOG_FIELDS if name != 'crn'] + [
+    'start_minute', 'end_minute', 'day_mask',
+    'seats_open', 'capacity', 'seats_taken', 'waitlist_count', 'content_hash',
+]
+
+
+class ImportResult:
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+        self.unchanged = 0
+        self.skipped = 0  # rows without a crn
+        self.version = None  # the CatalogVersion, if anything changed
+
+    @property
+    def changed(self):
+        return bool(self.inserted or self.updated or self.deleted)
+
+    @property
+    def total(self):
+        return self.inserted + self.updated + self.unchanged
+
+    def as_dict(self):
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'deleted': self.deleted,
+            'unchanged': self.unchanged,
+            'skipped': self.skipped,
+        }
+
+    def __str__(self):
+        return ', '.join(f'{count} {name}' for name, count in self.as_dict().items())
+
+
+# columns that can't be NULL get '' when the row doesn't have them
+REQUIRED_FIELDS = {field.name for field in Course._meta.concrete_fields if not field.null}
+
+
+def build_course(row):
+    course = Course(**{
+        name: row.get(name, '' if name in REQUIRED_FIELDS else None)
+        for name in CATALOG_FIELDS
+    })
+    course.refresh_time_fields()
+    course.refresh_seat_fields()
+    course.refresh_content_hash()
+    return course
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _upsert(courses):
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        Course.objects.bulk_create(courses, update_conflicts=True, unique_fields=['crn'], update_fields=UPSERT_FIELDS)
+        return
+    # both speak INSERT ... ON CONFLICT; executemany skips building the SQL
+    # per row, which is most of bulk_create's cost here
+    quote = connection.ops.quote_name
+    columns = ['crn'] + UPSERT_FIELDS
+    sql = 'INSERT INTO {table} ({columns}) VALUES ({values}) ON CONFLICT ({crn}) DO UPDATE SET {updates}'.format(
+        table=quote(Course._meta.db_table),
+        columns=', '.join(quote(column) for column in columns),
+        values=', '.join(['%s'] * len(columns)),
+        crn=quote('crn'),
+        updates=', '.join(f'{quote(column)} = EXCLUDED.{quote(column)}' for column in UPSERT_FIELDS),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [tuple(getattr(course, column) for column in columns) for course in courses])
+
+
+def _upsert_batch(rows, seen, subjects, result):
+    latest = {}
+    for row in rows:
+        crn = row.get('crn')
+        if not crn:
+            result.skipped += 1
+            continue
+        latest[crn] = row  # a crn repeated in the file: last one wins
+        subjects.add(row.get('subject') or '')
+
+    stored = dict(Course.objects.filter(crn__in=list(latest)).values_list('crn', 'content_hash'))
+    changed = []
+    for crn, row in latest.items():
+        # hash the raw row first, only changed rows are turned into Courses
+        row_hash = content_hash(row.get(name) for name in CATALOG_FIELDS)
+        if crn not in stored:
+            result.inserted += 1
+        elif stored[crn] != row_hash:
+            result.updated += 1
+        else:
+            result.unchanged += 1
+            seen.add(crn)
+            continue
+        changed.append(build_course(row))
+        seen.add(crn)
+
+    if changed:
+        _upsert(changed)
+
+
+def _delete_missing(seen, subjects, batch_size, result):
+    missing = []
+    courses = Course.objects.filter(subject__in=subjects).values_list('pk', 'crn')
+    for pk, crn in courses.iterator(chunk_size=5000):
+        if crn not in seen:
+            missing.append(pk)
+    # a plain DELETE: CourseQuerySet.delete() would record a CatalogVersion of
+    # its own, and the import records one for everything it did
+    quote = connection.ops.quote_name
+    chunk_size = min(batch_size, 500)  # bound parameters per statement
+    with connection.cursor() as cursor:
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            cursor.execute('DELETE FROM {table} WHERE {pk} IN ({values})'.format(
+                table=quote(Course._meta.db_table),
+                pk=quote(Course._meta.pk.column),
+                values=', '.join(['%s'] * len(chunk)),
+            ), chunk)
+            result.deleted += cursor.rowcount
+
+
+def _record_version(result, source):
+    result.version = CatalogVersion.objects.create(
+        source=source[:255],
+        inserted=result.inserted,
+        updated=result.updated,
+        deleted=result.deleted,
+        unchanged=result.unchanged,
+    )
+    version = result.version
+    transaction.on_commit(lambda: catalog_changed.send(sender=CatalogVersion, version=version))
+
+
+def import_rows(rows, batch_size=1000, delete_missing=True, source=''):
+    """Upsert an iterable of row dicts into Course; returns an ImportResult.
+
+    Only the crns (and subjects) seen are kept in memory, to find the courses
+    to delete.
+    """
+    result = ImportResult()
+    seen = set()
+    subjects = set()
+    with transaction.atomic():
+        for batch in _batches(rows, batch_size):
+            _upsert_batch(batch, seen, subjects, result)
+        if delete_missing:
+            _delete_missing(seen, subjects, batch_size, result)
+        if result.changed:
+            _record_version(result, source)
+    return result
@@ -1,40 +1,27 @@
-import csv
 from django.core.management.base import BaseCommand
-from courses.models import Course
+from courses.importer import import_rows
+from courses.parsers import PARSERS, parse_catalog
 
 class Command(BaseCommand):
-    help = 'Import courses from a CSV file'
+    help = 'Import courses from a registrar export, .csv or .xlsx (upserts on crn, so it is safe to re-run)'
 
     def add_arguments(self, parser):
-        parser.add_argument('csv_file', type=str, help='Path to the CSV file')
+        parser.add_argument('csv_file', type=str, help='Path to the .csv or .xlsx file')
+        parser.add_argument('--layout', choices=sorted(PARSERS), help='Skip layout detection (see courses/parsers.py)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per upsert')
+        parser.add_argument('--keep-missing', action='store_true',
+                            help="Don't delete courses of the file's subjects that aren't in it")
 
     def handle(self, *args, **kwargs):
         csv_file = kwargs['csv_file']
 
-        with open(csv_file, newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            courses = []
+        result = import_rows(
+            parse_catalog(csv_file, layout=kwargs['layout']),
+            batch_size=kwargs['batch_size'],
+            delete_missing=not kwargs['keep_missing'],
+            source=csv_file,
+        )
 
-            for row in reader:
-                course = Course(
-                    crn=row['crn'],
-                    subject=row['subject'],
-                    course=row['course'],
-                    section=row['section'],
-                    title=row['title'],
-                    instructor=row['instructor'],
-                    meeting_dates=row['meeting_dates'],
-                    meeting_time=row['meeting_time'],
-                    meeting_days=row['meeting_days'],
-                    meeting_location=row['meeting_location'],
-                    final_days=row['final_days'],
-                    final_time=row['final_time'],
-                    final_date=row['final_date'],
-                    final_location=row['final_location'],
-                    seats=row['seats'],
-                    waitlist=row['waitlist'],
-                )
-                courses.append(course)
-
-            Course.objects.bulk_create(courses)
-            self.stdout.write(self.style.SUCCESS(f'Successfully imported {len(courses)} courses'))
+        # caches move to the new version once the import commits
+        version = f' -> catalog v{result.version.pk}' if result.version else ''
+        self.stdout.write(self.style.SUCCESS(f'Imported {csv_file}: {result}{version}'))
@@ -0,0 +1,83 @@
+import glob
+import json
+import os
+import pstats
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SORT_KEYS = {'tottime': 2, 'cumtime': 3, 'calls': 1}
+
+
+def load_tags(prof_path):
+    try:
+        with open(prof_path[:-len('.prof')] + '.json') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'id': os.path.basename(prof_path)[:-len('.prof')]}
+
+
+def function_name(key, full_paths):
+    filename, line, name = key
+    if filename == '~':  # builtins
+        return name
+    if not full_paths:
+        filename = os.sep.join(filename.split(os.sep)[-2:])
+    return f'{filename}:{line}({name})'
+
+
+class Command(BaseCommand):
+    help = 'List the request profiles written by backend.profiling and summarize their hottest functions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help='Profile directory (default: PROFILING_DIR)')
+        parser.add_argument('--endpoint', help='Only profiles whose path, route or query contains this')
+        parser.add_argument('--list', action='store_true', help='List the profiles instead of summarizing them')
+        parser.add_argument('--top', type=int, default=25, help='How many functions to show')
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='tottime')
+        parser.add_argument('--full-paths', action='store_true', help="Don't shorten file paths")
+
+    def handle(self, *args, **kwargs):
+        directory = kwargs['dir'] or settings.PROFILING_DIR
+        paths = sorted(glob.glob(os.path.join(directory, '*.prof')), key=os.path.getmtime)
+        profiles = [(path, load_tags(path)) for path in paths]
+        if kwargs['endpoint']:
+            needle = kwargs['endpoint'].lower()
+            profiles = [
+                (path, tags) for path, tags in profiles
+                if any(needle in str(tags.get(key) or '').lower() for key in ('endpoint', 'route', 'query', 'query_string'))
+            ]
+        if not profiles:
+            raise CommandError(f'No profiles in {directory}')
+
+        if kwargs['list']:
+            for _, tags in profiles:
+                what = tags.get('query') or tags.get('query_string') or ''
+                self.stdout.write(
+                    f"{tags['id']}  {tags.get('method', '?'):4} {tags.get('endpoint', '?')}  "
+                    f"{tags.get('status', '-')}  {tags.get('duration_ms', 0):.1f} ms  "
+                    f"{tags.get('trigger', '')}  {what}"
+                )
+            return
+
+        self.summarize([path for path, _ in profiles], kwargs)
+
+    def summarize(self, paths, kwargs):
+        combined = pstats.Stats(paths[0])
+        seen_in = {}
+        for path in paths:
+            stats = combined if path == paths[0] else pstats.Stats(path)
+            for key in stats.stats:
+                seen_in[key] = seen_in.get(key, 0) + 1
+            if path != paths[0]:
+                combined.add(stats)
+
+        column = SORT_KEYS[kwargs['sort']]
+        rows = sorted(combined.stats.items(), key=lambda item: item[1][column], reverse=True)[:kwargs['top']]
+        self.stdout.write(f'{len(paths)} profiles, {combined.total_tt * 1000:.1f} ms profiled, top {len(rows)} by {kwargs["sort"]}\n')
+        self.stdout.write(f"{'tottime ms':>11} {'cumtime ms':>11} {'calls':>9} {'profiles':>9}  function")
+        for key, (_, calls, tottime, cumtime, _) in rows:
+            self.stdout.write(
+                f'{tottime * 1000:>11.1f} {cumtime * 1000:>11.1f} {calls:>9} {seen_in[key]:>9}  '
+                f'{function_name(key, kwargs["full_paths"])}'
+            )
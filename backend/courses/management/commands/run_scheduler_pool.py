@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from backend.views import import_scheduler
+
+
+class Command(BaseCommand):
+    help = ('Run schedule jobs on preforked workers that share one loaded model '
+            '(point the web servers at it with SCHEDULER_POOL_ADDRESS)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.SCHEDULER_WORKERS)
+        parser.add_argument('--address', default=settings.SCHEDULER_POOL_ADDRESS or None,
+                            help='host:port or socket path (default: SCHEDULER_POOL_ADDRESS)')
+        parser.add_argument('--no-preload', action='store_true',
+                            help="Don't load the model before forking (each worker loads its own copy)")
+
+    def handle(self, *args, **kwargs):
+        worker_pool = import_scheduler('worker_pool')
+        address = kwargs['address'] or worker_pool.DEFAULT_ADDRESS
+        authkey = settings.SCHEDULER_POOL_AUTHKEY.encode()
+        if not authkey:
+            # clients send pickles, so the socket is never left open
+            raise ImproperlyConfigured('Set SCHEDULER_POOL_AUTHKEY (the web servers need the same value)')
+
+        worker_pool.preload(load_model=not kwargs['no_preload'])
+        # each worker opens its own database connection, none is inherited
+        pool = worker_pool.WorkerPool(kwargs['workers'], before_fork=connections.close_all)
+        pool.start()
+        try:
+            pool.serve(address, authkey)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.shutdown()
@@ -0,0 +1,88 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:57
+
+import re
+
+from django.db import migrations, models
+
+# copies of courses.utils as of this migration, so later changes to the
+# helpers don't change what it computes
+
+DAY_BITS = {'M': 1, 'T': 2, 'W': 4, 'R': 8, 'F': 16, 'S': 32, 'U': 64}
+
+TIME_RE = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*([ap]m)\s*$', re.IGNORECASE)
+
+
+def time_to_minutes(value):
+    match = TIME_RE.match(value or '')
+    if not match:
+        return None
+    hour, minute, period = int(match.group(1)), int(match.group(2)), match.group(3).lower()
+    if period == 'pm' and hour != 12:
+        hour += 12
+    if period == 'am' and hour == 12:
+        hour = 0
+    return hour * 60 + minute
+
+
+def parse_meeting_time(meeting_time):
+    parts = (meeting_time or '').split('-')
+    if len(parts) != 2:
+        return None, None
+    start, end = time_to_minutes(parts[0]), time_to_minutes(parts[1])
+    if start is None or end is None:
+        return None, None
+    return start, end
+
+
+def day_mask(meeting_days):
+    mask = 0
+    for day in (meeting_days or '').upper():
+        mask |= DAY_BITS.get(day, 0)
+    return mask or None
+
+
+def populate_time_columns(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    courses = list(Course.objects.only('id', 'meeting_time', 'meeting_days'))
+    for course in courses:
+        course.start_minute, course.end_minute = parse_meeting_time(course.meeting_time)
+        course.day_mask = day_mask(course.meeting_days)
+    Course.objects.bulk_update(courses, ['start_minute', 'end_minute', 'day_mask'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_remove_course_num'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='day_mask',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='end_minute',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='start_minute',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['start_minute', 'end_minute'], name='course_start_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['end_minute'], name='course_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['day_mask', 'start_minute'], name='course_days_start_idx'),
+        ),
+        migrations.RunPython(populate_time_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# pg_trgm GIN indexes for ?q= search. They only exist on PostgreSQL, so they are
+# plain SQL here rather than Meta.indexes; other databases use the in-process
+# index in courses/search.py and skip this migration's work.
+
+TRIGRAM_INDEXES = {
+    'course_instructor_trgm_idx': 'instructor',
+    'course_title_trgm_idx': 'title',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON courses_course USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_course_time_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,63 @@
+import hashlib
+
+from django.db import migrations, models
+
+CATALOG_FIELDS = (
+    'crn', 'subject', 'course', 'section', 'title', 'instructor',
+    'meeting_dates', 'meeting_time', 'meeting_days', 'meeting_location',
+    'final_days', 'final_time', 'final_date', 'final_location',
+    'seats', 'waitlist',
+)
+
+
+# a copy of courses.utils.content_hash as of this migration
+def content_hash(values):
+    digest = hashlib.sha1()
+    for value in values:
+        digest.update((value or '').encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+# Re-running the old import_courses duplicated every row; keep the newest
+# copy of each crn so the unique constraint can go on.
+def dedupe_crns(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    keep = {}
+    duplicates = []
+    for pk, crn in Course.objects.order_by('pk').values_list('pk', 'crn').iterator(chunk_size=5000):
+        if crn in keep:
+            duplicates.append(keep[crn])
+        keep[crn] = pk
+    for start in range(0, len(duplicates), 500):
+        Course.objects.filter(pk__in=duplicates[start:start + 500]).delete()
+
+
+def populate_content_hash(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    courses = list(Course.objects.only('id', *CATALOG_FIELDS))
+    for course in courses:
+        course.content_hash = content_hash(getattr(course, name) for name in CATALOG_FIELDS)
+    Course.objects.bulk_update(courses, ['content_hash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_course_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_crns, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='course',
+            name='crn',
+            field=models.CharField(max_length=20, unique=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+        migrations.RunPython(populate_content_hash, migrations.RunPython.noop),
+    ]
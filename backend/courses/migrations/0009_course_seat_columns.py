@@ -0,0 +1,67 @@
+# Generated by Django 5.1.6 on 2026-10-18 10:18
+
+import re
+
+from django.db import migrations, models
+
+# copies of courses.utils as of this migration
+
+SEATS_RE = re.compile(r'^\s*(\d+)\s+out\s+of\s+(\d+)\s*$', re.IGNORECASE)
+WAITING_RE = re.compile(r'^\s*(\d+)\s+waiting\s*$', re.IGNORECASE)
+
+
+def parse_seats(seats):
+    match = SEATS_RE.match(seats or '')
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+
+def parse_waitlist(waitlist):
+    match = WAITING_RE.match(waitlist or '')
+    return int(match.group(1)) if match else 0
+
+
+def populate_seat_columns(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    courses = list(Course.objects.only('id', 'seats', 'waitlist'))
+    for course in courses:
+        course.seats_open, course.capacity = parse_seats(course.seats)
+        course.seats_taken = None if course.capacity is None else max(course.capacity - course.seats_open, 0)
+        course.waitlist_count = parse_waitlist(course.waitlist)
+    Course.objects.bulk_update(courses, ['seats_open', 'capacity', 'seats_taken', 'waitlist_count'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_catalog_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='seats_open',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='seats_taken',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='waitlist_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['seats_open'], name='course_seats_open_idx'),
+        ),
+        migrations.RunPython(populate_seat_columns, migrations.RunPython.noop),
+    ]
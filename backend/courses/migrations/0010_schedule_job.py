@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-18 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_course_seat_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleJob',
+            fields=[
+                ('id', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('status', models.CharField(max_length=10)),
+                ('state', models.JSONField()),
+                ('finished_at', models.FloatField(blank=True, db_index=True, null=True)),
+            ],
+        ),
+    ]
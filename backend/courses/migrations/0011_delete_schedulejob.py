@@ -0,0 +1,16 @@
+# Generated by Django 5.1.6 on 2026-10-18 10:57
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0010_schedule_job'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='ScheduleJob',
+        ),
+    ]
@@ -1,8 +1,33 @@
-from django.db import models
+from django.db import models, router, transaction
+
+from .utils import content_hash, day_mask, parse_meeting_time, parse_seats, parse_waitlist
+
+# the columns an import provides, in CSV order; content_hash covers exactly these
+CATALOG_FIELDS = (
+    'crn', 'subject', 'course', 'section', 'title', 'instructor',
+    'meeting_dates', 'meeting_time', 'meeting_days', 'meeting_location',
+    'final_days', 'final_time', 'final_date', 'final_location',
+    'seats', 'waitlist',
+)
+
+class CourseQuerySet(models.QuerySet):
+    def delete(self):
+        # one CatalogVersion for the lot, and no per-row signals, so the
+        # rows are deleted without being loaded (see courses.signals)
+        from .signals import record_edit
+        with transaction.atomic(using=self.db, savepoint=False):
+            deleted, counts = super().delete()
+            if deleted:
+                record_edit(f'delete of {deleted} courses', self.db, deleted=deleted)
+        return deleted, counts
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 
 class Course(models.Model):
     # num = models.IntegerField(null=True, blank=True)
-    crn = models.CharField(max_length=20)
+    crn = models.CharField(max_length=20, unique=True)
     subject = models.CharField(max_length=20)
     course = models.CharField(max_length=20)
     section = models.CharField(max_length=30)
@@ -22,20 +47,101 @@ class Course(models.Model):
     seats = models.CharField(max_length=50)
     waitlist = models.CharField(max_length=50)
 
+    # meeting_time / meeting_days as integers so the time filters can use indexes
+    start_minute = models.PositiveSmallIntegerField(null=True, blank=True)  # minutes after midnight
+    end_minute = models.PositiveSmallIntegerField(null=True, blank=True)
+    day_mask = models.PositiveSmallIntegerField(null=True, blank=True)  # see utils.DAY_BITS
+
+    # seats / waitlist as integers so availability filters run in the database
+    seats_open = models.PositiveIntegerField(null=True, blank=True)
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    seats_taken = models.PositiveIntegerField(null=True, blank=True)
+    waitlist_count = models.PositiveIntegerField(default=0)
+
+    # lets a re-import skip rows that didn't change
+    content_hash = models.CharField(max_length=40, blank=True, default='')
+
+    objects = CourseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_minute', 'end_minute'], name='course_start_end_idx'),
+            models.Index(fields=['end_minute'], name='course_end_idx'),
+            models.Index(fields=['day_mask', 'start_minute'], name='course_days_start_idx'),
+            models.Index(fields=['seats_open'], name='course_seats_open_idx'),
+        ]
+
     def __str__(self):
         return f"{self.subject} {self.course} - {self.title}"
 
+    def save(self, *args, **kwargs):
+        self.refresh_time_fields()
+        self.refresh_seat_fields()
+        self.refresh_content_hash()
+        super().save(*args, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        from .signals import record_edit
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            result = super().delete(using, keep_parents)
+            record_edit(f'delete of crn {self.crn}', using, deleted=1)
+        return result
+
+    # bulk_create skips save(), so importers call this themselves
+    def refresh_time_fields(self):
+        self.start_minute, self.end_minute = parse_meeting_time(self.meeting_time)
+        self.day_mask = day_mask(self.meeting_days)
+
+    def refresh_seat_fields(self):
+        self.seats_open, self.capacity = parse_seats(self.seats)
+        self.seats_taken = None if self.capacity is None else max(self.capacity - self.seats_open, 0)
+        self.waitlist_count = parse_waitlist(self.waitlist)
+
+    def refresh_content_hash(self):
+        self.content_hash = content_hash(getattr(self, name) for name in CATALOG_FIELDS)
+
+    # kept for callers of the old string parsing; the first number of
+    # "9 out of 120" is what it always returned
     def get_seat_capacity(self):
-        try:
-            return int(self.seats.split(' ')[0])
-        except ValueError:
-            return None
+        return self.seats_open
 
     def get_waitlist_count(self):
-        try:
-            if 'Waiting' in self.waitlist:
-                return int(self.waitlist.split(' ')[0])
-            else:
-                return 0
-        except ValueError:
-            return 0
+        return self.waitlist_count
+
+
+# One row per import that changed the catalog (and per transaction of ORM
+# edits, see courses.signals.record_edit). The import writes its courses and its CatalogVersion in one transaction, so
+# readers switch from the old catalog to the new one at commit, never seeing
+# half of it. The response cache and search index key on the newest row, so
+# every process sees the switch; courses.signals.catalog_changed also goes
+# out after commit.
+class CatalogVersion(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+    source = models.CharField(max_length=255, blank=True)  # the imported file
+    inserted = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    deleted = models.PositiveIntegerField(default=0)
+    unchanged = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-pk']
+
+    def __str__(self):
+        return f"Catalog v{self.pk} ({self.created_at:%Y-%m-%d %H:%M})"
+
+    @classmethod
+    def current(cls):
+        return cls.objects.order_by('-pk').first()
+
+    def as_dict(self):
+        return {
+            'version': self.pk,
+            'created_at': self.created_at.isoformat(),
+            'source': self.source,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'deleted': self.deleted,
+            'unchanged': self.unchanged,
+        }
+
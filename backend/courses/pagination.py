@@ -0,0 +1,10 @@
+from rest_framework.pagination import CursorPagination
+
+
+# Keyset pagination on the primary key: each page is `WHERE id > last ORDER BY id
+# LIMIT n`, so there is no COUNT(*) and deep pages cost the same as the first.
+# Opt in with ?pagination=cursor, then follow `next` (which carries ?cursor=).
+class CourseCursorPagination(CursorPagination):
+    ordering = 'id'  # not 'pk': the fast path pages .values() dicts, which only have 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
@@ -0,0 +1,165 @@
+import csv
+import itertools
+import os
+import re
+
+from .models import CATALOG_FIELDS
+
+# Registrar exports, in whatever layout they come, as row dicts keyed by
+# CATALOG_FIELDS (what courses.importer.import_rows takes). Everything is read
+# row by row, never a whole file at once.
+#
+# Layouts:
+#   flat    one course per row under a header, like data/cs.csv. Header names
+#           are matched loosely, so data/math.csv ("dates", no meeting
+#           columns) is the same layout with fewer fields.
+#   blocks  the scraped course pages in data/cs_times.csv: a summary row,
+#           then the page text (title, instructor, quick facts, description)
+#           and a "Meeting Dates / Meeting Times / Location / Meeting Days"
+#           table, over several rows per course.
+# Either can come as .csv or .xlsx (needs openpyxl).
+
+# header name -> Course field, for names that differ
+HEADER_ALIASES = {
+    'dates': 'meeting_dates',
+    'days': 'meeting_days',
+    'time': 'meeting_time',
+    'times': 'meeting_time',
+    'location': 'meeting_location',
+    'seats_left': 'seats',
+    'wait_list': 'waitlist',
+}
+
+# blocks: the summary row has the crn in this column, followed by these fields
+SUMMARY_COLUMN = 7
+SUMMARY_FIELDS = ('crn', 'subject', 'course', 'section', 'title', 'instructor', 'meeting_dates', 'seats', 'waitlist')
+MEETING_HEADER = ('Meeting Dates', 'Meeting Times', 'Location', 'Meeting Days')
+
+CRN_RE = re.compile(r'^\d{4,}$')
+# the course pages' placeholders, empty in the flat exports
+NOT_AVAILABLE_RE = re.compile(r'^\w+ not available$', re.IGNORECASE)
+
+
+class UnknownLayout(ValueError):
+    pass
+
+
+def _cell(value):
+    # xlsx cells come typed: 36057.0 -> "36057", None -> ""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def read_csv(path):
+    # utf-8-sig: the exports start with a byte order mark
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.reader(f):
+            yield [_cell(value) for value in row]
+
+
+def read_xlsx(path, sheet=None):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError('Reading .xlsx files needs openpyxl (pip install openpyxl)') from None
+    # read_only streams the sheet instead of building the whole workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.active
+        for row in worksheet.iter_rows(values_only=True):
+            yield [_cell(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def read_rows(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.xlsx', '.xlsm'):
+        return read_xlsx(path)
+    return read_csv(path)
+
+
+def _header_key(name):
+    key = re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+    return HEADER_ALIASES.get(key, key)
+
+
+def _summary(row):
+    """The summary row's fields, or None if `row` isn't one."""
+    if len(row) <= SUMMARY_COLUMN + 1 or any(row[1:SUMMARY_COLUMN]):
+        return None
+    if not row[0] and CRN_RE.match(row[SUMMARY_COLUMN]):
+        return dict(zip(SUMMARY_FIELDS, row[SUMMARY_COLUMN:]))
+    if CRN_RE.match(row[0]) and not CRN_RE.match(row[SUMMARY_COLUMN]):
+        # a few scraped rows have the crn in column 0 and the rest one cell early
+        return dict(zip(SUMMARY_FIELDS, [row[0]] + row[SUMMARY_COLUMN:]))
+    return None
+
+
+def detect_layout(row):
+    """'flat' or 'blocks' from the first non-empty row."""
+    keys = {_header_key(cell) for cell in row}
+    if 'crn' in keys:
+        return 'flat'
+    if _summary(row):
+        return 'blocks'
+    raise UnknownLayout(f'Unrecognized catalog layout, first row: {row[:10]}')
+
+
+def parse_flat(rows):
+    header = [_header_key(cell) for cell in next(rows)]
+    columns = [(i, key) for i, key in enumerate(header) if key in CATALOG_FIELDS]
+    for row in rows:
+        if not any(row):
+            continue
+        yield {key: row[i] if i < len(row) else '' for i, key in columns}
+
+
+def parse_blocks(rows):
+    record = None
+    in_meetings = False
+    has_meeting = False
+    for row in rows:
+        summary = _summary(row)
+        if summary:
+            if record:
+                yield record
+            record = summary
+            in_meetings = has_meeting = False
+            continue
+        if record is None:
+            continue
+        if tuple(row[1:5]) == MEETING_HEADER:
+            in_meetings = True
+            continue
+        if not in_meetings or len(row) < 5 or not any(row[1:5]):
+            continue
+        # column 0 can still hold the (multi-line) description next to a meeting row
+        dates, times, location, days = ('' if NOT_AVAILABLE_RE.match(cell) else cell for cell in row[1:5])
+        if 'final exam' in dates.lower():
+            record.update(final_date=dates, final_time=times, final_location=location, final_days=days)
+        elif not has_meeting:
+            # first meeting row wins; it is the one cs.csv has too
+            has_meeting = True
+            record.update(meeting_dates=dates, meeting_time=times, meeting_location=location, meeting_days=days)
+    if record:
+        yield record
+
+
+PARSERS = {
+    'flat': parse_flat,
+    'blocks': parse_blocks,
+}
+
+
+def parse_catalog(path, layout=None):
+    """Row dicts for every course in `path`; `layout` is detected if not given."""
+    rows = (row for row in read_rows(path) if any(row))
+    first = next(rows, None)
+    if first is None:
+        return iter(())
+    layout = layout or detect_layout(first)
+    return PARSERS[layout](itertools.chain([first], rows))
@@ -0,0 +1,60 @@
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder produces the same bytes
+    orjson = None
+
+# JSONRenderer escapes these two so the output is also valid JavaScript
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def _default(obj):
+    # anything orjson can't handle natively (lazy strings, Decimal, ...)
+    return JSONEncoder().default(obj)
+
+
+def dumps(data):
+    """Compact UTF-8 JSON, byte-for-byte what DRF's JSONRenderer writes."""
+    if orjson is None:
+        ret = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+    else:
+        ret = orjson.dumps(data, default=_default)
+    for raw, escaped in _LINE_SEPARATORS:
+        if raw in ret:
+            ret = ret.replace(raw, escaped)
+    return ret
+
+
+def ndjson_line(record):
+    return dumps(record) + b'\n'
+
+
+# JSONRenderer with orjson underneath. Pretty-printing (?indent=) and
+# non-default settings still go through DRF's own encoder.
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact or self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+# One JSON object per line. CourseListView streams this itself for ?format=ndjson;
+# render() only covers responses that go through DRF (errors, single objects).
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        records = data if isinstance(data, list) else [data]
+        return b''.join(ndjson_line(record) for record in records)
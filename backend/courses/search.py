@@ -0,0 +1,172 @@
+import re
+import threading
+import unicodedata
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+
+from .cache import catalog_version
+
+# Typo-tolerant search over instructor and title (?q= on /cs/courses/).
+#
+# PostgreSQL: pg_trgm word similarity, served by the GIN trigram indexes from
+# migration 0006. Everything else (SQLite in dev and tests): an in-process
+# trigram index over the distinct words of the catalog, rebuilt whenever the
+# catalog version changes.
+
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+def normalize(text):
+    # casefold and drop accents, so "Nunez" finds "Núñez"
+    text = unicodedata.normalize('NFKD', (text or '').casefold())
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def words(text):
+    return WORD_RE.findall(normalize(text))
+
+
+def trigrams(word):
+    # padded like pg_trgm: two spaces in front, one behind
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NgramIndex:
+    """Trigram index over the words of (key, text) documents.
+
+    A query word matches an indexed word when their trigram sets have a
+    Jaccard similarity of at least `threshold` ("sridar" vs "sridhar" is
+    5/10). A document scores the mean, over the query words, of its best
+    match for each, so every query word has to match something to rank high.
+    """
+
+    def __init__(self, documents, threshold=0.3):
+        self.threshold = threshold
+        keys = []
+        vocabulary = {}
+        postings = []  # word id -> document positions
+        for position, (key, text) in enumerate(documents):
+            keys.append(key)
+            for word in set(words(text)):
+                word_id = vocabulary.setdefault(word, len(vocabulary))
+                if word_id == len(postings):
+                    postings.append([])
+                postings[word_id].append(position)
+
+        self.keys = np.array(keys)
+        self.postings = [np.array(docs, dtype=np.int32) for docs in postings]
+        self.word_grams = [None] * len(vocabulary)
+        self.by_gram = {}  # trigram -> word ids
+        for word, word_id in vocabulary.items():
+            grams = trigrams(word)
+            self.word_grams[word_id] = len(grams)
+            for gram in grams:
+                self.by_gram.setdefault(gram, []).append(word_id)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def similar_words(self, word):
+        """(word id, similarity) for every indexed word close enough to `word`."""
+        grams = trigrams(word)
+        shared = {}
+        for gram in grams:
+            for word_id in self.by_gram.get(gram, ()):
+                shared[word_id] = shared.get(word_id, 0) + 1
+        for word_id, count in shared.items():
+            similarity = count / (len(grams) + self.word_grams[word_id] - count)
+            if similarity >= self.threshold:
+                yield word_id, similarity
+
+    def search(self, query, limit=None):
+        """[(key, score)] best first, ties in document order."""
+        query_words = words(query)
+        if not query_words or not len(self.keys):
+            return []
+        total = np.zeros(len(self.keys), dtype=np.float32)
+        for word in query_words:
+            best = np.zeros(len(self.keys), dtype=np.float32)
+            for word_id, similarity in self.similar_words(word):
+                docs = self.postings[word_id]
+                best[docs] = np.maximum(best[docs], similarity)
+            total += best
+        total /= len(query_words)
+
+        hits = np.flatnonzero(total >= self.threshold)
+        # stable sort on -score keeps document (pk) order among ties
+        hits = hits[np.argsort(-total[hits], kind='stable')]
+        if limit is not None:
+            hits = hits[:limit]
+        return [(self.keys[i].item(), round(float(total[i]), 4)) for i in hits]
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def build_index():
+    from .models import Course
+    rows = Course.objects.order_by('pk').values_list('pk', 'instructor', 'title')
+    return NgramIndex(((pk, f'{instructor} {title}') for pk, instructor, title in rows.iterator(chunk_size=5000)),
+                      threshold=settings.COURSES_SEARCH_THRESHOLD)
+
+
+def get_index():
+    """The in-process index for the current catalog version, built on first use."""
+    global _index, _index_version
+    version = catalog_version()
+    with _index_lock:
+        if _index is None or _index_version != version:
+            _index = build_index()
+            _index_version = version
+        return _index
+
+
+# pks per IN (...) when checking hits against the other filters
+FILTER_CHUNK = 500
+
+
+def matching_pks(queryset, ranked, limit):
+    """The first `limit` pks of `ranked` (best first) that `queryset` contains.
+
+    Hits are checked against the queryset's own filters in rank order, a
+    chunk at a time, so days_within & co. drop non-matches before the cut
+    rather than after it, and the final IN (...) list stays bounded.
+    """
+    if not queryset.query.has_filters():
+        return ranked[:limit]
+    kept = []
+    for start in range(0, len(ranked), FILTER_CHUNK):
+        chunk = ranked[start:start + FILTER_CHUNK]
+        allowed = set(queryset.filter(pk__in=chunk).values_list('pk', flat=True))
+        kept.extend(pk for pk in chunk if pk in allowed)
+        if len(kept) >= limit:
+            break
+    return kept[:limit]
+
+
+def search_queryset(queryset, query):
+    """Courses in `queryset` matching `query`, best match first."""
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        return queryset.filter(
+            Q(instructor__trigram_word_similar=query) | Q(title__trigram_word_similar=query)
+        ).annotate(
+            search_rank=Greatest(TrigramWordSimilarity(query, 'instructor'), TrigramWordSimilarity(query, 'title'))
+        ).order_by('-search_rank', 'pk')
+
+    ranked = matching_pks(queryset, [pk for pk, _ in get_index().search(query)], settings.COURSES_SEARCH_LIMIT)
+    if not ranked:
+        return queryset.none()
+    # rank order as the pk's offset in ",7,3,12,": one SQL expression instead of
+    # a CASE with a branch per pk, which costs Django more to build than the search
+    pk_column = f'{connection.ops.quote_name(queryset.model._meta.db_table)}.{connection.ops.quote_name(queryset.model._meta.pk.column)}'
+    position = RawSQL(f"instr(%s, ',' || {pk_column} || ',')", (',' + ','.join(map(str, ranked)) + ',',))
+    return queryset.filter(pk__in=ranked).order_by(position)
@@ -0,0 +1,63 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save
+from django.dispatch import Signal, receiver
+
+from .models import CatalogVersion, Course
+
+# Sent after a transaction that changed the catalog (an import, or edits
+# through the ORM) has committed, with version=<CatalogVersion>. It only
+# fires in the process that made the change, so nothing in the tree relies
+# on it: the response cache and the search index read catalog_version()
+# from the database on every request, and the scheduler's title matcher and
+# preference cache key on a fingerprint of the titles they are handed.
+# In-process extras can subscribe here.
+catalog_changed = Signal()
+
+
+class CatalogEdit:
+    # the CatalogVersion of one transaction's edits; queued with on_commit,
+    # which is also where the next edit of the same transaction finds it
+    def __init__(self, version):
+        self.version = version
+        self.edits = 1
+        self.committed = False
+
+    def __call__(self):
+        self.committed = True
+        catalog_changed.send(sender=CatalogVersion, version=self.version)
+
+
+def _pending_edit(using):
+    # run_on_commit is dropped on rollback (and trimmed on savepoint
+    # rollback), so a CatalogEdit found there belongs to a live transaction
+    for _, callback, _ in transaction.get_connection(using).run_on_commit:
+        if isinstance(callback, CatalogEdit) and not callback.committed:
+            return callback
+    return None
+
+
+def record_edit(source, using=None, inserted=0, updated=0, deleted=0):
+    """Version a change made outside import_courses: one CatalogVersion per
+    transaction, written inside it, however many rows the transaction edits."""
+    edit = _pending_edit(using)
+    if edit is None:
+        version = CatalogVersion.objects.using(using).create(
+            source=source[:255], inserted=inserted, updated=updated, deleted=deleted)
+        transaction.on_commit(CatalogEdit(version), using=using)
+        return
+    edit.edits += 1
+    CatalogVersion.objects.using(using).filter(pk=edit.version.pk).update(
+        source=f'{edit.edits} edits',
+        inserted=F('inserted') + inserted,
+        updated=F('updated') + updated,
+        deleted=F('deleted') + deleted,
+    )
+
+
+# single-row saves (admin, shell) change the catalog too. Deletes are
+# versioned by Course.delete() and CourseQuerySet.delete() instead: a
+# post_delete receiver would make every QuerySet.delete() load its rows.
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, created, using, **kwargs):
+    record_edit(f'edit of crn {instance.crn}', using, inserted=int(created), updated=int(not created))
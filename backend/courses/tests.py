@@ -1,3 +1,484 @@
-from django.test import TestCase
+import base64
+import importlib.util
+import io
+import json
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
\ No newline at end of file
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+
+from courses import cache, importer
+from courses.models import CatalogVersion, Course
+from courses.parsers import UnknownLayout, detect_layout, parse_catalog, read_rows
+from courses.renderers import FastJSONRenderer
+from courses.search import NgramIndex
+from courses.utils import day_mask, masks_within, parse_meeting_time, parse_seats, parse_waitlist
+from courses.views import CourseListView
+
+
+def make_course(crn, meeting_days, meeting_time, **fields):
+    data = dict(crn=crn, subject='C S', course='2413', section='10', title='Data Structures',
+                instructor='Radhakrishnan, Sridhar', seats='9 out of 120', waitlist='0 Waiting',
+                meeting_days=meeting_days, meeting_time=meeting_time)
+    data.update(fields)
+    # committed, as far as the catalog version goes: outside a test every
+    # create is its own transaction, and so gets its own CatalogVersion
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        return Course.objects.create(**data)
+
+
+class TimeParsingTests(TestCase):
+
+    def test_parse_meeting_time(self):
+        self.assertEqual(parse_meeting_time('12:00 pm - 1:15 pm'), (720, 795))
+        self.assertEqual(parse_meeting_time('12:30 am - 1:00 am'), (30, 60))
+        self.assertEqual(parse_meeting_time('Asynchronous'), (None, None))
+        self.assertEqual(parse_meeting_time(None), (None, None))
+
+    def test_day_mask(self):
+        self.assertEqual(day_mask('MWF'), 1 | 4 | 16)
+        self.assertIsNone(day_mask(''))
+        self.assertEqual(sorted(masks_within(day_mask('TR'))), [2, 8, 10])
+
+    def test_parse_seats_and_waitlist(self):
+        self.assertEqual(parse_seats('9 out of 120'), (9, 120))
+        self.assertEqual(parse_seats(''), (None, None))
+        self.assertEqual(parse_waitlist('12 Waiting'), 12)
+        self.assertEqual(parse_waitlist('No Wait List'), 0)
+
+
+class TimeColumnFilterTests(TestCase):
+
+    def setUp(self):
+        make_course('1', 'MWF', '9:00 am - 9:50 am')
+        make_course('2', 'MWF', '10:00 am - 10:50 am')
+        make_course('3', 'TR', '10:30 am - 11:45 am')
+        make_course('4', 'F', '1:00 pm - 2:50 pm')
+        make_course('5', 'M', '1:00 pm - 1:50 pm')
+        make_course('6', '', 'Asynchronous')
+
+    def crns(self, **params):
+        response = self.client.get(reverse('course-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(c['crn'] for c in response.json()['results'])
+
+    def test_columns_filled_on_save(self):
+        course = Course.objects.get(crn='3')
+        self.assertEqual((course.start_minute, course.end_minute, course.day_mask), (630, 705, 2 | 8))
+        self.assertIsNone(Course.objects.get(crn='6').start_minute)
+
+    def test_start_and_end_range(self):
+        self.assertEqual(self.crns(start_after='10:00', end_before='14:00'), ['2', '3', '5'])
+
+    def test_days_within(self):
+        self.assertEqual(self.crns(days_within='MWF'), ['1', '2', '4', '5'])
+        self.assertEqual(self.crns(days_within='mw'), ['5'])
+
+    def test_combined(self):
+        self.assertEqual(self.crns(start_after='10:00', end_before='14:00', days_within='MWF'), ['2', '5'])
+
+
+class SeatFilterTests(TestCase):
+
+    def setUp(self):
+        make_course('1', 'MWF', '9:00 am - 9:50 am', seats='9 out of 120')
+        make_course('2', 'MWF', '10:00 am - 10:50 am', seats='0 out of 60', waitlist='4 Waiting')
+        make_course('3', 'TR', '10:30 am - 11:45 am', seats='2 out of 30')
+        make_course('4', 'F', '1:00 pm - 2:50 pm', seats='TBA')
+
+    def crns(self, **params):
+        response = self.client.get(reverse('course-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(c['crn'] for c in response.json()['results'])
+
+    def test_columns_filled_on_save(self):
+        course = Course.objects.get(crn='2')
+        self.assertEqual((course.seats_open, course.capacity, course.seats_taken, course.waitlist_count), (0, 60, 60, 4))
+        self.assertIsNone(Course.objects.get(crn='4').seats_open)
+
+    def test_open_only(self):
+        self.assertEqual(self.crns(open_only='true'), ['1', '3'])
+        self.assertEqual(self.crns(open_only='false'), ['1', '2', '3', '4'])
+
+    def test_min_open_seats(self):
+        self.assertEqual(self.crns(min_open_seats=3), ['1'])
+
+
+class CourseListStreamingTests(TestCase):
+
+    def setUp(self):
+        for crn in range(1, 8):
+            make_course(str(crn), 'MWF', '9:00 am - 9:50 am', course='2413' if crn % 2 else '3113')
+
+    def test_ndjson_streams_every_match_in_pk_order(self):
+        response = self.client.get(reverse('course-list'), {'format': 'ndjson', 'course': '2413'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['crn'] for line in lines], ['1', '3', '5', '7'])
+
+    def test_ndjson_matches_json_records(self):
+        streamed = b''.join(self.client.get(reverse('course-list'), {'format': 'ndjson'}).streaming_content)
+        paged = self.client.get(reverse('course-list')).json()['results']
+        self.assertEqual([json.loads(line) for line in streamed.decode().splitlines()],
+                         sorted(paged, key=lambda c: c['id']))
+
+    def test_cursor_pagination_walks_by_pk(self):
+        url, params, crns = reverse('course-list'), {'pagination': 'cursor', 'page_size': 3}, []
+        pages = 0
+        while url:
+            data = self.client.get(url, params).json()
+            self.assertNotIn('count', data)
+            crns += [c['crn'] for c in data['results']]
+            url, params = data['next'], None
+            pages += 1
+        self.assertEqual(pages, 3)
+        self.assertEqual(crns, [str(crn) for crn in range(1, 8)])
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.cache = cache
+        self.course = make_course('1', 'MWF', '9:00 am - 9:50 am')
+
+    def test_second_request_is_served_from_cache(self):
+        url = reverse('course-list')
+        first = self.client.get(url, {'course': '2413', 'meeting_days': 'MWF'})
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(1):  # the catalog version
+            # same filters, different order
+            second = self.client.get(f'{url}?meeting_days=MWF&course=2413')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_if_none_match_returns_304(self):
+        url = reverse('course-detail', args=[self.course.pk])
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):  # the catalog version
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_hits_still_check_permissions(self):
+        url = reverse('course-list')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with mock.patch.object(CourseListView, 'permission_classes', [IsAuthenticated]):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+    def test_html_and_authenticated_requests_bypass_the_cache(self):
+        User.objects.create_user('ada', password='pw12345!')
+        basic = 'Basic ' + base64.b64encode(b'ada:pw12345!').decode()
+        url = reverse('course-detail', args=[self.course.pk])
+        page = self.client.get(url, HTTP_ACCEPT='text/html', HTTP_AUTHORIZATION=basic)
+        self.assertContains(page, 'ada')
+        self.assertFalse(page.has_header('X-Cache'))
+        self.assertFalse(self.client.get(url, HTTP_AUTHORIZATION=basic).has_header('X-Cache'))
+        anonymous = self.client.get(url, HTTP_ACCEPT='text/html')
+        self.assertFalse(anonymous.has_header('X-Cache'))
+        self.assertNotContains(anonymous, 'ada')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+
+    def test_host_is_part_of_the_key(self):
+        url = reverse('course-list')
+        self.client.get(url, {'page_size': 1})
+        other = self.client.get(url, {'page_size': 1}, HTTP_HOST='localhost')
+        self.assertEqual(other['X-Cache'], 'MISS')
+
+    def test_catalog_change_invalidates(self):
+        url = reverse('course-list')
+        before = self.client.get(url)
+        make_course('2', 'TR', '10:30 am - 11:45 am')
+        after = self.client.get(url, HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after['X-Cache'], 'MISS')
+        self.assertEqual(len(after.json()['results']), 2)
+
+    def test_version_from_another_process(self):
+        # an import_courses run elsewhere: no signal here, only the new row
+        url = reverse('course-list')
+        self.client.get(url)
+        CatalogVersion.objects.create(source='other.csv')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response['X-Catalog-Version'], str(CatalogVersion.current().pk))
+
+    def test_import_bumps_version(self):
+        version = self.cache.catalog_version()
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('crn,subject,course,section,title,instructor,meeting_dates,meeting_time,meeting_days,'
+                    'meeting_location,final_days,final_time,final_date,final_location,seats,waitlist\n')
+            f.write('9,C S,3113,1,Operating Systems,Staff,,1:30 pm - 2:45 pm,TR,,,,,,1 out of 5,0 Waiting\n')
+        self.addCleanup(os.remove, f.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_courses', f.name, '--keep-missing', stdout=open(os.devnull, 'w'))
+        self.assertGreater(self.cache.catalog_version(), version)
+
+    def test_stats(self):
+        url = reverse('course-list')
+        self.client.get(url)
+        self.client.get(url)
+        data = self.client.get(reverse('course-cache-stats')).json()
+        self.assertGreaterEqual(data['hits'], 1)
+        self.assertGreater(data['hit_rate'], 0)
+
+
+class FastSerializationTests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        make_course('1', 'MWF', '9:00 am - 9:50 am', instructor='Núñez, José \u2028 "Pepe"')
+        make_course('2', '', 'Asynchronous', meeting_location=None)
+        make_course('3', 'TR', '10:30 am - 11:45 am', course='3113')
+
+    def fetch(self, fast, **params):
+        with override_settings(COURSES_FAST_JSON=fast, COURSES_CACHE_ENABLED=False):
+            response = self.client.get(reverse('course-list'), params)
+            return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_fast_path_is_byte_compatible(self):
+        for params in ({}, {'course': '3113'}, {'pagination': 'cursor', 'page_size': 2}, {'format': 'ndjson'}):
+            with self.subTest(**params):
+                self.assertEqual(self.fetch(True, **params), self.fetch(False, **params))
+
+    def test_renderer_matches_drf(self):
+        data = {'title': 'Data Structures \u2029 é', 'seats': None, 'n': [1, 2]}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        cache.get_cache().clear()
+        make_course('1', 'MWF', '9:00 am - 9:50 am')
+        make_course('2', 'TR', '10:30 am - 11:45 am', course='3113', title='Operating Systems',
+                    instructor='Núñez, José')
+        make_course('3', 'MWF', '1:00 pm - 1:50 pm', course='4013', title='Database Management Systems',
+                    instructor='Sridhar, Anand')
+        make_course('4', 'F', '1:00 pm - 2:50 pm', course='1213', title='Programming with Python',
+                    instructor='Chekuri, Omkar')
+
+    def crns(self, **params):
+        response = self.client.get(reverse('course-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return [c['crn'] for c in response.json()['results']]
+
+    def test_typo_in_instructor(self):
+        self.assertEqual(self.crns(q='Sridar'), ['1', '3'])
+        # every query word has to match
+        self.assertEqual(self.crns(q='Sridar Anand'), ['3'])
+
+    def test_title_and_accents(self):
+        self.assertEqual(self.crns(q='operating sytems'), ['2'])
+        self.assertEqual(self.crns(q='nunez'), ['2'])
+
+    def test_combines_with_other_filters(self):
+        self.assertEqual(self.crns(q='Sridhar', days_within='MWF', start_after='12:00'), ['3'])
+
+    def test_other_filters_apply_before_the_limit(self):
+        for n in range(5, 9):
+            make_course(str(n), 'MWF', '8:00 am - 8:50 am', title='Operating Systems', instructor='Sridhar, Anand')
+        with override_settings(COURSES_SEARCH_LIMIT=2):
+            # the four 8:00 sections outrank crn 3, but start_after drops them
+            self.assertEqual(self.crns(q='Sridhar Anand Operating', start_after='12:00'), ['3'])
+            self.assertEqual(self.crns(q='Sridhar Anand Operating'), ['5', '6'])
+
+    def test_ndjson_keeps_rank_order(self):
+        response = self.client.get(reverse('course-list'), {'q': 'Sridhar Anand', 'format': 'ndjson'})
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual([json.loads(line)['crn'] for line in lines], ['3', '1'])
+
+    def test_cursor_pagination_rejects_q(self):
+        response = self.client.get(reverse('course-list'), {'q': 'Sridar', 'pagination': 'cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_no_match(self):
+        self.assertEqual(self.crns(q='zzzzqqq'), [])
+
+    def test_index_follows_catalog_changes(self):
+        self.assertEqual(self.crns(q='Haskell'), [])
+        make_course('5', 'TR', '9:00 am - 10:15 am', title='Functional Programming', instructor='Haskell, Curry')
+        self.assertEqual(self.crns(q='Haskel'), ['5'])
+
+
+class NgramIndexTests(TestCase):
+
+    def test_ranking(self):
+        index = NgramIndex([(1, 'Data Structures'), (2, 'Database Systems'), (3, 'Discrete Structures')])
+        self.assertEqual(index.search('data structures'), [(1, 1.0), (3, 0.5)])
+        self.assertEqual([key for key, _ in index.search('databse')], [2, 1])
+        self.assertEqual(index.search(''), [])
+
+
+class ImportCoursesTests(TestCase):
+
+    HEADER = ('crn,subject,course,section,title,instructor,meeting_dates,meeting_time,meeting_days,'
+              'meeting_location,final_days,final_time,final_date,final_location,seats,waitlist\n')
+
+    def write_csv(self, *lines):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8-sig') as f:
+            f.write(self.HEADER + ''.join(line + '\n' for line in lines))
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def run_import(self, path, *args):
+        out = io.StringIO()
+        call_command('import_courses', path, '--batch-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    ROW_1 = '1,C S,2413,10,Data Structures,"Sridhar, R",,9:00 am - 9:50 am,MWF,,,,,,9 out of 120,0 Waiting'
+    ROW_2 = '2,C S,3113,10,Operating Systems,Staff,,10:30 am - 11:45 am,TR,,,,,,1 out of 60,0 Waiting'
+    ROW_3 = '3,C S,1213,10,Programming with Python,Staff,,1:00 pm - 1:50 pm,F,,,,,,5 out of 30,0 Waiting'
+
+    def test_rerun_is_idempotent(self):
+        path = self.write_csv(self.ROW_1, self.ROW_2, self.ROW_3)
+        self.assertIn('3 inserted, 0 updated, 0 deleted, 0 unchanged', self.run_import(path))
+        self.assertIn('0 inserted, 0 updated, 0 deleted, 3 unchanged', self.run_import(path))
+        self.assertEqual(Course.objects.count(), 3)
+
+    def test_updates_and_deletes(self):
+        self.run_import(self.write_csv(self.ROW_1, self.ROW_2, self.ROW_3))
+        changed = self.ROW_2.replace('1 out of 60', '0 out of 60').replace('10:30 am - 11:45 am', '1:30 pm - 2:45 pm')
+        output = self.run_import(self.write_csv(self.ROW_1, changed))
+        self.assertIn('0 inserted, 1 updated, 1 deleted, 1 unchanged', output)
+        course = Course.objects.get(crn='2')
+        self.assertEqual((course.seats, course.start_minute), ('0 out of 60', 810))
+        self.assertFalse(Course.objects.filter(crn='3').exists())
+
+    def test_other_subjects_are_kept(self):
+        self.run_import(self.write_csv(self.ROW_1, self.ROW_2))
+        math = '4,MATH,1823,10,Calculus I,Staff,,9:00 am - 9:50 am,MWF,,,,,,3 out of 40,0 Waiting'
+        self.assertIn('1 inserted, 0 updated, 0 deleted', self.run_import(self.write_csv(math)))
+        self.assertEqual(Course.objects.count(), 3)
+
+    def test_keep_missing(self):
+        self.run_import(self.write_csv(self.ROW_1, self.ROW_2))
+        self.assertIn('0 deleted', self.run_import(self.write_csv(self.ROW_1), '--keep-missing'))
+        self.assertEqual(Course.objects.count(), 2)
+
+    def test_failed_import_changes_nothing(self):
+        self.run_import(self.write_csv(self.ROW_1))
+        build_course = importer.build_course
+
+        def fail_on_third(row):
+            if row['crn'] == '3':
+                raise ValueError('bad row')
+            return build_course(row)
+
+        # ROW_2 is upserted in the first batch before the second one fails
+        with mock.patch.object(importer, 'build_course', fail_on_third), self.assertRaises(ValueError):
+            self.run_import(self.write_csv(self.ROW_2, self.ROW_1, self.ROW_3))
+        self.assertEqual(list(Course.objects.values_list('crn', flat=True)), ['1'])
+
+    def test_import_records_catalog_version(self):
+        path = self.write_csv(self.ROW_1, self.ROW_2)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertIn('-> catalog v', self.run_import(path))
+        self.assertEqual(len(callbacks), 1)  # catalog_changed waits for the commit
+        version = CatalogVersion.current()
+        self.assertEqual((version.source, version.inserted), (path, 2))
+
+        # nothing changed, no new version
+        self.run_import(path)
+        self.assertEqual(CatalogVersion.objects.count(), 1)
+
+        response = self.client.get(reverse('catalog-version'))
+        self.assertEqual(response.json()['version'], version.pk)
+
+    def test_failed_import_records_no_version(self):
+        with mock.patch.object(importer, 'build_course', side_effect=ValueError), self.assertRaises(ValueError):
+            self.run_import(self.write_csv(self.ROW_1))
+        self.assertFalse(CatalogVersion.objects.exists())
+        self.assertEqual(self.client.get(reverse('catalog-version')).status_code, 404)
+
+
+class CatalogEditTests(TestCase):
+
+    def setUp(self):
+        for crn in ('1', '2', '3'):
+            make_course(crn, 'MWF', '9:00 am - 9:50 am')
+
+    def test_bulk_delete_records_one_version(self):
+        before = CatalogVersion.objects.count()
+        # the DELETE and the version: no rows loaded for per-row signals
+        with self.captureOnCommitCallbacks() as callbacks, self.assertNumQueries(2):
+            Course.objects.all().delete()
+        self.assertEqual(CatalogVersion.objects.count(), before + 1)
+        self.assertEqual((CatalogVersion.current().source, CatalogVersion.current().deleted), ('delete of 3 courses', 3))
+        self.assertEqual(len(callbacks), 1)
+
+    def test_one_version_per_transaction(self):
+        before = CatalogVersion.objects.count()
+        with self.captureOnCommitCallbacks() as callbacks, transaction.atomic():
+            Course.objects.create(crn='4', subject='C S', course='3113', section='10', title='Operating Systems',
+                                  instructor='Staff', seats='1 out of 60', waitlist='0 Waiting')
+            course = Course.objects.get(crn='1')
+            course.title = 'Algorithms'
+            course.save()
+            Course.objects.get(crn='2').delete()
+        version = CatalogVersion.current()
+        self.assertEqual(CatalogVersion.objects.count(), before + 1)
+        self.assertEqual((version.source, version.inserted, version.updated, version.deleted), ('3 edits', 1, 1, 1))
+        self.assertEqual(len(callbacks), 1)
+
+
+class CatalogParserTests(TestCase):
+
+    def data_file(self, name):
+        return str(settings.BASE_DIR / 'data' / name)
+
+    def test_detects_layouts(self):
+        self.assertEqual(detect_layout(next(read_rows(self.data_file('cs.csv')))), 'flat')
+        self.assertEqual(detect_layout(next(read_rows(self.data_file('math.csv')))), 'flat')
+        self.assertEqual(detect_layout(next(read_rows(self.data_file('cs_times.csv')))), 'blocks')
+
+    def test_blocks_match_flat_export(self):
+        flat = {row['crn']: row for row in parse_catalog(self.data_file('cs.csv'))}
+        blocks = {row['crn']: row for row in parse_catalog(self.data_file('cs_times.csv'))}
+        self.assertEqual(set(blocks), set(flat))
+        for crn, row in flat.items():
+            for field in ('subject', 'course', 'section', 'title', 'instructor', 'meeting_days'):
+                self.assertEqual(blocks[crn][field], row[field], (crn, field))
+        self.assertEqual(blocks['36057']['meeting_time'], '1:00 pm - 1:50 pm')
+        self.assertEqual(blocks['36057']['final_date'], 'May 8 (Final Exam)')
+        # placeholders and the crn-in-column-0 summary rows
+        self.assertEqual(blocks['17790']['meeting_time'], '')
+        self.assertEqual(blocks['17791']['instructor'], 'Maiti, Anindya')
+
+    def test_math_layout(self):
+        row = next(parse_catalog(self.data_file('math.csv')))
+        self.assertEqual(row['meeting_dates'], 'Jan 13 - May 2')
+        self.assertNotIn('meeting_time', row)
+
+    def test_unknown_layout(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('foo,bar\n1,2\n')
+        self.addCleanup(os.remove, f.name)
+        with self.assertRaises(UnknownLayout):
+            parse_catalog(f.name)
+
+    def test_xlsx_matches_csv(self):
+        if importlib.util.find_spec('openpyxl') is None:
+            self.skipTest('openpyxl not installed')
+        from_xlsx = {row['crn']: row['meeting_time'] for row in parse_catalog(self.data_file('cs_times.xlsx'))}
+        from_csv = {row['crn']: row['meeting_time'] for row in parse_catalog(self.data_file('cs_times.csv'))}
+        self.assertEqual(from_xlsx, from_csv)
+
+    def test_import_other_subject_keeps_existing(self):
+        call_command('import_courses', self.data_file('cs_times.csv'), stdout=io.StringIO())
+        call_command('import_courses', self.data_file('math.csv'), stdout=io.StringIO())
+        self.assertEqual(Course.objects.filter(subject='C S').count(), 207)
+        self.assertEqual(Course.objects.filter(subject='MATH').count(), 166)
@@ -1,7 +1,9 @@
 from django.urls import path, include
-from .views import CourseListView, CourseDetailView
+from .views import CourseListView, CourseDetailView, course_cache_stats, catalog_version
 
 urlpatterns = [
     path('courses/', CourseListView.as_view(), name='course-list'),
     path('courses/<int:pk>/', CourseDetailView.as_view(), name='course-detail'),
+    path('cache/stats/', course_cache_stats, name='course-cache-stats'),
+    path('catalog/version/', catalog_version, name='catalog-version'),
 ]
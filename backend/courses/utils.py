@@ -0,0 +1,76 @@
+import hashlib
+import re
+
+# one bit per meeting day, so "within MWF" is a bitmask subset test
+DAY_BITS = {'M': 1, 'T': 2, 'W': 4, 'R': 8, 'F': 16, 'S': 32, 'U': 64}
+
+TIME_RE = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*([ap]m)\s*$', re.IGNORECASE)
+
+
+def time_to_minutes(value):
+    """'1:30 pm' -> 810, None if it isn't a clock time."""
+    match = TIME_RE.match(value or '')
+    if not match:
+        return None
+    hour, minute, period = int(match.group(1)), int(match.group(2)), match.group(3).lower()
+    if period == 'pm' and hour != 12:
+        hour += 12
+    if period == 'am' and hour == 12:
+        hour = 0
+    return hour * 60 + minute
+
+
+def parse_meeting_time(meeting_time):
+    """'1:30 pm - 2:45 pm' -> (810, 885), (None, None) for 'Asynchronous' etc."""
+    parts = (meeting_time or '').split('-')
+    if len(parts) != 2:
+        return None, None
+    start, end = time_to_minutes(parts[0]), time_to_minutes(parts[1])
+    if start is None or end is None:
+        return None, None
+    return start, end
+
+
+def day_mask(meeting_days):
+    """'MWF' -> 21, None when there are no (known) meeting days."""
+    mask = 0
+    for day in (meeting_days or '').upper():
+        mask |= DAY_BITS.get(day, 0)
+    return mask or None
+
+
+SEATS_RE = re.compile(r'^\s*(\d+)\s+out\s+of\s+(\d+)\s*$', re.IGNORECASE)
+WAITING_RE = re.compile(r'^\s*(\d+)\s+waiting\s*$', re.IGNORECASE)
+
+
+def parse_seats(seats):
+    """'9 out of 120' (9 open of 120) -> (9, 120), (None, None) if unparseable."""
+    match = SEATS_RE.match(seats or '')
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+
+def parse_waitlist(waitlist):
+    """'3 Waiting' -> 3; 'No Wait List' and anything else -> 0."""
+    match = WAITING_RE.match(waitlist or '')
+    return int(match.group(1)) if match else 0
+
+
+def masks_within(mask):
+    """Every non-empty day mask whose days all fall inside `mask`."""
+    subsets = []
+    subset = mask
+    while subset:
+        subsets.append(subset)
+        subset = (subset - 1) & mask
+    return subsets
+
+
+def content_hash(values):
+    """sha1 over the values in order; None and '' hash the same."""
+    digest = hashlib.sha1()
+    for value in values:
+        digest.update((value or '').encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
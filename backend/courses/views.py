@@ -4,18 +4,23 @@ from django.shortcuts import render
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.renderers import JSONRenderer, BrowsableAPIRenderer
+from rest_framework.renderers import BrowsableAPIRenderer
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from .models import Course
-from .serializers import CourseSerializer
+from .models import CatalogVersion, Course
+from .serializers import CourseSerializer, course_values_fields
 from .filters import CourseTimeFilter
+from .cache import CachedResponseMixin, stats as cache_stats
+from .pagination import CourseCursorPagination
+from .renderers import FastJSONRenderer, NDJSONRenderer, ndjson_line
 from django.middleware.csrf import get_token
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
 
 def csrf(request):
     return JsonResponse({'csrfToken': get_token(request)})
@@ -23,14 +28,17 @@ def csrf(request):
 # For storing user input temporarily
 SAVED_INPUT = ""
 
+# rows fetched per round trip while streaming, and per write to the socket
+NDJSON_CHUNK_SIZE = 2000
+
 
 # Handles GET requests for listing and filtering courses
-class CourseListView(generics.ListAPIView):
-    queryset = Course.objects.all()
+class CourseListView(CachedResponseMixin, generics.ListAPIView):
+    queryset = Course.objects.order_by('pk')
     serializer_class = CourseSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = CourseTimeFilter
-    renderer_classes = [JSONRenderer]
+    renderer_classes = [FastJSONRenderer, NDJSONRenderer]
     
     @swagger_auto_schema(manual_parameters=[
         openapi.Parameter('meeting_days', openapi.IN_QUERY, description="Filter by meeting days (e.g., MWF)", type=openapi.TYPE_STRING),
@@ -38,18 +46,91 @@ class CourseListView(generics.ListAPIView):
         openapi.Parameter('end_time', openapi.IN_QUERY, description="End time in format HH:MM (24-Hour Clock)", type=openapi.TYPE_STRING),
         openapi.Parameter('instructor', openapi.IN_QUERY, description="Filter by instructor name (e.g. Sridhar)", type=openapi.TYPE_STRING),
         openapi.Parameter('course', openapi.IN_QUERY, description="Filter by course number (e.g. 2413)", type=openapi.TYPE_STRING),
+        openapi.Parameter('start_after', openapi.IN_QUERY, description="Starts at or after HH:MM (24-Hour Clock)", type=openapi.TYPE_STRING),
+        openapi.Parameter('start_before', openapi.IN_QUERY, description="Starts at or before HH:MM (24-Hour Clock)", type=openapi.TYPE_STRING),
+        openapi.Parameter('end_after', openapi.IN_QUERY, description="Ends at or after HH:MM (24-Hour Clock)", type=openapi.TYPE_STRING),
+        openapi.Parameter('end_before', openapi.IN_QUERY, description="Ends at or before HH:MM (24-Hour Clock)", type=openapi.TYPE_STRING),
+        openapi.Parameter('days_within', openapi.IN_QUERY, description="Only meets on these days (e.g. MWF also matches MW and F)", type=openapi.TYPE_STRING),
+        openapi.Parameter('q', openapi.IN_QUERY, description="Typo-tolerant instructor/title search, best match first (e.g. Sridar)", type=openapi.TYPE_STRING),
+        openapi.Parameter('format', openapi.IN_QUERY, description="ndjson streams every match, one course per line, unpaginated", type=openapi.TYPE_STRING, enum=['json', 'ndjson']),
+        openapi.Parameter('pagination', openapi.IN_QUERY, description="cursor pages by id with no COUNT(*); follow `next`", type=openapi.TYPE_STRING, enum=['page', 'cursor']),
     ])
     
     
     def get(self, request, *args, **kwargs):
         if request.accepted_renderer.format == 'html':
             # If HTML is requested, serve as JSON to avoid missing template
-            request.accepted_renderer = JSONRenderer()
+            request.accepted_renderer = FastJSONRenderer()
+        if request.accepted_renderer.format == 'ndjson':
+            return self.stream_ndjson()
+        if self.uses_cursor() and request.query_params.get('q', '').strip():
+            # keyset pages walk the id order, so they can't keep the rank order
+            raise ValidationError({'pagination': 'cursor pagination cannot be combined with q, use page pagination'})
         return super().get(request, *args, **kwargs)
+
+    # COURSES_FAST_JSON: rows as .values() dicts instead of model instances run
+    # through CourseSerializer; the rendered bytes are the same
+    def list(self, request, *args, **kwargs):
+        if not settings.COURSES_FAST_JSON:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset()).values(*course_values_fields())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(list(page))
+        return Response(list(queryset))
+
+    def uses_cursor(self):
+        params = self.request.query_params
+        return params.get('pagination') == 'cursor' or 'cursor' in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.uses_cursor():
+                self._paginator = CourseCursorPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+    # The whole filtered result as one response: rows come from a server-side
+    # cursor in chunks, so memory stays flat however big the catalog is. pk
+    # order, or best match first with ?q=
+    def stream_ndjson(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if settings.COURSES_FAST_JSON:
+            rows = queryset.values(*course_values_fields()).iterator(chunk_size=NDJSON_CHUNK_SIZE)
+        else:
+            serializer_class = self.get_serializer_class()
+            rows = (serializer_class(course).data for course in queryset.iterator(chunk_size=NDJSON_CHUNK_SIZE))
+
+        def lines():
+            chunk = []
+            for row in rows:
+                chunk.append(ndjson_line(row))
+                if len(chunk) >= NDJSON_CHUNK_SIZE:
+                    yield b''.join(chunk)
+                    chunk = []
+            if chunk:
+                yield b''.join(chunk)
+
+        return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
     
     
 # Handles GET requests for a single course
-class CourseDetailView(generics.RetrieveAPIView):
+class CourseDetailView(CachedResponseMixin, generics.RetrieveAPIView):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
-    
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+
+# Hit rate of the course response cache in this process
+def course_cache_stats(request):
+    return JsonResponse(cache_stats.as_dict())
+
+
+# Which import the catalog is at
+def catalog_version(request):
+    version = CatalogVersion.current()
+    if version is None:
+        return JsonResponse({'error': 'No catalog has been imported yet'}, status=404)
+    return JsonResponse(version.as_dict())
@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from .models import ScheduleJob
+
+
+@admin.register(ScheduleJob)
+class ScheduleJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'created_at', 'finished_at')
+    list_filter = ('status',)
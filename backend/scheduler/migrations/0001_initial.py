@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-18 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleJob',
+            fields=[
+                ('id', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('status', models.CharField(max_length=10)),
+                ('state', models.JSONField()),
+                ('created_at', models.FloatField(db_index=True)),
+                ('finished_at', models.FloatField(blank=True, db_index=True, null=True)),
+            ],
+        ),
+    ]
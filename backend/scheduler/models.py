@@ -0,0 +1,17 @@
+from django.db import models
+
+
+# What /api/jobs/<job_id>/ answers, kept in the database so any web worker
+# can answer it, not just the process whose thread runs the job (see
+# backend.jobs.JobManager). Rows are pruned SCHEDULER_JOB_TTL after finishing;
+# one whose process died before finishing is reported failed, and pruned,
+# once it is older than the TTL plus SCHEDULER_POOL_TIMEOUT.
+class ScheduleJob(models.Model):
+    id = models.CharField(max_length=32, primary_key=True)
+    status = models.CharField(max_length=10)
+    state = models.JSONField()  # Job.as_dict()
+    created_at = models.FloatField(db_index=True)  # epoch seconds
+    finished_at = models.FloatField(null=True, blank=True, db_index=True)  # epoch seconds
+
+    def __str__(self):
+        return f"Job {self.id} ({self.status})"
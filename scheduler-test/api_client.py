@@ -0,0 +1,158 @@
+# === api_client.py ===
+# HTTP client for the ScheduleSooner API used by standalone scheduler runs.
+#
+# One client keeps one requests.Session (so connections are pooled and
+# kept alive), logs in once, reuses the access token until it is about to
+# expire, refreshes it through /api/token/refresh/ and either walks every
+# page of paginated list endpoints or reads them as one NDJSON stream.
+
+import base64
+import json
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ApiError(Exception):
+    pass
+
+
+def _token_expiry(token):
+    # exp claim of a JWT, without verifying it (the server does that)
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return None
+
+
+class ApiClient:
+    def __init__(self, base_url, username, password, pool_size=10, timeout=30,
+                 refresh_margin=30, default_token_lifetime=60):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        # refresh this many seconds before the token actually expires
+        self.refresh_margin = refresh_margin
+        # used when the access token carries no readable exp claim
+        self.default_token_lifetime = default_token_lifetime
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._access = None
+        self._access_expires = 0.0
+        self._refresh = None
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # === Auth ===
+
+    def _store_tokens(self, token_data):
+        if "access" not in token_data:
+            raise ApiError(f"Unexpected login response: {token_data}")
+        self._access = token_data["access"]
+        self._refresh = token_data.get("refresh", self._refresh)
+        expires = _token_expiry(self._access)
+        self._access_expires = expires if expires else time.time() + self.default_token_lifetime
+
+    def _login(self):
+        res = self.session.post(
+            f"{self.base_url}/api/login/",
+            json={"username": self.username, "password": self.password},
+            timeout=self.timeout,
+        )
+        if res.status_code != 200:
+            raise ApiError(f"Login failed: {res.status_code} {res.text}")
+        self._store_tokens(res.json())
+
+    def _refresh_access(self):
+        res = self.session.post(
+            f"{self.base_url}/api/token/refresh/",
+            json={"refresh": self._refresh},
+            timeout=self.timeout,
+        )
+        if res.status_code != 200:
+            return False
+        self._store_tokens(res.json())
+        return True
+
+    def access_token(self):
+        with self._lock:
+            if self._access and time.time() < self._access_expires - self.refresh_margin:
+                return self._access
+            if not (self._refresh and self._refresh_access()):
+                self._login()
+            return self._access
+
+    def invalidate(self):
+        with self._lock:
+            self._access = None
+
+    # === Requests ===
+
+    def _request(self, url, params=None, stream=False):
+        if not url.startswith("http"):
+            url = f"{self.base_url}{url}"
+
+        for attempt in range(2):
+            headers = {"Authorization": f"Bearer {self.access_token()}"}
+            res = self.session.get(url, headers=headers, params=params, timeout=self.timeout, stream=stream)
+            if res.status_code == 401 and attempt == 0:
+                # token revoked or clock skew, get a new one and retry once
+                res.close()
+                self.invalidate()
+                continue
+            break
+
+        if res.status_code != 200:
+            raise ApiError(f"Failed to fetch {url}: {res.status_code} {res.text}")
+        return res
+
+    def get(self, url, params=None):
+        return self._request(url, params).json()
+
+    def iter_ndjson(self, path, params=None):
+        """Yield each record of a format=ndjson response as it arrives, one request in total."""
+        params = dict(params or {}, format="ndjson")
+        with self._request(path, params, stream=True) as res:
+            for line in res.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    def iter_pages(self, path, params=None):
+        """Yield the results of every page, following the `next` links."""
+        data = self.get(path, params)
+        while True:
+            if isinstance(data, list):
+                # endpoint isn't paginated
+                yield data
+                return
+            yield data.get("results", [])
+            next_url = data.get("next")
+            if not next_url:
+                return
+            # `next` already carries the query string
+            data = self.get(next_url)
+
+    def iter_results(self, path, params=None):
+        for page in self.iter_pages(path, params):
+            yield from page
+
+    def get_courses(self, filter_type, filter_value, **filters):
+        # the whole result in one streamed response instead of a page at a time
+        return list(self.iter_ndjson("/cs/courses/", {filter_type: filter_value, **filters}))
@@ -0,0 +1,91 @@
+"""check_conflict vs the precomputed NumPy conflict matrix.
+
+    python benchmarks/bench_conflicts.py --sizes 1000 10000
+
+check_conflict re-parses both meeting_time strings on every call, so
+checking every pair is quadratic string work; at 10k sections that is
+50M calls, so it is timed on a random sample of pairs and extrapolated.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import build_script  # noqa: E402
+import conflicts  # noqa: E402
+from synthetic import make_catalog  # noqa: E402
+
+
+def bench(n, sample_pairs, seed=0):
+    catalog = make_catalog(courses=-(-n // 24), sections_per_course=24, time_density=0.5, seed=seed)[:n]
+    pairs = n * (n - 1) // 2
+    rng = random.Random(seed)
+    sample = [(rng.randrange(n), rng.randrange(n)) for _ in range(min(sample_pairs, pairs))]
+
+    start = time.perf_counter()
+    for a, b in sample:
+        build_script.check_conflict([catalog[a]], catalog[b])
+    per_pair = (time.perf_counter() - start) / len(sample)
+
+    conflicts._parse_time.cache_clear()
+    start = time.perf_counter()
+    days, begin, end = conflicts.to_arrays(catalog)
+    parsed = time.perf_counter() - start
+    start = time.perf_counter()
+    matrix = conflicts.conflict_matrix(days, begin, end)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lookups = conflicts.ConflictMatrix(catalog)
+    with_bitsets = time.perf_counter() - start
+    start = time.perf_counter()
+    for a, b in sample:
+        lookups.conflicts(a, b)
+    lookup = (time.perf_counter() - start) / len(sample)
+
+    # spot-check that both agree
+    for a, b in sample[:2000]:
+        if a != b:
+            assert matrix[a, b] == build_script.check_conflict([catalog[a]], catalog[b]), (a, b)
+
+    return {
+        "sections": n,
+        "pairs": pairs,
+        "check_conflict_all_pairs_s": per_pair * pairs,
+        "parse_s": parsed,
+        "matrix_s": built,
+        "matrix_mb": matrix.nbytes / 1e6,
+        "bitsets_mb": conflicts.conflict_bitsets(matrix).nbytes / 1e6,
+        "conflict_matrix_s": with_bitsets,
+        "lookup_ns": lookup * 1e9,
+        "check_conflict_ns": per_pair * 1e9,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--sample-pairs", type=int, default=200000)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        r = bench(n, args.sample_pairs)
+        speedup = r["check_conflict_all_pairs_s"] / (r["parse_s"] + r["matrix_s"])
+        print(f"{n:>6} sections, {r['pairs']:,} pairs")
+        print(f"  check_conflict, every pair : {r['check_conflict_all_pairs_s']:10.2f} s  "
+              f"({r['check_conflict_ns']:.0f} ns/pair)")
+        print(f"  parse once + numpy matrix  : {r['parse_s'] + r['matrix_s']:10.3f} s  "
+              f"(parse {r['parse_s']:.3f} s, matrix {r['matrix_s']:.3f} s)  {speedup:.0f}x")
+        print(f"  ConflictMatrix (bitsets)   : {r['conflict_matrix_s']:10.3f} s to build, "
+              f"{r['lookup_ns']:.0f} ns/lookup")
+        print(f"  memory                     : {r['matrix_mb']:10.1f} MB bool, {r['bitsets_mb']:.1f} MB bitsets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Throughput of the micro-batched LLM queue vs one generate per prompt.
+
+    python benchmarks/bench_llm_batching.py --prompts 32 --concurrency 8
+    python benchmarks/bench_llm_batching.py --fake   # no torch/weights needed
+
+--fake swaps TinyLlama for a stand-in whose generate costs a fixed
+overhead plus a smaller per-row amount, roughly how a CPU matmul behaves.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import inference  # noqa: E402
+import subset  # noqa: E402
+
+QUERIES = [
+    "I want something with databases in the morning",
+    "an easy elective that isn't on friday",
+    "give me programming classes after lunch",
+    "the class about operating systems please",
+]
+
+
+def fake_runner(batch_overhead, row_cost):
+    def run(prompts):
+        time.sleep(batch_overhead + row_cost * len(prompts))
+        return [f'{prompt} {{"courses": []}}' for prompt in prompts]
+    return run
+
+
+def serialized(runner):
+    # one model, so generate calls can't overlap (the real one already uses
+    # every core for a single call)
+    lock = threading.Lock()
+
+    def run(prompts):
+        with lock:
+            return runner(prompts)
+    return run
+
+
+def per_call(prompts, runner, concurrency):
+    # the old path: every caller runs its own batch-of-one generate
+    def one(prompt):
+        return runner([prompt])[0]
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(one, prompts))
+
+
+def batched(prompts, runner, concurrency, max_batch, max_wait):
+    batcher = inference.BatchInferenceQueue(runner, max_batch_size=max_batch, max_wait=max_wait)
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(batcher.generate, prompts))
+    return results, batcher.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-batch", type=int, default=inference.MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=inference.MAX_WAIT * 1000)
+    parser.add_argument("--fake", action="store_true", help="use a stand-in model")
+    parser.add_argument("--fake-overhead-ms", type=float, default=200)
+    parser.add_argument("--fake-row-ms", type=float, default=25)
+    args = parser.parse_args()
+
+    if args.fake:
+        runner = fake_runner(args.fake_overhead_ms / 1000, args.fake_row_ms / 1000)
+    else:
+        runner = inference.run_batch
+        print("📚 Loading TinyLlama...")
+        inference.model_manager.manager.get()
+    runner = serialized(runner)
+
+    prompts = [subset.build_llm_prompt(QUERIES[i % len(QUERIES)]) for i in range(args.prompts)]
+
+    start = time.perf_counter()
+    per_call(prompts, runner, args.concurrency)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, stats = batched(prompts, runner, args.concurrency, args.max_batch, args.max_wait_ms / 1000)
+    batch = time.perf_counter() - start
+
+    print(f"prompts={args.prompts} concurrency={args.concurrency} max_batch={args.max_batch}")
+    print(f"per-call : {single:8.2f}s  {args.prompts / single:8.2f} prompts/s")
+    print(f"batched  : {batch:8.2f}s  {args.prompts / batch:8.2f} prompts/s  "
+          f"(avg batch {stats['avg_batch_size']:.1f})")
+    print(f"speedup  : {single / batch:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
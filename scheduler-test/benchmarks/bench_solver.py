@@ -0,0 +1,73 @@
+"""Latency of the backtracking schedule solver on synthetic catalogs.
+
+    python benchmarks/bench_solver.py
+
+Typical requests (5-7 courses with dozens of sections each) should stay
+under 100 ms, including the infeasible ones where the search has to prove
+that nothing fits.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import solver  # noqa: E402
+from synthetic import make_catalog  # noqa: E402
+
+BUDGET_MS = 100
+
+
+def timed(fn, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), max(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-solutions", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'courses':>7} {'sections':>8} {'density':>7} {'mode':>10} {'median ms':>10} {'max ms':>8} "
+          f"{'found':>6} {'nodes':>8}")
+    for courses in (5, 6, 7):
+        for sections in (24, 48):
+            for density in (0.0, 0.6, 0.9, "none"):
+                if density == "none":
+                    # last two courses only ever meet at the same time, so the
+                    # solver has to prove nothing fits and fall back
+                    catalog = make_catalog(courses, sections, time_density=0.5, seed=courses * sections)
+                    last = catalog[-sections:]
+                    for section in catalog[-2 * sections:-sections]:
+                        section["meeting_days"] = last[0]["meeting_days"]
+                        section["meeting_time"] = last[0]["meeting_time"]
+                    for section in last:
+                        section["meeting_days"] = last[0]["meeting_days"]
+                        section["meeting_time"] = last[0]["meeting_time"]
+                else:
+                    catalog = make_catalog(courses, sections, time_density=density, seed=courses * sections)
+                required = sorted({c["course"] for c in catalog})
+                for mode, max_solutions in (("first", 1), ("top", args.max_solutions)):
+                    median, worst, result = timed(
+                        lambda: solver.solve(catalog, max_classes=courses, required_courses=required,
+                                             max_solutions=max_solutions),
+                        args.repeat,
+                    )
+                    flag = "  ⚠️ over budget" if median > BUDGET_MS else ""
+                    print(f"{courses:>7} {sections:>8} {density:>7} {mode:>10} {median:>10.2f} {worst:>8.2f} "
+                          f"{len(result.schedules):>6} {result.nodes:>8}{flag}")
+
+
+if __name__ == "__main__":
+    main()
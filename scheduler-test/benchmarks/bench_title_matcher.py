@@ -0,0 +1,86 @@
+"""Title matching in regex_parse_preferences: per-entry substring scan vs Aho–Corasick.
+
+    python benchmarks/bench_title_matcher.py --sizes 10000 100000
+
+The old code lowercased the input and ran one `in` check per catalog
+entry, for every split piece of every query. TitleMatcher pays once to
+build the automaton (cached per catalog), then reads each piece once.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import subset  # noqa: E402
+import title_matcher  # noqa: E402
+from synthetic import make_catalog  # noqa: E402
+
+
+def scan(courses_data, user_input):
+    # what regex_parse_preferences did before TitleMatcher
+    return [entry.get("title") for entry in courses_data if entry.get("title", "").lower() in user_input.lower()]
+
+
+def queries(catalog):
+    picks = [catalog[len(catalog) // 3]["title"], catalog[-1]["title"]]
+    return [
+        f"I want {picks[0]} on MWF",
+        f"{picks[1].lower()} with Neeman after 10:30 am",
+        "CS 2413 and CS 3113 TR",
+        f"{picks[0]} and {picks[1]} and Computer Graphics",
+    ]
+
+
+def timed(fn, pieces, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for piece in pieces:
+            fn(piece)
+    return (time.perf_counter() - start) / (repeat * len(pieces))
+
+
+def bench(n, repeat):
+    # one section per course, so every title is distinct ("Data Structures 17", ...)
+    catalog = make_catalog(courses=n, sections_per_course=1)
+    pieces = [piece for query in queries(catalog) for piece in subset.pre_split_user_input(query)]
+
+    start = time.perf_counter()
+    matcher = title_matcher.TitleMatcher(entry["title"] for entry in catalog)
+    built = time.perf_counter() - start
+
+    for piece in pieces:
+        found = matcher.find(piece)
+        # the scan also reports every shorter title inside a longer one
+        assert set(found) <= set(scan(catalog, piece)), piece
+
+    return {
+        "titles": len(matcher),
+        "nodes": len(matcher.children),
+        "build_s": built,
+        "scan_us": timed(lambda piece: scan(catalog, piece), pieces, max(1, repeat // 20)) * 1e6,
+        "matcher_us": timed(matcher.find, pieces, repeat) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=200, help="Passes over the query pieces for the matcher")
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        r = bench(n, args.repeat)
+        print(f"{r['titles']:>7} titles, {r['nodes']:,} automaton nodes")
+        print(f"  substring scan per piece : {r['scan_us']:12.1f} us")
+        print(f"  TitleMatcher per piece   : {r['matcher_us']:12.1f} us  "
+              f"({r['scan_us'] / r['matcher_us']:.0f}x)")
+        print(f"  building the automaton   : {r['build_s'] * 1000:12.1f} ms (once per catalog)")
+
+
+if __name__ == "__main__":
+    main()
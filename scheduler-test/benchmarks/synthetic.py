@@ -0,0 +1,72 @@
+"""Synthetic course catalogs shaped like data/cs.csv, for benchmarks."""
+
+import random
+
+TITLES = [
+    "Programming with Python", "Data Structures", "Discrete Structures",
+    "Operating Systems", "Computer Architecture", "Algorithm Analysis",
+    "Database Management Systems", "Software Engineering", "Computer Networks",
+    "Artificial Intelligence", "Machine Learning", "Theory of Computation",
+    "Computer Graphics", "Compilers", "Computer Security", "Human-Computer Interaction",
+]
+FIRST_NAMES = ["Sridhar", "Henry", "Maisha", "Omkar", "Amy", "Dean", "Chongle", "Rafal", "Le", "Qi"]
+LAST_NAMES = ["Radhakrishnan", "Neeman", "Maliha", "Chekuri", "McGovern", "Hougen", "Pan", "Jabrzemski", "Gruenwald", "Cheng"]
+BUILDINGS = ["Gallogly Hall", "Devon Energy Hall", "Felgar Hall", "Carson Engr Ctr", "Sarkeys Energy Center"]
+
+# (days, minutes per meeting) like the registrar's usual blocks
+PATTERNS = [("MWF", 50), ("TR", 75), ("MW", 75), ("WF", 50), ("M", 170), ("T", 170), ("R", 110), ("F", 50)]
+DAY_START = 8 * 60
+DAY_END = 21 * 60
+
+
+def format_minutes(minutes):
+    hour, minute = divmod(minutes, 60)
+    period = "am" if hour < 12 else "pm"
+    hour = hour % 12 or 12
+    return f"{hour}:{minute:02d} {period}"
+
+
+def make_section(rng, section_id, course_number, section_number, title, window_end):
+    days, length = rng.choice(PATTERNS)
+    latest = max(DAY_START, window_end - length)
+    start = DAY_START + rng.randrange(0, latest - DAY_START + 1, 30) if latest > DAY_START else DAY_START
+    taken = rng.randint(0, 120)
+    capacity = max(taken, rng.choice([30, 40, 60, 120, 180]))
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        "id": section_id,
+        "crn": str(10000 + section_id),
+        "subject": "C S",
+        "course": course_number,
+        "section": str(section_number),
+        "title": title,
+        "instructor": f"{last}, {first}",
+        "meeting_dates": "Jan 13 - May 2",
+        "meeting_time": f"{format_minutes(start)} - {format_minutes(start + length)}",
+        "meeting_days": days,
+        "meeting_location": f"{rng.choice(BUILDINGS)} {rng.randint(100, 350)}",
+        "final_days": "",
+        "final_time": "",
+        "final_date": "",
+        "final_location": "",
+        "seats": f"{capacity - taken} out of {capacity}",
+        "waitlist": rng.choice(["0 Waiting", "No Wait List", f"{rng.randint(1, 9)} Waiting"]),
+    }
+
+
+def make_catalog(courses=6, sections_per_course=24, time_density=0.0, seed=0, first_course=1000):
+    """Return a flat list of section dicts (the shape CourseSerializer emits).
+
+    time_density squeezes every section into a shorter part of the day:
+    0.0 spreads them over 8am-9pm, 1.0 piles them into the first few hours,
+    so higher values mean more conflicts.
+    """
+    rng = random.Random(seed)
+    window_end = DAY_END - int((DAY_END - DAY_START - 180) * time_density)
+    catalog = []
+    for c in range(courses):
+        course_number = str(first_course + c * 10 + 3)
+        title = f"{rng.choice(TITLES)} {c}" if courses > len(TITLES) else TITLES[c % len(TITLES)]
+        for s in range(sections_per_course):
+            catalog.append(make_section(rng, len(catalog) + 1, course_number, s + 1, title, window_end))
+    return catalog
@@ -7,9 +7,12 @@ import requests
 import unittest
 import os
 
-def load_courses(filename="all_unique_courses.json"):
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    outputs_dir = os.path.join(base_dir, "outputs")
+import solver
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUTS_DIR = os.path.join(BASE_DIR, "outputs")
+
+def load_courses(filename="all_unique_courses.json", outputs_dir=OUTPUTS_DIR):
     filepath = os.path.join(outputs_dir, filename)
 
     # Make sure outputs/ exists
@@ -61,29 +64,14 @@ def check_conflict(existing_classes, new_class):
             return True
     return False
 
-def build_schedule(courses, max_classes=5):
-    grouped = {}
-    for course in courses:
-        key = f"{course['subject']} {course['course']}"
-        if key not in grouped:
-            grouped[key] = []
-        grouped[key].append(course)
-
-    selected = []
-    for course_key, sections in grouped.items():
-        found = False
-        for section in sections:
-            if not check_conflict(selected, section):
-                selected.append(copy.deepcopy(section))
-                found = True
-                break
-        if found and len(selected) >= max_classes:
-            break
-    return selected
-
-def save_schedule(schedule, filename="final_schedule.json"):
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    outputs_dir = os.path.join(base_dir, "outputs")
+def build_schedule(courses, max_classes=5, required_courses=None, time_limit=2.0):
+    """One conflict-free schedule (see solver.py), or [] if none exists."""
+    result = solver.solve(courses, max_classes, required_courses, max_solutions=1, time_limit=time_limit)
+    if not result.schedules:
+        return []
+    return [copy.deepcopy(section) for section in result.schedules[0]]
+
+def save_schedule(schedule, filename="final_schedule.json", outputs_dir=OUTPUTS_DIR):
     os.makedirs(outputs_dir, exist_ok=True)
 
     filepath = os.path.join(outputs_dir, filename)
@@ -92,25 +80,15 @@ def save_schedule(schedule, filename="final_schedule.json"):
     print(f"💾 Saved final schedule to {filepath}")
 
 
-def main():
-    print(f"📚 Loading courses from all_unique_courses.json...")
-    courses = load_courses()
-
-    print(f"🛠 Building one valid, no-conflict schedule...")
-    schedule = build_schedule(courses, max_classes=5)
-
-    if not schedule:
-        print("⚠️ Could not build any valid schedule.")
-    else:
-        save_schedule(schedule)
-
+def publish(outputs_dir=OUTPUTS_DIR):
+    """Self-test the files in outputs/ and upload final_schedule.json."""
     def run_tests():
         # Always make sure we're in the script's folder
         base_dir = os.path.dirname(os.path.abspath(__file__))
         os.chdir(base_dir)  # <- this is important!
 
         loader = unittest.TestLoader()
-        suite = loader.discover('tests')  # relative to the script location now
+        suite = loader.discover('tests', pattern='test_generated*.py')  # relative to the script location now
         runner = unittest.TextTestRunner()
         result = runner.run(suite)
         if not result.wasSuccessful():
@@ -119,8 +97,6 @@ def main():
     run_tests()
 
     url = 'https://schedulesooner-backend.onrender.com/api/upload-file/'
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    outputs_dir = os.path.join(base_dir, 'outputs')
     file_path = os.path.join(outputs_dir, 'final_schedule.json')
 
     with open(file_path, 'rb') as file:
@@ -130,6 +106,21 @@ def main():
     print("Status Code:", response.status_code)
     print("Response:", response.text)
 
+
+def main(outputs_dir=OUTPUTS_DIR):
+    print(f"📚 Loading courses from all_unique_courses.json...")
+    courses = load_courses(outputs_dir=outputs_dir)
+
+    print(f"🛠 Building one valid, no-conflict schedule...")
+    schedule = build_schedule(courses, max_classes=5)
+
+    if not schedule:
+        print("⚠️ Could not build any valid schedule.")
+    else:
+        save_schedule(schedule, outputs_dir=outputs_dir)
+
+    publish(outputs_dir)
+    return schedule
+
 if __name__ == "__main__":
     main()
-
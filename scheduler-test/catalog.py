@@ -0,0 +1,95 @@
+# === catalog.py ===
+# Where subset.py gets its course data from.
+#
+# Inside the Django process (handle_user_input) we read the Course table
+# directly; standalone runs go through the public API like before.
+
+import os
+
+from dotenv import load_dotenv
+
+from api_client import ApiClient
+
+DEFAULT_API_URL = "https://schedulesooner-backend.onrender.com"
+
+
+class RemoteCatalog:
+    """Fetches courses from the ScheduleSooner API over HTTP.
+
+    All lookups share one ApiClient, so the scheduler logs in once and
+    reuses the pooled connection for every filter.
+    """
+
+    def __init__(self, base_url=None, username=None, password=None, client=None):
+        load_dotenv()
+        self.client = client or ApiClient(
+            base_url or os.getenv("SCHEDULE_API_URL", DEFAULT_API_URL),
+            username or os.getenv("SCHEDULE_USERNAME"),
+            password or os.getenv("SCHEDULE_PASSWORD"),
+        )
+
+    def get_courses(self, filter_type: str, filter_value: str, **filters):
+        return self.client.get_courses(filter_type, filter_value, **filters)
+
+
+class DjangoCatalog:
+    """Reads courses straight from courses.models.Course.
+
+    Uses the same FilterSet and serializer as CourseListView so the results
+    look exactly like the API's, just without the login, the HTTP round trip
+    and the page limit.
+    """
+
+    def get_courses(self, filter_type: str, filter_value: str, **filters):
+        from courses.filters import CourseTimeFilter
+        from courses.models import Course
+        from courses.serializers import CourseSerializer
+
+        filterset = CourseTimeFilter(
+            {filter_type: filter_value, **filters},
+            queryset=Course.objects.order_by("pk"),
+        )
+        if not filterset.is_valid():
+            raise Exception(f"Failed to fetch courses: {dict(filterset.errors)}")
+
+        return [dict(row) for row in CourseSerializer(filterset.qs, many=True).data]
+
+
+_provider = None
+
+
+def _django_ready():
+    try:
+        from django.apps import apps
+    except ImportError:
+        return False
+    return apps.ready
+
+
+def _default_provider():
+    # SCHEDULE_CATALOG=django|remote forces a backend, anything else picks
+    # the in-process one whenever Django is already set up
+    backend = os.getenv("SCHEDULE_CATALOG", "auto").lower()
+    if backend == "remote":
+        return RemoteCatalog()
+    if backend == "django" or _django_ready():
+        return DjangoCatalog()
+    return RemoteCatalog()
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        _provider = _default_provider()
+    return _provider
+
+
+def set_provider(provider):
+    """Swap the catalog backend (pass None to go back to auto-detection)."""
+    global _provider
+    _provider = provider
+
+
+def get_courses(filter_type: str, filter_value: str, **filters):
+    """Courses matching one filter; extra filters (e.g. open_only=True) narrow it further."""
+    return get_provider().get_courses(filter_type, filter_value, **filters)
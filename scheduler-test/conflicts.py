@@ -0,0 +1,97 @@
+# === conflicts.py ===
+# Precomputed section-vs-section conflicts.
+#
+# Every section's meeting time is parsed once into integers (a day bitmask,
+# start minute, end minute); the full pairwise conflict matrix is then built
+# with NumPy in row blocks, so the solver only ever does an O(1) lookup.
+
+import functools
+import string
+
+import numpy as np
+
+import build_script
+
+# one fixed bit per letter, so unusual ones ("H" in "TTH", "TBA") still
+# match check_conflict's set() comparison; the table never changes, so the
+# job threads can share it. Anything else shares OTHER_BIT (at worst a
+# false conflict between two oddly written sections).
+DAY_BITS = {day: bit for bit, day in enumerate("MTWRFSU" + "".join(
+    letter for letter in string.ascii_letters if letter not in "MTWRFSU"))}
+OTHER_BIT = len(DAY_BITS)  # 52, still fits the int64 days array
+
+
+def day_mask(days):
+    mask = 0
+    for day in set(days or ""):
+        mask |= 1 << DAY_BITS.get(day, OTHER_BIT)
+    return mask
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_time(meeting_time):
+    # the same few dozen time strings repeat across the whole catalog
+    return build_script.parse_meeting_time(meeting_time)
+
+
+def to_arrays(sections):
+    """(days, start, end) int arrays; sections without a usable time get days=0."""
+    n = len(sections)
+    days = np.zeros(n, dtype=np.int64)
+    start = np.zeros(n, dtype=np.int32)
+    end = np.zeros(n, dtype=np.int32)
+    for i, section in enumerate(sections):
+        meeting_days = section.get("meeting_days")
+        meeting_time = section.get("meeting_time")
+        if not meeting_days or not meeting_time:
+            continue
+        s, e = _parse_time(meeting_time)
+        if s is None or e is None:
+            continue
+        days[i] = day_mask(meeting_days)
+        start[i] = s
+        end[i] = e
+    return days, start, end
+
+
+def conflict_matrix(days, start, end, block=1024):
+    """Boolean n x n matrix, True where two sections meet at overlapping times."""
+    n = len(days)
+    matrix = np.empty((n, n), dtype=bool)
+    # row blocks keep the temporaries at block x n instead of n x n
+    for lo in range(0, n, block):
+        hi = min(lo + block, n)
+        shared_day = (days[lo:hi, None] & days[None, :]) != 0
+        overlap = (start[lo:hi, None] < end[None, :]) & (start[None, :] < end[lo:hi, None])
+        np.logical_and(shared_day, overlap, out=matrix[lo:hi])
+    return matrix
+
+
+def conflict_bitsets(matrix):
+    """Per-section conflict bitsets (bit b of row a set when a and b clash),
+    1/8 the memory of the bool matrix."""
+    return np.packbits(matrix, axis=1, bitorder="little")
+
+
+class ConflictMatrix:
+    """What the solver needs: conflicts(a, b) and a time-slot signature per section."""
+
+    def __init__(self, sections):
+        self.days, self.start, self.end = to_arrays(sections)
+        packed = conflict_bitsets(conflict_matrix(self.days, self.start, self.end))
+        # one Python int per row: a shift and a mask per lookup, no numpy
+        # scalar overhead, and 1 bit per pair instead of a list of bools
+        self._rows = [int.from_bytes(row.tobytes(), "little") for row in packed]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def conflicts(self, a, b):
+        return bool(self._rows[a] >> b & 1)
+
+    def signature(self, i):
+        return int(self.days[i]), int(self.start[i]), int(self.end[i])
+
+    def compatible(self, a, candidates):
+        row = self._rows[a]
+        return tuple(b for b in candidates if not row >> b & 1)
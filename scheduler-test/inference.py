@@ -0,0 +1,164 @@
+# === inference.py ===
+# Micro-batching in front of TinyLlama.
+#
+# Callers submit prompts and get a Future back. A single worker thread
+# waits up to max_wait seconds for more prompts (from other sub-inputs or
+# other requests), pads them into one batch of at most max_batch_size and
+# runs one model.generate for the whole batch.
+#
+# SCHEDULER_LLM=stub swaps TinyLlama for a deterministic stand-in (load
+# tests, CI): no torch, no weights, the same answer for the same prompt.
+
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import model_manager
+
+MAX_BATCH_SIZE = int(os.getenv("SCHEDULER_LLM_MAX_BATCH", "8"))
+MAX_WAIT = float(os.getenv("SCHEDULER_LLM_MAX_WAIT_MS", "20")) / 1000
+MAX_NEW_TOKENS = 150
+TIMEOUT = float(os.getenv("SCHEDULER_LLM_TIMEOUT", "120"))  # seconds a caller waits for its answer
+LLM_BACKEND = os.getenv("SCHEDULER_LLM", "tinyllama").lower()
+STUB_LATENCY = float(os.getenv("SCHEDULER_LLM_STUB_MS", "0")) / 1000  # per batch
+STUB_DAYS = ["MWF", "TR", "MW"]
+
+
+def run_batch(prompts, manager=None, max_new_tokens=MAX_NEW_TOKENS):
+    """One padded generate over `prompts`, returns the decoded texts in order."""
+    import torch
+
+    tokenizer, model = (manager or model_manager.manager).get()
+    # decoder-only models need left padding so every row continues right
+    # after its own prompt
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    inputs = tokenizer(prompts, return_tensors="pt", padding=True).to(model.device)
+    with torch.no_grad():
+        outputs = model.generate(**inputs, max_new_tokens=max_new_tokens, pad_token_id=tokenizer.eos_token_id)
+
+    return [tokenizer.decode(row, skip_special_tokens=True).strip() for row in outputs]
+
+
+def stub_answer(prompt):
+    # a meeting_days preference picked by a checksum of the prompt: stable
+    # across runs and processes, and enough to send the query down the
+    # fetch-and-solve path like a real answer would
+    return {"meeting_days": STUB_DAYS[zlib.crc32(prompt.encode("utf-8")) % len(STUB_DAYS)]}
+
+
+def stub_batch(prompts, latency=None):
+    """Stand-in for run_batch: each prompt followed by a canned JSON answer."""
+    latency = STUB_LATENCY if latency is None else latency
+    if latency:
+        time.sleep(latency)
+    return [f"{prompt} {json.dumps(stub_answer(prompt))}" for prompt in prompts]
+
+
+def default_runner():
+    return stub_batch if LLM_BACKEND == "stub" else run_batch
+
+
+class BatchInferenceQueue:
+    def __init__(self, runner=run_batch, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT):
+        self.runner = runner
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self.batches = 0
+        self.prompts = 0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_worker(self):
+        # threads don't survive fork, so a forked worker starts its own
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._worker, name="llm-batcher", daemon=True)
+            self._thread.start()
+
+    def submit(self, prompt):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((prompt, future))
+        return future
+
+    def generate(self, prompt, timeout=None):
+        return self._results([self.submit(prompt)], timeout)[0]
+
+    def generate_many(self, prompts, timeout=None):
+        # submit everything first so the prompts can share batches
+        return self._results([self.submit(prompt) for prompt in prompts], timeout)
+
+    def _results(self, futures, timeout):
+        # one deadline for all of them; on timeout the prompts not yet
+        # picked up are cancelled so the model doesn't run them for nobody
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results = []
+        for future in futures:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                results.append(future.result(remaining))
+            except FutureTimeout:
+                for pending in futures:
+                    pending.cancel()
+                raise TimeoutError(f"no answer from the LLM in {timeout:g}s") from None
+        return results
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect()
+            batch = [(prompt, future) for prompt, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = list(self.runner([prompt for prompt, _ in batch]))
+                # zip() would leave the callers past the end waiting forever
+                if len(results) != len(batch):
+                    raise RuntimeError(f"LLM runner returned {len(results)} results for {len(batch)} prompts")
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.prompts += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "prompts": self.prompts,
+            "avg_batch_size": self.prompts / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+
+batcher = BatchInferenceQueue(default_runner())
@@ -0,0 +1,103 @@
+# === model_manager.py ===
+# Owns the TinyLlama tokenizer/model so nothing is loaded at import time.
+#
+# The model is loaded the first time parse_preferences_with_llm needs it,
+# or ahead of time by warm_up() (started from wsgi.py), which loads it in a
+# background thread while regex-only requests keep being served.
+
+import threading
+import time
+
+MODEL_NAME = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
+
+
+def load_tinyllama(model_name=MODEL_NAME):
+    import torch
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+    model = AutoModelForCausalLM.from_pretrained(
+        model_name,
+        torch_dtype=torch.float32,
+        device_map="auto",
+        trust_remote_code=True
+    ).eval()
+    return tokenizer, model
+
+
+class ModelManager:
+    def __init__(self, loader=load_tinyllama):
+        self.loader = loader
+        self.tokenizer = None
+        self.model = None
+
+        # idle -> loading -> ready (or failed, retried on the next get())
+        self.state = "idle"
+        self.error = None
+        self.load_started_at = None
+        self.load_seconds = None
+        self.load_count = 0
+
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._warm_thread = None
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def load(self):
+        # only one thread loads, the others wait on the lock
+        with self._lock:
+            if self._ready.is_set():
+                return
+            self.state = "loading"
+            self.error = None
+            self.load_started_at = time.time()
+            start = time.perf_counter()
+            try:
+                tokenizer, model = self.loader()
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                raise
+            self.tokenizer, self.model = tokenizer, model
+            self.load_seconds = time.perf_counter() - start
+            self.load_count += 1
+            self.state = "ready"
+            self._ready.set()
+
+    def get(self):
+        if not self._ready.is_set():
+            self.load()
+        return self.tokenizer, self.model
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def warm_up(self):
+        """Start loading in a daemon thread; returns immediately."""
+        if self._ready.is_set() or (self._warm_thread and self._warm_thread.is_alive()):
+            return self._warm_thread
+
+        def run():
+            try:
+                self.load()
+            except Exception as e:
+                print(f"⚠️ Model warm-up failed: {e}")
+
+        self._warm_thread = threading.Thread(target=run, name="model-warm-up", daemon=True)
+        self._warm_thread.start()
+        return self._warm_thread
+
+    def status(self):
+        return {
+            "state": self.state,
+            "ready": self.is_ready(),
+            "load_started_at": self.load_started_at,
+            "load_seconds": self.load_seconds,
+            "load_count": self.load_count,
+            "error": self.error,
+        }
+
+
+manager = ModelManager()
@@ -0,0 +1,111 @@
+# === preference_cache.py ===
+# Memoizes parsed preferences so a repeated query skips the split, the
+# regexes and (most importantly) the LLM.
+#
+# Memory tier: bounded LRU. Disk tier (optional): a small sqlite file, so
+# the cache survives restarts and is shared by workers on the same box.
+
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+CACHE_SIZE = int(os.getenv("SCHEDULER_PREF_CACHE_SIZE", "1024"))
+CACHE_PATH = os.getenv("SCHEDULER_PREF_CACHE_PATH") or None
+
+
+def normalize_input(user_input):
+    # whitespace only: case matters to the parse ("with Neeman" finds an
+    # instructor, "With Neeman" doesn't), so it must matter to the key too.
+    # subset.parse_user_input parses the normalized text, so the two agree.
+    return " ".join(user_input.split())
+
+
+def catalog_fingerprint(courses_data):
+    """Titles are matched against the input, so a different catalog means a different parse."""
+    digest = hashlib.sha1()
+    for title in sorted({entry.get("title", "") for entry in courses_data}):
+        digest.update(title.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class PreferenceCache:
+    def __init__(self, max_entries=CACHE_SIZE, disk_path=CACHE_PATH):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS preferences (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    @staticmethod
+    def make_key(user_input, catalog_key=""):
+        return f"{catalog_key}:{normalize_input(user_input)}"
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, user_input, catalog_key=""):
+        key = self.make_key(user_input, catalog_key)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                # callers merge into the result, don't let them touch ours
+                return copy.deepcopy(self._entries[key])
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM preferences WHERE key = ?", (key,)).fetchone()
+                if row:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return copy.deepcopy(value)
+
+            self.misses += 1
+            return None
+
+    def put(self, user_input, parsed, catalog_key=""):
+        key = self.make_key(user_input, catalog_key)
+        value = copy.deepcopy(parsed)
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO preferences (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value)),
+                )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM preferences")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+cache = PreferenceCache()
@@ -0,0 +1,134 @@
+# === ranking.py ===
+# Scores complete schedules and keeps the best k while the solver runs.
+#
+# Lower cost is better. A schedule pays for idle gaps between classes on
+# the same day, for every day it puts the student on campus, and for every
+# class before the earliest time they asked for; classes with a preferred
+# instructor earn it back.
+
+import heapq
+import itertools
+
+import build_script
+
+DAYS = "MTWRFSU"
+
+
+class RankingOptions:
+    def __init__(self, earliest_start=None, preferred_instructors=(), gap_weight=1.0,
+                 day_weight=2.0, early_weight=4.0, instructor_weight=3.0):
+        self.earliest_start = earliest_start  # minutes after midnight
+        self.preferred_instructors = [name.lower() for name in preferred_instructors if name]
+        self.gap_weight = gap_weight  # per idle hour
+        self.day_weight = day_weight  # per day on campus
+        self.early_weight = early_weight  # per class before earliest_start
+        self.instructor_weight = instructor_weight  # per class with a preferred instructor
+
+    @classmethod
+    def from_preferences(cls, preferences, **weights):
+        """Options from subset's parsed preferences ("meeting_time" is read as "not before")."""
+        earliest_start = None
+        meeting_time = preferences.get("meeting_time")
+        if isinstance(meeting_time, str):
+            earliest_start = build_script.time_str_to_minutes(meeting_time.split(" and ")[0])
+        instructors = []
+        instructor = preferences.get("instructor")
+        if isinstance(instructor, str):
+            instructors = [name.strip() for name in instructor.split(" and ")]
+        return cls(earliest_start, instructors, **weights)
+
+
+def _meetings(schedule):
+    for section in schedule:
+        start, end = build_script.parse_meeting_time(section.get("meeting_time") or "")
+        if start is None or end is None:
+            continue
+        for day in set(section.get("meeting_days") or ""):
+            yield day, start, end
+
+
+def score_schedule(schedule, options):
+    """(cost, breakdown) for one schedule."""
+    by_day = {}
+    early = 0
+    for day, start, end in _meetings(schedule):
+        by_day.setdefault(day, []).append((start, end))
+        if options.earliest_start is not None and start < options.earliest_start:
+            early += 1
+
+    gap_minutes = 0
+    for spans in by_day.values():
+        spans.sort()
+        for (_, prev_end), (next_start, _) in zip(spans, spans[1:]):
+            gap_minutes += max(0, next_start - prev_end)
+
+    preferred = 0
+    for section in schedule:
+        instructor = (section.get("instructor") or "").lower()
+        if any(name in instructor for name in options.preferred_instructors):
+            preferred += 1
+
+    cost = (
+        options.gap_weight * gap_minutes / 60
+        + options.day_weight * len(by_day)
+        + options.early_weight * early
+        - options.instructor_weight * preferred
+    )
+    return round(cost, 4), {
+        "gap_minutes": gap_minutes,
+        "days": "".join(day for day in DAYS if day in by_day),
+        "early_classes": early,
+        "preferred_instructors": preferred,
+    }
+
+
+class TopK:
+    """Bounded max-heap of the k cheapest schedules seen so far."""
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []  # (-cost, -order, entry), worst on top
+        self._order = itertools.count()
+
+    def push(self, cost, schedule, breakdown):
+        """Returns True if the schedule made it into the top k."""
+        order = next(self._order)
+        item = (-cost, -order, {"score": cost, "breakdown": breakdown, "schedule": schedule})
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+            return True
+        if item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+            return True
+        return False
+
+    def best(self):
+        return [entry for _, _, entry in sorted(self._heap, key=lambda item: (-item[0], -item[1]))]
+
+    def __len__(self):
+        return len(self._heap)
+
+
+def stream_ranked(schedules, k, options, max_candidates=5000):
+    """Rank schedules as they come out of the solver.
+
+    Yields a "candidate" event whenever a schedule enters the current top k
+    (so the client has something to show right away) and one "final" event
+    with the best k, in order, at the end. At most max_candidates schedules
+    are scored.
+    """
+    top = TopK(k)
+    scored = 0
+    for schedule in itertools.islice(schedules, max_candidates):
+        scored += 1
+        cost, breakdown = score_schedule(schedule, options)
+        if top.push(cost, schedule, breakdown):
+            yield {"type": "candidate", "score": cost, "breakdown": breakdown, "schedule": schedule}
+    yield {"type": "final", "scored": scored, "schedules": top.best()}
+
+
+def rank(schedules, k, options, max_candidates=5000):
+    """The best k without the intermediate events."""
+    for event in stream_ranked(schedules, k, options, max_candidates):
+        if event["type"] == "final":
+            return event["schedules"]
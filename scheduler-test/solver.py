@@ -0,0 +1,229 @@
+# === solver.py ===
+# Backtracking search for conflict-free schedules.
+#
+# Every course (subject + number) is a group of interchangeable sections;
+# a schedule takes at most one section per group and at most max_classes
+# groups. Required groups (the courses the student asked for) are placed
+# first and must all fit; the rest fill the remaining slots.
+#
+# The search picks the most constrained group next (fewest sections left),
+# forward-checks by dropping every section that conflicts with the one just
+# placed, and prunes branches that can no longer reach the target size.
+# Conflicts come from a precomputed matrix (conflicts.py). With open_only,
+# sections without seats left are dropped before any of this.
+
+import itertools
+import re
+import time
+
+from conflicts import ConflictMatrix
+
+
+SEATS_RE = re.compile(r"^\s*(\d+)\s+out\s+of\s+\d+\s*$", re.IGNORECASE)
+
+
+def has_open_seats(section):
+    """True unless the section is known to be full (unknown counts as open)."""
+    seats_open = section.get("seats_open")
+    if seats_open is None:
+        # sections from before the API had seats_open: "9 out of 120" is 9 left
+        match = SEATS_RE.match(section.get("seats") or "")
+        if not match:
+            return True
+        seats_open = int(match.group(1))
+    return seats_open > 0
+
+
+def group_sections(courses):
+    grouped = {}
+    for course in courses:
+        key = f"{course['subject']} {course['course']}"
+        grouped.setdefault(key, []).append(course)
+    return grouped
+
+
+class SearchResult:
+    def __init__(self):
+        self.schedules = []
+        # group indexes used by the first schedule
+        self.groups = []
+        # every group got a section
+        self.complete = False
+        # every required group got a section
+        self.required_met = False
+        # not cut off by the time limit, so a missing schedule (or a missing
+        # required course) really means none exists
+        self.exhausted = True
+        self.timed_out = False
+        self.nodes = 0
+        self.elapsed = 0.0
+
+
+class _TimeUp(Exception):
+    pass
+
+
+class ScheduleSearch:
+    def __init__(self, groups, required=(), max_classes=5, time_limit=None, matrix=None):
+        """groups: list of section lists; required: indexes into groups."""
+        self.groups = groups
+        self.required = frozenset(required)
+        self.max_classes = max_classes
+        self.time_limit = time_limit
+
+        # flatten so sections are plain ints during the search
+        self.sections = [section for group in groups for section in group]
+        self.group_of = []
+        for g, group in enumerate(groups):
+            self.group_of.extend([g] * len(group))
+
+        self.matrix = matrix or ConflictMatrix(self.sections)
+        self.conflicts = self.matrix.conflicts
+
+        # sections of a course that meet at the same time are interchangeable,
+        # so the search branches on one representative per time slot and only
+        # expands to the actual sections when it yields a schedule
+        self.members = {}
+        self.domains = []
+        offset = 0
+        for group in groups:
+            slots = {}
+            for i in range(offset, offset + len(group)):
+                slots.setdefault(self.matrix.signature(i), []).append(i)
+            for members in slots.values():
+                self.members[members[0]] = members
+            self.domains.append(tuple(members[0] for members in slots.values()))
+            offset += len(group)
+
+        self.nodes = 0
+        self._deadline = None
+
+    def _check_time(self):
+        self.nodes += 1
+        if self._deadline is not None and self.nodes % 256 == 0 and time.perf_counter() > self._deadline:
+            raise _TimeUp()
+
+    def _search(self, chosen, domains, undecided, size, required):
+        self._check_time()
+        if len(chosen) == size:
+            for sections in itertools.product(*(self.members[s] for s in chosen)):
+                yield list(sections)
+            return
+
+        # prune: even taking every group that still has a section can't reach size
+        open_groups = [g for g in undecided if domains[g]]
+        if len(chosen) + len(open_groups) < size:
+            return
+
+        required_left = [g for g in undecided if g in required]
+        if any(not domains[g] for g in required_left):
+            return
+        pool = required_left or open_groups
+        # most constrained first, ties keep the original course order
+        g = min(pool, key=lambda i: (len(domains[i]), i))
+        rest = [i for i in undecided if i != g]
+
+        for s in domains[g]:
+            # forward checking: drop what conflicts with s from every other group
+            narrowed = dict(domains)
+            for other in rest:
+                narrowed[other] = self.matrix.compatible(s, domains[other])
+            chosen.append(s)
+            yield from self._search(chosen, narrowed, rest, size, required)
+            chosen.pop()
+
+        if g not in required:
+            yield from self._search(chosen, domains, rest, size, required)
+
+    def _make_consistent(self, domains, required):
+        # arc consistency between required courses before searching: a time
+        # slot that clashes with every slot of another required course can
+        # never be used, and two courses that always clash empty each other
+        changed = True
+        while changed:
+            changed = False
+            for g in required:
+                for h in required:
+                    if g == h:
+                        continue
+                    keep = tuple(s for s in domains[g] if any(not self.conflicts(s, t) for t in domains[h]))
+                    if len(keep) != len(domains[g]):
+                        domains[g] = keep
+                        changed = True
+        return domains
+
+    def iter_schedules(self, size, required=None):
+        """Yield every schedule with exactly `size` sections, as lists of section indexes."""
+        required = self.required if required is None else required
+        domains = self._make_consistent(dict(enumerate(self.domains)), required)
+        yield from self._search([], domains, list(range(len(self.groups))), size, required)
+
+    def _required_sets(self, target):
+        # as many of the requested courses as possible, then as many courses
+        # overall: try every required subset, largest first
+        required = sorted(self.required)
+        for k in range(min(len(required), target), -1, -1):
+            for subset in itertools.combinations(required, k):
+                yield frozenset(subset)
+
+    def iter_best(self, result=None):
+        """Yield every schedule (a list of sections) of the best reachable shape.
+
+        The shape is the largest set of required courses that fits, then the
+        largest size. `result` is filled in as the search goes and finalized
+        when the generator finishes or is closed.
+        """
+        result = result if result is not None else SearchResult()
+        start = time.perf_counter()
+        if self.time_limit is not None:
+            self._deadline = start + self.time_limit
+
+        target = min(self.max_classes, len(self.groups))
+        try:
+            for required in self._required_sets(target):
+                # largest schedules first, shrink only if none exists
+                for size in range(target, max(len(required), 1) - 1, -1):
+                    for chosen in self.iter_schedules(size, required):
+                        chosen.sort()  # back in course order
+                        if not result.groups:
+                            result.groups = [self.group_of[s] for s in chosen]
+                        yield [self.sections[s] for s in chosen]
+                    if result.groups:
+                        return
+        except _TimeUp:
+            result.timed_out = True
+            result.exhausted = False
+        finally:
+            result.complete = len(result.groups) == len(self.groups) and bool(self.groups)
+            result.required_met = bool(result.groups) and self.required <= set(result.groups)
+            result.nodes = self.nodes
+            result.elapsed = time.perf_counter() - start
+
+    def run(self, max_solutions=1):
+        result = SearchResult()
+        schedules = self.iter_best(result)
+        for schedule in schedules:
+            result.schedules.append(schedule)
+            if len(result.schedules) >= max_solutions:
+                break
+        schedules.close()
+        return result
+
+
+def make_search(courses, max_classes=5, required_courses=None, time_limit=None, open_only=False):
+    """ScheduleSearch over the flat course list from subset.run.
+
+    required_courses: course numbers (e.g. "2413") that must be scheduled.
+    open_only: leave out full sections.
+    """
+    if open_only:
+        courses = [course for course in courses if has_open_seats(course)]
+    grouped = group_sections(courses)
+    keys = list(grouped)
+    required_courses = set(required_courses or ())
+    required = [i for i, key in enumerate(keys) if grouped[key][0]["course"] in required_courses]
+    return ScheduleSearch([grouped[key] for key in keys], required, max_classes, time_limit)
+
+
+def solve(courses, max_classes=5, required_courses=None, max_solutions=1, time_limit=None, open_only=False):
+    return make_search(courses, max_classes, required_courses, time_limit, open_only).run(max_solutions=max_solutions)
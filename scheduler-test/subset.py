@@ -3,62 +3,27 @@
 import json
 import os
 import re
-import requests
-import torch
-from dotenv import load_dotenv
+import shutil
+import time
 import build_script
-from transformers import AutoTokenizer, AutoModelForCausalLM
+import catalog
+import inference
+import preference_cache
+import ranking
+import solver
+import title_matcher
+import tracing
 
 # === Setup absolute paths ===
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUTS_DIR = os.path.join(BASE_DIR, "outputs")
-SAVED_COURSES_DIR = os.path.join(OUTPUTS_DIR, "saved_courses")
-
-os.makedirs(OUTPUTS_DIR, exist_ok=True)
-os.makedirs(SAVED_COURSES_DIR, exist_ok=True)
-
-# === Load TinyLlama ===
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-model_name = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
-tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
-model = AutoModelForCausalLM.from_pretrained(
-    model_name,
-    torch_dtype=torch.float32,
-    device_map="auto",
-    trust_remote_code=True
-).eval()
 
 # === Helper functions ===
 
-def get_courses(filter_type: str, filter_value: str):
-    load_dotenv()
-    login_url = "https://schedulesooner-backend.onrender.com/api/login/"
-    login_data = {
-        "username": os.getenv("SCHEDULE_USERNAME"),
-        "password": os.getenv("SCHEDULE_PASSWORD")
-    }
-
-    res = requests.post(login_url, json=login_data)
-    if res.status_code != 200:
-        raise Exception(f"Login failed: {res.status_code} {res.text}")
-
-    token_data = res.json()
-    if "access" not in token_data:
-        raise Exception(f"Unexpected login response: {token_data}")
-
-    headers = {"Authorization": f"Bearer {token_data['access']}"}
-    res = requests.get(
-        "https://schedulesooner-backend.onrender.com/cs/courses/",
-        headers=headers,
-        params={filter_type: filter_value}
-    )
-
-    if res.status_code != 200:
-        raise Exception(f"Failed to fetch courses: {res.status_code} {res.text}")
+def get_courses(filter_type: str, filter_value: str, **filters):
+    return catalog.get_courses(filter_type, filter_value, **filters)
 
-    return res.json()["results"]
-
-def regex_parse_preferences(user_input, courses_data):
+def regex_parse_preferences(user_input, courses_data, use_llm=True, matcher=None):
     parsed = {}
     course_codes = re.findall(r'\bCS\s*\d{4}\b', user_input, flags=re.IGNORECASE)
     course_codes = [code.replace(' ', '') for code in course_codes]
@@ -73,7 +38,9 @@ def regex_parse_preferences(user_input, courses_data):
     if meeting_time_match:
         parsed["meeting_time"] = meeting_time_match.group(1).lower()
 
-    matched_titles = [entry.get("title") for entry in courses_data if entry.get("title", "").lower() in user_input.lower()]
+    # one pass over the input, whatever the catalog size (see title_matcher.py)
+    matcher = matcher or title_matcher.for_catalog(courses_data)
+    matched_titles = matcher.find(user_input)
     if matched_titles:
         parsed.setdefault("courses", []).extend({"title": title} for title in matched_titles)
 
@@ -81,24 +48,20 @@ def regex_parse_preferences(user_input, courses_data):
     if instructor_match:
         parsed["instructor"] = instructor_match.group(1).strip()
 
-    if not parsed:
+    if not parsed and use_llm:
         parsed = parse_preferences_with_llm(user_input)
 
     return parsed
 
-def parse_preferences_with_llm(user_input):
+def build_llm_prompt(user_input):
     few_shot = (
         "You are an assistant that extracts course preferences from user input.\n"
         "✅ Only extract fields that are explicitly mentioned.\n"
         "✅ DO NOT guess missing fields like meeting_time or instructor unless stated.\n"
     )
-    prompt = f"{few_shot}\n\nInput: \"{user_input}\"\nOutput:\n"
-    inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+    return f"{few_shot}\n\nInput: \"{user_input}\"\nOutput:\n"
 
-    with torch.no_grad():
-        outputs = model.generate(**inputs, max_new_tokens=150, pad_token_id=tokenizer.eos_token_id)
-
-    decoded = tokenizer.decode(outputs[0], skip_special_tokens=True).strip()
+def extract_llm_json(decoded):
     try:
         json_blocks = re.findall(r"{.*?}", decoded, re.DOTALL)
         last_json = json_blocks[-1]
@@ -107,6 +70,15 @@ def parse_preferences_with_llm(user_input):
     except Exception:
         return {}
 
+def parse_preferences_with_llm(user_input):
+    decoded = inference.batcher.generate(build_llm_prompt(user_input), timeout=inference.TIMEOUT)
+    return extract_llm_json(decoded)
+
+def parse_preferences_with_llm_many(user_inputs):
+    # submitted together so they end up in the same generate batch
+    decoded = inference.batcher.generate_many([build_llm_prompt(text) for text in user_inputs], timeout=inference.TIMEOUT)
+    return [extract_llm_json(text) for text in decoded]
+
 def pre_split_user_input(user_input):
     user_input = user_input.replace('&', 'and')
     pieces = re.split(r'\band\b', user_input, flags=re.IGNORECASE)
@@ -115,52 +87,48 @@ def pre_split_user_input(user_input):
     prefix = pieces[0].strip()
     return [f"{prefix} and {suffix.strip()}" for suffix in pieces[1:]]
 
-def merge_saved_courses():
+def merge_courses(course_lists):
     all_courses = []
     seen = set()
 
-    for filename in os.listdir(SAVED_COURSES_DIR):
-        if filename.endswith(".json") and filename != "courses_output.json":
-            file_path = os.path.join(SAVED_COURSES_DIR, filename)
-            with open(file_path, "r") as f:
-                try:
-                    data = json.load(f)
-                except json.JSONDecodeError:
-                    continue
-                if isinstance(data, dict):
-                    data = [data]
-                for entry in data:
-                    unique_key = entry.get("crn") or entry.get("id")
-                    if unique_key and unique_key not in seen:
-                        seen.add(unique_key)
-                        all_courses.append(entry)
-
-    final_output_path = os.path.join(OUTPUTS_DIR, "all_unique_courses.json")
-    with open(final_output_path, "w") as f:
-        json.dump(all_courses, f, indent=2)
-
-    for filename in os.listdir(SAVED_COURSES_DIR):
-        os.remove(os.path.join(SAVED_COURSES_DIR, filename))
-
-# === Entry point ===
-def main():
-    print("🚀 Running subset.main()...")
-
-    with open(os.path.join(OUTPUTS_DIR, "user_input.json"), "r") as f:
-        user_input = json.load(f).get("user_input")
-
-    courses_data = get_courses("subject", "C S")
-
-    with open(os.path.join(OUTPUTS_DIR, "courses_output.json"), "w") as f:
-        json.dump(courses_data, f, indent=2)
-
-    split_inputs = pre_split_user_input(user_input)
+    for data in course_lists:
+        if isinstance(data, dict):
+            data = [data]
+        for entry in data:
+            unique_key = entry.get("crn") or entry.get("id")
+            if unique_key and unique_key not in seen:
+                seen.add(unique_key)
+                all_courses.append(entry)
+
+    return all_courses
+
+def parse_user_input(user_input, courses_data):
+    """Split, regex-parse and (for what's left) LLM-parse one query, memoized."""
+    # parse exactly what the cache is keyed on
+    user_input = preference_cache.normalize_input(user_input)
+    catalog_key = preference_cache.catalog_fingerprint(courses_data)
+    cached = preference_cache.cache.get(user_input, catalog_key)
+    if cached is not None:
+        return cached
+
+    with tracing.span("split"):
+        split_inputs = pre_split_user_input(user_input)
     parsed_preferences = {}
 
-    print("step 1 done")
+    with tracing.span("regex_parse"):
+        matcher = title_matcher.for_catalog(courses_data, catalog_key)
+        parsed_pieces = [regex_parse_preferences(sub_input, courses_data, use_llm=False, matcher=matcher)
+                         for sub_input in split_inputs]
+
+    # everything the regexes couldn't parse goes to the LLM as one batch
+    llm_indexes = [i for i, piece in enumerate(parsed_pieces) if not piece]
+    if llm_indexes:
+        with tracing.span("llm_parse"):
+            llm_results = parse_preferences_with_llm_many([split_inputs[i] for i in llm_indexes])
+        for i, piece in zip(llm_indexes, llm_results):
+            parsed_pieces[i] = piece
 
-    for sub_input in split_inputs:
-        parsed_piece = regex_parse_preferences(sub_input, courses_data)
+    for parsed_piece in parsed_pieces:
         for key, value in parsed_piece.items():
             if key not in parsed_preferences:
                 parsed_preferences[key] = value
@@ -170,20 +138,10 @@ def main():
                 elif isinstance(parsed_preferences[key], str) and isinstance(value, str):
                     parsed_preferences[key] = f"{parsed_preferences[key]} and {value}"
 
-    if not parsed_preferences:
-        print("❌ No valid preferences parsed.")
-
-        error_output_path = os.path.join(OUTPUTS_DIR, "final_schedule.json")
-        with open(error_output_path, "w") as f:
-            json.dump({
-                "title": "No valid preferences could be parsed from your input."
-            }, f, indent=2)
-
-
-        return
-
-    print("step 2 done")
+    preference_cache.cache.put(user_input, parsed_preferences, catalog_key)
+    return parsed_preferences
 
+def validate_preferences(parsed_preferences, courses_data):
     validated_preferences = {}
     for course_item in parsed_preferences.get("courses", []):
         if "course" in course_item:
@@ -200,30 +158,166 @@ def main():
         if key in parsed_preferences:
             validated_preferences[key] = parsed_preferences[key]
 
-    print("step 2.5 done")
+    return validated_preferences
 
+def fetch_filtered_courses(validated_preferences, open_only=False):
+    """One lookup per filter, keyed like the old saved_courses/*.json files.
+
+    With open_only, full sections are left out by the catalog query itself.
+    """
+    extra = {"open_only": True} if open_only else {}
+    results = {}
     for filter_type, filter_value in validated_preferences.items():
         if filter_type == "courses":
             for course in filter_value:
                 course_number = course["course"]
                 safe_val = re.sub(r'\W+', '_', course_number)
-                course_results = get_courses("course", course_number)
-                with open(os.path.join(SAVED_COURSES_DIR, f"course_{safe_val}.json"), "w") as f:
-                    json.dump(course_results, f, indent=2)
+                results[f"course_{safe_val}"] = get_courses("course", course_number, **extra)
         else:
             safe_val = re.sub(r'\W+', '_', str(filter_value))
-            results = get_courses(filter_type, filter_value)
-            with open(os.path.join(SAVED_COURSES_DIR, f"{filter_type}_{safe_val}.json"), "w") as f:
-                json.dump(results, f, indent=2)
+            results[f"{filter_type}_{safe_val}"] = get_courses(filter_type, filter_value, **extra)
+    return results
+
+def dump_json(debug_dir, relative_path, data):
+    if debug_dir is None:
+        return
+    path = os.path.join(debug_dir, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+class Candidates:
+    """Everything the solver needs, produced by steps 1-4 of the pipeline."""
+
+    def __init__(self, courses, preferences, required_courses):
+        self.courses = courses
+        self.preferences = preferences
+        self.required_courses = required_courses
+
+def gather_candidates(user_input, debug_dir=None, open_only=False):
+    """Fetch, parse, validate, per-filter fetch and merge.
+
+    Returns Candidates, or the error dict when nothing could be parsed.
+    open_only drops full sections from the per-filter fetches.
+    """
+    if debug_dir is not None:
+        shutil.rmtree(os.path.join(debug_dir, "saved_courses"), ignore_errors=True)
+
+    with tracing.span("catalog_fetch"):
+        courses_data = get_courses("subject", "C S")
+    dump_json(debug_dir, "courses_output.json", courses_data)
+
+    parsed_preferences = parse_user_input(user_input, courses_data)
+
+    print("step 1 done")
+
+    if not parsed_preferences:
+        print("❌ No valid preferences parsed.")
+        error = {"title": "No valid preferences could be parsed from your input."}
+        dump_json(debug_dir, "final_schedule.json", error)
+        return error
+
+    print("step 2 done")
+
+    with tracing.span("validate"):
+        validated_preferences = validate_preferences(parsed_preferences, courses_data)
+
+    print("step 2.5 done")
+
+    with tracing.span("filter_fetch"):
+        filtered_courses = fetch_filtered_courses(validated_preferences, open_only)
+    for name, results in filtered_courses.items():
+        dump_json(debug_dir, os.path.join("saved_courses", f"{name}.json"), results)
     print("step 3 done")
-    merge_saved_courses()
+    with tracing.span("merge"):
+        all_courses = merge_courses(filtered_courses.values())
+    dump_json(debug_dir, "all_unique_courses.json", all_courses)
     print("step 4 done")
-    build_script.main()
+    required_courses = [course["course"] for course in validated_preferences.get("courses", [])]
+    return Candidates(all_courses, parsed_preferences, required_courses)
+
+def run(user_input, debug_dir=None):
+    """Query in, schedule out, with every stage handed over in memory.
+
+    Returns the list of selected sections, or the error dict when nothing
+    could be parsed. With debug_dir set, each intermediate result is also
+    written there under the old file names.
+    """
+    candidates = gather_candidates(user_input, debug_dir)
+    if not isinstance(candidates, Candidates):
+        return candidates
+
+    with tracing.span("solve"):
+        schedule = build_script.build_schedule(candidates.courses, max_classes=5, required_courses=candidates.required_courses)
+    if not schedule:
+        print("⚠️ Could not build any valid schedule.")
+    else:
+        with tracing.span("save"):
+            dump_json(debug_dir, "final_schedule.json", schedule)
+    print("step 5 done")
+    return schedule
+
+def run_ranked(user_input, k=5, time_limit=5.0, open_only=False):
+    """Like run(), but yields ranking events (see ranking.stream_ranked) for
+    the best k schedules instead of returning the first one found.
+    open_only leaves out sections with no seats left."""
+    candidates = gather_candidates(user_input, open_only=open_only)
+    if not isinstance(candidates, Candidates):
+        yield {"type": "error", **candidates}
+        return
+
+    search = solver.make_search(candidates.courses, max_classes=5,
+                                required_courses=candidates.required_courses, time_limit=time_limit,
+                                open_only=open_only)
+    options = ranking.RankingOptions.from_preferences(candidates.preferences)
+    result = solver.SearchResult()
+    schedules = search.iter_best(result)
+    events = ranking.stream_ranked(schedules, k, options)
+    # solve time only: the time the caller spends on each event isn't ours
+    start = time.perf_counter()
+    solving = 0.0
+    try:
+        while True:
+            resumed = time.perf_counter()
+            event = next(events, None)
+            solving += time.perf_counter() - resumed
+            if event is None:
+                break
+            if event["type"] == "final":
+                tracing.record("solve", start, solving)
+                # stream_ranked may stop at max_candidates with the search
+                # still suspended; its flags are only filled in once it closes
+                schedules.close()
+                event["required_met"] = result.required_met
+                event["timed_out"] = result.timed_out
+            yield event
+    finally:
+        schedules.close()
     print("step 5 done")
-    user_input_path = os.path.join(OUTPUTS_DIR, "user_input.json")
+
+# === Entry point ===
+def main(user_input=None, outputs_dir=OUTPUTS_DIR):
+    """Standalone run: the query comes from outputs/user_input.json and every
+    stage is dumped to outputs/, then build_script self-tests and uploads it.
+    """
+    print("🚀 Running subset.main()...")
+
+    from_file = user_input is None
+    user_input_path = os.path.join(outputs_dir, "user_input.json")
+    if from_file:
+        with open(user_input_path, "r") as f:
+            user_input = json.load(f).get("user_input")
+
+    schedule = run(user_input, debug_dir=outputs_dir)
+
+    if from_file and isinstance(schedule, list) and schedule:
+        with tracing.span("save"):
+            build_script.publish(outputs_dir)
+
     if os.path.exists(user_input_path):
         os.remove(user_input_path)
         print("🧹 user_input.json deleted")
+    return schedule
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
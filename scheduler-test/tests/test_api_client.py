@@ -0,0 +1,145 @@
+import base64
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))  # tests/
+BASE_DIR = os.path.dirname(CURRENT_DIR)  # project root
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from api_client import ApiClient  # noqa: E402
+
+PAGE_SIZE = 3
+COURSES = [{"id": i, "crn": str(1000 + i), "course": "2413"} for i in range(1, 9)]
+
+
+def make_token(kind, lifetime):
+    payload = json.dumps({"token_type": kind, "exp": time.time() + lifetime}).encode()
+    return "x." + base64.urlsafe_b64encode(payload).decode().rstrip("=") + ".sig"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # keep-alive, like gunicorn behind render
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        state = self.server.state
+        length = int(self.headers.get("Content-Length", 0))
+        data = json.loads(self.rfile.read(length) or b"{}")
+        state["ports"].add(self.client_address[1])
+
+        if self.path == "/api/login/":
+            state["logins"] += 1
+            if data != {"username": "student", "password": "secret"}:
+                return self._send(401, {"detail": "No active account"})
+            access = make_token("access", state["lifetime"])
+            state["valid"].add(access)
+            return self._send(200, {"access": access, "refresh": make_token("refresh", 3600)})
+
+        if self.path == "/api/token/refresh/":
+            state["refreshes"] += 1
+            access = make_token("access", state["lifetime"])
+            state["valid"].add(access)
+            return self._send(200, {"access": access})
+
+        self._send(404, {})
+
+    def do_GET(self):
+        state = self.server.state
+        state["ports"].add(self.client_address[1])
+        url = urlparse(self.path)
+        auth = self.headers.get("Authorization", "")
+        if auth.removeprefix("Bearer ") not in state["valid"]:
+            return self._send(401, {"detail": "Given token not valid"})
+        if url.path != "/cs/courses/":
+            return self._send(404, {})
+
+        query = parse_qs(url.query)
+        if query.get("format") == ["ndjson"]:
+            state["streams"] += 1
+            body = "".join(json.dumps(course) + "\n" for course in COURSES).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        page = int(query.get("page", ["1"])[0])
+        start = (page - 1) * PAGE_SIZE
+        next_url = None
+        if start + PAGE_SIZE < len(COURSES):
+            next_url = f"http://127.0.0.1:{self.server.server_port}/cs/courses/?course=2413&page={page + 1}"
+        self._send(200, {
+            "count": len(COURSES),
+            "next": next_url,
+            "previous": None,
+            "results": COURSES[start:start + PAGE_SIZE],
+        })
+
+
+class TestApiClient(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.server.state = {"logins": 0, "refreshes": 0, "ports": set(), "valid": set(), "lifetime": 300, "streams": 0}
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = ApiClient(f"http://127.0.0.1:{self.server.server_port}", "student", "secret")
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reads_every_page(self):
+        self.assertEqual(list(self.client.iter_results("/cs/courses/", {"course": "2413"})), COURSES)
+
+    def test_get_courses_streams_in_one_request(self):
+        self.assertEqual(self.client.get_courses("course", "2413"), COURSES)
+        self.assertEqual(self.server.state["streams"], 1)
+
+    def test_logs_in_once_and_reuses_connection(self):
+        for _ in range(5):
+            self.client.get_courses("course", "2413")
+        self.assertEqual(self.server.state["logins"], 1)
+        self.assertEqual(len(self.server.state["ports"]), 1)
+
+    def test_refreshes_expiring_token(self):
+        # tokens that expire inside the refresh margin are refreshed every call
+        self.server.state["lifetime"] = 5
+        self.client.get_courses("course", "2413")
+        self.client.get_courses("course", "2413")
+        self.assertEqual(self.server.state["logins"], 1)
+        self.assertGreaterEqual(self.server.state["refreshes"], 1)
+
+    def test_retries_after_revoked_token(self):
+        self.client.get_courses("course", "2413")
+        self.server.state["valid"].clear()
+        self.assertEqual(self.client.get_courses("course", "2413"), COURSES)
+
+    def test_bad_credentials(self):
+        client = ApiClient(f"http://127.0.0.1:{self.server.server_port}", "student", "wrong")
+        with self.assertRaises(Exception):
+            client.get_courses("course", "2413")
+        client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))  # tests/
+BASE_DIR = os.path.dirname(CURRENT_DIR)  # project root
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import subset  # noqa: E402
+from inference import BatchInferenceQueue, stub_batch  # noqa: E402
+
+
+class RecordingRunner:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, prompts):
+        self.batches.append(list(prompts))
+        return [prompt.upper() for prompt in prompts]
+
+
+class TestBatchInferenceQueue(unittest.TestCase):
+    def test_each_caller_gets_its_own_result(self):
+        runner = RecordingRunner()
+        batcher = BatchInferenceQueue(runner, max_batch_size=4, max_wait=0.05)
+        prompts = [f"prompt {i}" for i in range(10)]
+        with ThreadPoolExecutor(10) as pool:
+            results = list(pool.map(batcher.generate, prompts))
+        self.assertEqual(results, [p.upper() for p in prompts])
+        self.assertTrue(all(len(batch) <= 4 for batch in runner.batches))
+        self.assertLess(len(runner.batches), len(prompts))
+
+    def test_generate_many_shares_a_batch(self):
+        runner = RecordingRunner()
+        batcher = BatchInferenceQueue(runner, max_batch_size=8, max_wait=0.05)
+        self.assertEqual(batcher.generate_many(["a", "b", "c"]), ["A", "B", "C"])
+        self.assertEqual(runner.batches, [["a", "b", "c"]])
+
+    def test_errors_reach_every_caller(self):
+        def broken(prompts):
+            raise RuntimeError("out of memory")
+
+        batcher = BatchInferenceQueue(broken, max_wait=0.01)
+        futures = [batcher.submit("a"), batcher.submit("b")]
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=5)
+
+    def test_short_batch_fails_every_caller(self):
+        batcher = BatchInferenceQueue(lambda prompts: ["only one"], max_batch_size=8, max_wait=0.05)
+        with self.assertRaisesRegex(RuntimeError, "1 results for 2 prompts"):
+            batcher.generate_many(["a", "b"], timeout=5)
+
+    def test_timeout(self):
+        release = threading.Event()
+
+        def stuck(prompts):
+            release.wait(5)
+            return prompts
+
+        batcher = BatchInferenceQueue(stuck, max_batch_size=1, max_wait=0.01)
+        self.addCleanup(release.set)
+        first = batcher.submit("first")
+        with self.assertRaises(TimeoutError):
+            batcher.generate_many(["a", "b"], timeout=0.05)
+        release.set()
+        self.assertEqual(first.result(timeout=5), "first")
+
+
+class TestStubLLM(unittest.TestCase):
+    def test_answers_are_deterministic_and_parseable(self):
+        prompts = [subset.build_llm_prompt(text) for text in ["something in the morning", "no fridays please"]]
+        first = stub_batch(prompts, latency=0)
+        self.assertEqual(first, stub_batch(prompts, latency=0))
+        for decoded in first:
+            self.assertIn(subset.extract_llm_json(decoded)["meeting_days"], ["MWF", "TR", "MW"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))  # tests/
+BASE_DIR = os.path.dirname(CURRENT_DIR)  # project root
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from model_manager import ModelManager  # noqa: E402
+
+
+class SlowLoader:
+    def __init__(self, delay=0.1, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("no weights")
+        return "tokenizer", "model"
+
+
+class TestModelManager(unittest.TestCase):
+    def test_nothing_loaded_until_used(self):
+        loader = SlowLoader()
+        manager = ModelManager(loader)
+        self.assertFalse(manager.is_ready())
+        self.assertEqual(loader.calls, 0)
+        self.assertEqual(manager.get(), ("tokenizer", "model"))
+        self.assertTrue(manager.is_ready())
+        self.assertEqual(manager.status()["state"], "ready")
+        self.assertGreater(manager.status()["load_seconds"], 0)
+
+    def test_concurrent_callers_load_once(self):
+        loader = SlowLoader()
+        manager = ModelManager(loader)
+        threads = [threading.Thread(target=manager.get) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(loader.calls, 1)
+
+    def test_warm_up_runs_in_background(self):
+        loader = SlowLoader(delay=0.3)
+        manager = ModelManager(loader)
+        start = time.perf_counter()
+        manager.warm_up()
+        self.assertLess(time.perf_counter() - start, 0.2)
+        self.assertTrue(manager.wait(timeout=5))
+        manager.get()
+        self.assertEqual(loader.calls, 1)
+
+    def test_failed_load_is_reported_and_retried(self):
+        loader = SlowLoader(delay=0, fail=True)
+        manager = ModelManager(loader)
+        with self.assertRaises(RuntimeError):
+            manager.get()
+        self.assertEqual(manager.status()["state"], "failed")
+        loader.fail = False
+        manager.get()
+        self.assertTrue(manager.is_ready())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))  # tests/
+BASE_DIR = os.path.dirname(CURRENT_DIR)  # project root
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import preference_cache  # noqa: E402
+import subset  # noqa: E402
+from preference_cache import PreferenceCache  # noqa: E402
+
+COURSES = [
+    {"course": "2413", "title": "Data Structures"},
+    {"course": "3113", "title": "Operating Systems"},
+]
+
+
+class TestPreferenceCache(unittest.TestCase):
+    def test_normalized_inputs_share_an_entry(self):
+        cache = PreferenceCache(max_entries=4)
+        cache.put("CS 2413  and CS 3113 MWF", {"meeting_days": "MWF"})
+        self.assertEqual(cache.get(" CS 2413 and\tCS 3113 MWF"), {"meeting_days": "MWF"})
+        self.assertIsNone(cache.get("cs 2413 and cs 3113 mwf"))
+        self.assertIsNone(cache.get("CS 2413 MWF"))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_lru_eviction(self):
+        cache = PreferenceCache(max_entries=2)
+        cache.put("a", {"n": 1})
+        cache.put("b", {"n": 2})
+        cache.get("a")
+        cache.put("c", {"n": 3})
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), {"n": 1})
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_results_are_copies(self):
+        cache = PreferenceCache()
+        cache.put("q", {"courses": [{"course": "2413"}]})
+        cache.get("q")["courses"].append({"course": "3113"})
+        self.assertEqual(cache.get("q"), {"courses": [{"course": "2413"}]})
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "prefs.sqlite3")
+            PreferenceCache(disk_path=path).put("CS 2413", {"courses": [{"course": "CS2413"}]}, "v1")
+            cache = PreferenceCache(disk_path=path)
+            self.assertEqual(cache.get("CS  2413", "v1"), {"courses": [{"course": "CS2413"}]})
+            self.assertIsNone(cache.get("CS 2413", "v2"))
+            self.assertEqual(cache.disk_hits, 1)
+
+
+class TestParseUserInputCaching(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(preference_cache, "cache", PreferenceCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeated_query_skips_the_llm(self):
+        with mock.patch.object(subset, "parse_preferences_with_llm_many", return_value=[{"instructor": "Sridhar"}]) as llm:
+            first = subset.parse_user_input("something fun", COURSES)
+            second = subset.parse_user_input("something   fun ", COURSES)
+        self.assertEqual(first, second)
+        self.assertEqual(llm.call_count, 1)
+
+    def test_case_is_part_of_the_key(self):
+        # the instructor regex is case-sensitive, so these must not share a parse
+        self.assertNotIn("instructor", subset.parse_user_input("CS 2413 With Neeman", COURSES))
+        parsed = subset.parse_user_input("CS 2413 with Neeman", COURSES)
+        self.assertEqual(parsed["instructor"], "Neeman")
+        self.assertEqual(parsed, subset.regex_parse_preferences("CS 2413 with Neeman", COURSES, use_llm=False))
+
+    def test_catalog_change_misses(self):
+        self.assertIn("courses", subset.parse_user_input("Data Structures MWF", COURSES))
+        parsed = subset.parse_user_input("Data Structures MWF", COURSES[1:])
+        self.assertEqual(parsed, {"meeting_days": "MWF"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import functools
+import os
+import sys
+import unittest
+from unittest import mock
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))  # tests/
+BASE_DIR = os.path.dirname(CURRENT_DIR)  # project root
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import ranking  # noqa: E402
+import solver  # noqa: E402
+
+
+def section(course, number, days, time, instructor="Staff"):
+    return {
+        "crn": f"{course}-{number}",
+        "subject": "C S",
+        "course": course,
+        "section": str(number),
+        "meeting_days": days,
+        "meeting_time": time,
+        "instructor": instructor,
+    }
+
+
+class ScoreTests(unittest.TestCase):
+
+    def test_gaps_and_days(self):
+        schedule = [
+            section("1001", 1, "MW", "9:00 am - 9:50 am"),
+            section("1002", 1, "MW", "11:00 am - 11:50 am"),
+        ]
+        cost, breakdown = ranking.score_schedule(schedule, ranking.RankingOptions())
+        self.assertEqual(breakdown["gap_minutes"], 2 * 70)
+        self.assertEqual(breakdown["days"], "MW")
+        self.assertAlmostEqual(cost, 140 / 60 + 2 * 2, places=3)
+
+    def test_early_classes_and_preferred_instructor(self):
+        options = ranking.RankingOptions.from_preferences({"meeting_time": "10:00 am", "instructor": "Smith"})
+        schedule = [
+            section("1001", 1, "TR", "9:00 am - 10:15 am", instructor="Jane Smith"),
+            section("1002", 1, "TR", "10:30 am - 11:45 am"),
+        ]
+        _, breakdown = ranking.score_schedule(schedule, options)
+        self.assertEqual(breakdown["early_classes"], 2)  # one section, two days
+        self.assertEqual(breakdown["preferred_instructors"], 1)
+
+
+class TopKTests(unittest.TestCase):
+
+    def test_keeps_only_the_cheapest_k_in_order(self):
+        top = ranking.TopK(3)
+        for cost in [5, 1, 4, 2, 3, 0]:
+            top.push(cost, [cost], {})
+        self.assertEqual(len(top), 3)
+        self.assertEqual([entry["score"] for entry in top.best()], [0, 1, 2])
+
+    def test_ties_keep_the_first_seen(self):
+        top = ranking.TopK(1)
+        top.push(1, ["first"], {})
+        self.assertFalse(top.push(1, ["second"], {}))
+        self.assertEqual(top.best()[0]["schedule"], ["first"])
+
+
+class StreamTests(unittest.TestCase):
+
+    def test_candidates_stream_before_final(self):
+        courses = [
+            section("1001", 1, "MWF", "8:00 am - 8:50 am"),
+            section("1001", 2, "MWF", "10:00 am - 10:50 am"),
+            section("1002", 1, "MWF", "11:00 am - 11:50 am"),
+            section("1002", 2, "TR", "1:00 pm - 2:15 pm"),
+        ]
+        search = solver.make_search(courses, max_classes=2)
+        events = list(ranking.stream_ranked(search.iter_best(), 2, ranking.RankingOptions()))
+
+        self.assertEqual(events[0]["type"], "candidate")
+        final = events[-1]
+        self.assertEqual(final["type"], "final")
+        self.assertEqual(final["scored"], 4)
+        best = final["schedules"][0]["schedule"]
+        # back-to-back on the same three days beats spreading over five
+        self.assertEqual([s["crn"] for s in best], ["1001-2", "1002-1"])
+
+    def test_max_candidates_bounds_the_work(self):
+        schedules = ([section("1001", n, "M", "9:00 am - 9:50 am")] for n in range(100))
+        events = list(ranking.stream_ranked(schedules, 3, ranking.RankingOptions(), max_candidates=10))
+        self.assertEqual(events[-1]["scored"], 10)
+
+    def test_run_ranked_flags_after_cut_off_search(self):
+        import subset
+
+        courses = [section(course, n, "MWF" if n % 2 else "TR", f"{7 + n}:00 am - {7 + n}:50 am")
+                   for course in ("1001", "1002") for n in range(1, 5)]
+        candidates = subset.Candidates(courses, {}, ["1001", "1002"])
+        # the solver is still suspended when the ranking stops taking schedules
+        short = functools.partial(ranking.stream_ranked, max_candidates=2)
+        with mock.patch.object(subset, "gather_candidates", return_value=candidates), \
+                mock.patch.object(ranking, "stream_ranked", short):
+            final = list(subset.run_ranked("CS 1001 and CS 1002", k=2))[-1]
+        self.assertEqual(final["scored"], 2)
+        self.assertTrue(final["required_met"])
+        self.assertFalse(final["timed_out"])
+
+
+if __name__ == "__main__":
+    unittest.main()
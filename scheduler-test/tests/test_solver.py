@@ -0,0 +1,115 @@
+import os
+import sys
+import unittest
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))  # tests/
+BASE_DIR = os.path.dirname(CURRENT_DIR)  # project root
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import build_script  # noqa: E402
+import conflicts  # noqa: E402
+import solver  # noqa: E402
+
+
+def section(course, number, days, time, crn=None):
+    return {
+        "crn": crn or f"{course}-{number}",
+        "subject": "C S",
+        "course": course,
+        "section": str(number),
+        "meeting_days": days,
+        "meeting_time": time,
+    }
+
+
+def pairwise_ok(schedule):
+    return all(not build_script.check_conflict([a], b) for i, a in enumerate(schedule) for b in schedule[i + 1:])
+
+
+class TestSolver(unittest.TestCase):
+    def test_finds_schedule_first_fit_misses(self):
+        # first-fit takes 2413-1, which blocks the only 3113 section
+        courses = [
+            section("2413", 1, "MWF", "9:00 am - 9:50 am"),
+            section("2413", 2, "TR", "1:30 pm - 2:45 pm"),
+            section("3113", 1, "MWF", "9:00 am - 9:50 am"),
+        ]
+        schedule = build_script.build_schedule(courses)
+        self.assertEqual([(s["course"], s["section"]) for s in schedule], [("2413", "2"), ("3113", "1")])
+
+    def test_reports_when_nothing_fits(self):
+        courses = [
+            section("2413", 1, "MWF", "9:00 am - 9:50 am"),
+            section("3113", 1, "MWF", "9:30 am - 10:20 am"),
+        ]
+        result = solver.solve(courses, required_courses=["2413", "3113"])
+        self.assertTrue(result.exhausted)
+        self.assertFalse(result.required_met)
+        self.assertFalse(result.complete)
+        # best effort still schedules one of them
+        self.assertEqual(len(result.schedules[0]), 1)
+
+    def test_requested_courses_win_over_filler(self):
+        filler = [section(str(1000 + i), 1, "TR", f"{i + 8}:00 am - {i + 8}:50 am") for i in range(4)]
+        courses = filler + [
+            section("2413", 1, "TR", "8:00 am - 8:50 am"),
+            section("2413", 2, "MWF", "8:00 am - 8:50 am"),
+            section("3113", 1, "MWF", "10:00 am - 10:50 am"),
+        ]
+        result = solver.solve(courses, max_classes=3, required_courses=["2413", "3113"])
+        picked = {s["course"] for s in result.schedules[0]}
+        self.assertTrue({"2413", "3113"} <= picked)
+        self.assertTrue(result.required_met)
+        self.assertEqual(len(picked), 3)
+
+    def test_enumerates_every_section_in_a_time_slot(self):
+        courses = [
+            section("2413", 1, "MWF", "9:00 am - 9:50 am"),
+            section("2413", 2, "MWF", "9:00 am - 9:50 am"),
+            section("3113", 1, "TR", "9:00 am - 10:15 am"),
+        ]
+        result = solver.solve(courses, max_solutions=10)
+        self.assertEqual(len(result.schedules), 2)
+        self.assertTrue(result.complete)
+
+    def test_solutions_are_conflict_free(self):
+        sys.path.insert(0, os.path.join(BASE_DIR, "benchmarks"))
+        from synthetic import make_catalog
+
+        catalog = make_catalog(courses=6, sections_per_course=20, time_density=0.8, seed=3)
+        result = solver.solve(catalog, max_classes=6, max_solutions=50)
+        self.assertTrue(result.schedules)
+        for schedule in result.schedules:
+            self.assertEqual(len({s["course"] for s in schedule}), len(schedule))
+            self.assertTrue(pairwise_ok(schedule))
+
+    def test_day_bits_are_fixed(self):
+        before = dict(conflicts.DAY_BITS)
+        self.assertEqual(conflicts.day_mask("TTH"), (1 << conflicts.DAY_BITS["T"]) | (1 << conflicts.DAY_BITS["H"]))
+        # two unusual letters never share a bit, and nothing is added to the table
+        self.assertFalse(conflicts.day_mask("H") & conflicts.day_mask("B"))
+        self.assertEqual(conflicts.day_mask("½"), 1 << conflicts.OTHER_BIT)
+        self.assertEqual(conflicts.DAY_BITS, before)
+
+    def test_sections_without_times_never_conflict(self):
+        courses = [
+            section("2413", 1, "", ""),
+            section("3113", 1, "MWF", "9:00 am - 9:50 am"),
+        ]
+        self.assertEqual(len(build_script.build_schedule(courses)), 2)
+
+    def test_open_only_skips_full_sections(self):
+        full = dict(section("2413", 1, "MWF", "9:00 am - 9:50 am"), seats="0 out of 120")
+        courses = [
+            full,
+            dict(section("2413", 2, "TR", "1:30 pm - 2:45 pm"), seats_open=3),
+            section("3113", 1, "MWF", "10:00 am - 10:50 am"),  # no seat data, kept
+        ]
+        result = solver.solve(courses, max_solutions=10, open_only=True)
+        self.assertEqual([[s["crn"] for s in schedule] for schedule in result.schedules], [["2413-2", "3113-1"]])
+        self.assertEqual(len(solver.solve(courses, max_solutions=10).schedules), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import unittest
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))  # tests/
+BASE_DIR = os.path.dirname(CURRENT_DIR)  # project root
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import subset  # noqa: E402
+import title_matcher  # noqa: E402
+from title_matcher import TitleMatcher  # noqa: E402
+
+COURSES = [
+    {"course": "2413", "title": "Data Structures"},
+    {"course": "2413", "title": "Data Structures"},
+    {"course": "3413", "title": "Analysis of Algorithms"},
+    {"course": "4413", "title": "Algorithms"},
+    {"course": "4013", "title": "Operating Systems"},
+    {"course": "4990", "title": ""},
+]
+
+
+class TestTitleMatcher(unittest.TestCase):
+    def test_finds_titles_case_insensitively_in_order(self):
+        matcher = TitleMatcher(entry["title"] for entry in COURSES)
+        self.assertEqual(matcher.find("operating systems then DATA STRUCTURES"),
+                         ["Operating Systems", "Data Structures"])
+        self.assertEqual(matcher.find("CS 2413 on MWF"), [])
+
+    def test_longest_non_overlapping(self):
+        matcher = TitleMatcher(["Analysis of Algorithms", "Algorithms", "ab", "bcd", "cd"])
+        self.assertEqual(matcher.find("analysis of algorithms"), ["Analysis of Algorithms"])
+        self.assertEqual(matcher.find("Algorithms and analysis of algorithms"),
+                         ["Algorithms", "Analysis of Algorithms"])
+        # "bcd" overlaps "ab", so the shorter "cd" ending at the same place wins
+        self.assertEqual(matcher.spans("abcd"), [(0, 2, 2), (2, 4, 4)])
+
+    def test_each_title_once(self):
+        matcher = TitleMatcher(entry["title"] for entry in COURSES)
+        self.assertEqual(len(matcher), 4)
+        self.assertEqual(matcher.find("data structures, data structures"), ["Data Structures"])
+
+    def test_cached_per_catalog(self):
+        first = title_matcher.for_catalog(COURSES)
+        self.assertIs(title_matcher.for_catalog(list(COURSES)), first)
+        self.assertIsNot(title_matcher.for_catalog(COURSES[:2]), first)
+
+    def test_regex_parse_preferences_uses_it(self):
+        parsed = subset.regex_parse_preferences("Analysis of Algorithms on TR", COURSES, use_llm=False)
+        self.assertEqual(parsed["courses"], [{"title": "Analysis of Algorithms"}])
+        self.assertEqual(parsed["meeting_days"], "TR")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import threading
+import unittest
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))  # tests/
+BASE_DIR = os.path.dirname(CURRENT_DIR)  # project root
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import tracing  # noqa: E402
+
+
+class TestTracing(unittest.TestCase):
+    def test_spans_land_on_the_trace_and_the_histograms(self):
+        registry = tracing.Registry()
+        with tracing.trace() as trace:
+            with tracing.span("regex_parse", registry):
+                pass
+            with tracing.span("filter_fetch", registry):
+                pass
+            with tracing.span("filter_fetch", registry):
+                pass
+        self.assertEqual([span["stage"] for span in trace.as_list()], ["regex_parse", "filter_fetch", "filter_fetch"])
+        self.assertEqual(list(trace.totals()), ["regex_parse", "filter_fetch"])
+        snapshot = registry.snapshot()["histograms"]
+        self.assertEqual(snapshot["filter_fetch"]["count"], 2)
+        self.assertEqual(snapshot["filter_fetch"]["buckets_ms"]["+Inf"], 2)
+
+    def test_span_outside_a_trace_only_counts(self):
+        registry = tracing.Registry()
+        with tracing.span("solve", registry):
+            pass
+        self.assertIsNone(tracing.current_trace())
+        self.assertEqual(registry.snapshot()["histograms"]["solve"]["count"], 1)
+
+    def test_threads_keep_their_own_trace(self):
+        registry = tracing.Registry()
+        seen = {}
+
+        def work(name):
+            with tracing.trace() as trace:
+                with tracing.span(name, registry):
+                    pass
+            seen[name] = [span["stage"] for span in trace.as_list()]
+
+        threads = [threading.Thread(target=work, args=(name,)) for name in ("a", "b", "c")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(seen, {"a": ["a"], "b": ["b"], "c": ["c"]})
+
+    def test_histogram_buckets(self):
+        histogram = tracing.Histogram(buckets=(1, 10))
+        for seconds in (0.0005, 0.005, 0.005, 2):
+            histogram.observe(seconds)
+        self.assertEqual(histogram.snapshot()["buckets_ms"], {"1": 1, "10": 3, "+Inf": 4})
+
+
+if __name__ == '__main__':
+    unittest.main()
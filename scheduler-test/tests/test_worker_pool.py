@@ -0,0 +1,98 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))  # tests/
+BASE_DIR = os.path.dirname(CURRENT_DIR)  # project root
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+import tracing  # noqa: E402
+import worker_pool  # noqa: E402
+
+# loaded before the fork, read by the workers
+SHARED = {"table": list(range(1000))}
+
+
+def fake_runner(query, debug_dir=None):
+    if query == "crash":
+        os._exit(1)
+    if query == "boom":
+        raise ValueError("bad query")
+    with tracing.span("solve"):
+        time.sleep(0.05)
+    return {"query": query.upper(), "shared": len(SHARED["table"]), "pid": os.getpid()}
+
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.address = os.path.join(self.tmp_dir, "pool.sock")
+        self.pool = worker_pool.WorkerPool(workers=2, runner=fake_runner)
+        self.pool.start()
+        self.server = threading.Thread(target=self.pool.serve, args=(self.address, b"secret"), daemon=True)
+        self.server.start()
+        for _ in range(100):
+            if os.path.exists(self.address):
+                break
+            time.sleep(0.01)
+        self.client = worker_pool.PoolClient(self.address, b"secret", timeout=10)
+
+    def tearDown(self):
+        self.pool.shutdown(self.address, b"secret")
+        self.server.join(5)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_runs_queries_on_forked_workers(self):
+        with ThreadPoolExecutor(6) as executor:
+            payloads = list(executor.map(self.client.run, [f"q{i}" for i in range(6)]))
+        self.assertEqual([p["result"]["query"] for p in payloads], [f"Q{i}" for i in range(6)])
+        self.assertTrue(all(p["result"]["shared"] == 1000 for p in payloads))
+        pids = {p["worker"] for p in payloads}
+        self.assertEqual(len(pids), 2)
+        self.assertNotIn(os.getpid(), pids)
+        self.assertEqual(payloads[0]["timings"][0]["stage"], "solve")
+
+    def test_errors_come_back(self):
+        self.assertEqual(self.client.run("boom")["error"], "bad query")
+
+    def test_dead_worker_is_replaced(self):
+        payload = self.client.run("crash")
+        self.assertEqual(payload["error"], "scheduler worker died")
+        self.assertEqual(self.client.run("after")["result"]["query"], "AFTER")
+        status = self.client.status()
+        self.assertEqual((len(status["workers"]), status["restarts"]), (2, 1))
+
+    def test_worker_killed_while_idle(self):
+        # its slot may still be handed a query before the death is noticed;
+        # that query fails instead of hanging
+        import signal
+        os.kill(self.pool.status()["workers"][0], signal.SIGKILL)
+        payloads = [self.client.run(f"q{i}") for i in range(2)]
+        for payload in payloads:
+            self.assertTrue(payload["error"] == "scheduler worker died" or payload["result"] is not None)
+        self.assertEqual(self.client.run("after")["result"]["query"], "AFTER")
+
+    def test_serve_requires_an_authkey(self):
+        with self.assertRaises(worker_pool.PoolError):
+            worker_pool.WorkerPool(workers=1).serve(os.path.join(self.tmp_dir, "open.sock"), b"")
+
+    def test_wrong_authkey_is_refused(self):
+        client = worker_pool.PoolClient(self.address, b"wrong", timeout=2)
+        with self.assertRaises(Exception):
+            client.run("q")
+
+
+class TestParseAddress(unittest.TestCase):
+    def test_forms(self):
+        self.assertEqual(worker_pool.parse_address("127.0.0.1:6010"), ("127.0.0.1", 6010))
+        self.assertEqual(worker_pool.parse_address("/tmp/pool.sock"), "/tmp/pool.sock")
+
+
+if __name__ == '__main__':
+    unittest.main()
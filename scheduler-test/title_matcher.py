@@ -0,0 +1,134 @@
+# === title_matcher.py ===
+# Finds the catalog titles mentioned in a query.
+#
+# An Aho–Corasick automaton over every (casefolded) title finds all of them
+# in one pass over the input, however big the catalog is, instead of one
+# substring search per catalog entry. Overlapping hits resolve to the
+# longest, leftmost ones: "Data Structures 17" doesn't also match
+# "Data Structures 1", and "Analysis of Algorithms" doesn't also match
+# "Algorithms".
+#
+# Building the automaton is the expensive part, so for_catalog() keeps one
+# per catalog (keyed by preference_cache.catalog_fingerprint).
+
+import threading
+from collections import OrderedDict, deque
+
+import preference_cache
+
+MAX_CATALOGS = 4
+
+
+def normalize(text):
+    return text.casefold()
+
+
+class TitleMatcher:
+    def __init__(self, titles):
+        # node i: children[i] (char -> node), fail[i], the title that ends
+        # exactly there (or -1), and the next node down its fail chain where
+        # some (shorter) title ends (or 0)
+        self.children = [{}]
+        self.fail = [0]
+        self.match = [-1]
+        self.output = [0]
+        self.titles = []  # original spelling, first one seen wins
+        self.lengths = []
+
+        seen = set()
+        for title in titles:
+            key = normalize(title or "")
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            self._insert(key, len(self.titles))
+            self.titles.append(title)
+            self.lengths.append(len(key))
+        self._link()
+
+    def __len__(self):
+        return len(self.titles)
+
+    def _insert(self, key, index):
+        node = 0
+        for char in key:
+            nxt = self.children[node].get(char)
+            if nxt is None:
+                nxt = len(self.children)
+                self.children[node][char] = nxt
+                self.children.append({})
+                self.fail.append(0)
+                self.match.append(-1)
+                self.output.append(0)
+            node = nxt
+        self.match[node] = index
+
+    def _link(self):
+        # breadth-first, so every fail target is finished before it is used
+        children, fail, match, output = self.children, self.fail, self.match, self.output
+        queue = deque(children[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in children[node].items():
+                queue.append(child)
+                if node:
+                    state = fail[node]
+                    while state and char not in children[state]:
+                        state = fail[state]
+                    fail[child] = children[state].get(char, 0)
+                target = fail[child]
+                output[child] = target if match[target] != -1 else output[target]
+
+    def spans(self, text):
+        """(start, end, title index) of the longest non-overlapping matches, in order."""
+        children, fail, match, output, lengths = self.children, self.fail, self.match, self.output, self.lengths
+        hits = []
+        node = 0
+        for end, char in enumerate(normalize(text), 1):
+            while node and char not in children[node]:
+                node = fail[node]
+            node = children[node].get(char, 0)
+            hit = node if match[node] != -1 else output[node]
+            while hit:
+                index = match[hit]
+                hits.append((end - lengths[index], end, index))
+                hit = output[hit]
+
+        # leftmost first, longest first among those starting together
+        hits.sort(key=lambda hit: (hit[0], hit[0] - hit[1]))
+        chosen, covered = [], 0
+        for start, end, index in hits:
+            if start >= covered:
+                chosen.append((start, end, index))
+                covered = end
+        return chosen
+
+    def find(self, text):
+        """The titles mentioned in text, each once, in order of appearance."""
+        found = []
+        for _, _, index in self.spans(text):
+            if self.titles[index] not in found:
+                found.append(self.titles[index])
+        return found
+
+
+_matchers = OrderedDict()
+_lock = threading.Lock()
+
+
+def for_catalog(courses_data, catalog_key=None):
+    """The matcher for this catalog's titles, built on first use."""
+    if catalog_key is None:
+        catalog_key = preference_cache.catalog_fingerprint(courses_data)
+    with _lock:
+        matcher = _matchers.get(catalog_key)
+        if matcher is not None:
+            _matchers.move_to_end(catalog_key)
+            return matcher
+    # built outside the lock; two threads racing on a new catalog both build it
+    matcher = TitleMatcher(entry.get("title", "") for entry in courses_data)
+    with _lock:
+        _matchers[catalog_key] = matcher
+        while len(_matchers) > MAX_CATALOGS:
+            _matchers.popitem(last=False)
+    return matcher
@@ -0,0 +1,149 @@
+# === tracing.py ===
+# Where the time goes in a scheduling request.
+#
+# span("regex_parse") times a block. Every span feeds the process-wide
+# `stages` histograms, and, inside trace(), is also recorded on that
+# trace so one request's (or job's) stage timings can be returned with it
+# or sent as a Server-Timing header. Traces follow contextvars, so each
+# request thread and each job thread only sees its own.
+#
+# No dependencies: the backend imports this for its endpoint metrics too.
+
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+
+# histogram bucket upper bounds, milliseconds
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_current = contextvars.ContextVar("trace", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0  # seconds
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds * 1000)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def snapshot(self):
+        # cumulative, like Prometheus buckets
+        cumulative, total = {}, 0
+        for bound, count in zip([*self.buckets, "+Inf"], self.counts):
+            total += count
+            cumulative[str(bound)] = total
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum * 1000, 3),
+            "mean_ms": round(self.sum * 1000 / self.count, 3) if self.count else 0.0,
+            "buckets_ms": cumulative,
+        }
+
+
+class Registry:
+    """Named latency histograms and counters, safe to share between threads."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "histograms": {name: h.snapshot() for name, h in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+# pipeline stages, fed by span()
+stages = Registry()
+
+
+class Trace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []  # (name, start offset, seconds)
+
+    def add(self, name, start, seconds):
+        self.spans.append((name, start - self.started, seconds))
+
+    def totals(self):
+        """Seconds per stage name, repeated spans (one per filter, ...) summed."""
+        totals = {}
+        for name, _, seconds in self.spans:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    def as_list(self):
+        return [{"stage": name, "start_ms": round(start * 1000, 3), "ms": round(seconds * 1000, 3)}
+                for name, start, seconds in self.spans]
+
+    def server_timing(self):
+        """Server-Timing header entries, one per stage name."""
+        return [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.totals().items()]
+
+
+@contextlib.contextmanager
+def trace():
+    """Collect the spans run inside the block (in this context) on a new Trace."""
+    current = Trace()
+    token = _current.set(current)
+    try:
+        yield current
+    finally:
+        _current.reset(token)
+
+
+def current_trace():
+    return _current.get()
+
+
+def record(name, start, seconds, registry=stages):
+    """A span timed by the caller (start is a perf_counter() value)."""
+    registry.observe(name, seconds)
+    current = _current.get()
+    if current is not None:
+        current.add(name, start, seconds)
+
+
+@contextlib.contextmanager
+def span(name, registry=stages):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, start, time.perf_counter() - start, registry)
+
+
+def absorb(spans, started):
+    """Record spans timed elsewhere (another process's Trace.as_list()).
+
+    `started` is the perf_counter() value their offsets count from here,
+    e.g. when the work was sent off.
+    """
+    for entry in spans:
+        record(entry["stage"], started + entry["start_ms"] / 1000, entry["ms"] / 1000)
@@ -0,0 +1,346 @@
+# === worker_pool.py ===
+# Preforked scheduler workers sharing one loaded model.
+#
+# The parent process imports the pipeline and loads TinyLlama once, runs
+# gc.freeze() (so the garbage collector never writes to, and un-shares, the
+# inherited pages), and forks `workers` children that share the weights
+# copy-on-write. Clients (the web tier's JobManager threads) connect over a
+# multiprocessing.connection socket and send queries; the parent hands
+# them to whichever worker is free, over that worker's own pipe, and routes
+# each result back.
+#
+# A worker that dies is replaced by a fresh fork from the parent (which
+# still holds the model), and whatever it was running fails with an error
+# instead of hanging its client. The parent records which worker a query
+# went to before sending it, so there is no window where a query is owned
+# by nobody.
+#
+# Clients send pickles, so the socket always needs an authkey:
+#
+#   SCHEDULER_POOL_AUTHKEY=... python worker_pool.py --workers 4 --address 127.0.0.1:6010
+#
+# (inside Django use `manage.py run_scheduler_pool`, which also gives the
+# workers database access for the in-process catalog)
+
+import argparse
+import gc
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import uuid
+from multiprocessing.connection import Client, Listener
+
+import tracing
+
+DEFAULT_ADDRESS = "127.0.0.1:6010"
+
+
+class PoolError(Exception):
+    pass
+
+
+def parse_address(address):
+    """"host:port" -> (host, port); anything else is a Unix socket path."""
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit() and "/" not in address:
+        return host, int(port)
+    return address
+
+
+def run_query(query, debug_dir=None):
+    import subset
+    return subset.run(query, debug_dir=debug_dir)
+
+
+def preload(load_model=True):
+    """Import the pipeline and load the model, so the workers inherit them."""
+    import inference
+    import subset  # noqa: F401
+
+    if load_model and inference.LLM_BACKEND != "stub":
+        import model_manager
+        print("📚 Loading TinyLlama in the pool parent...")
+        model_manager.manager.get()
+
+
+def _worker_main(tasks, results, runner):
+    # the parent handles Ctrl-C and shuts the workers down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    pid = os.getpid()
+    while True:
+        try:
+            item = tasks.recv()
+        except EOFError:
+            return
+        if item is None:
+            return
+        request_id, query, options = item
+        with tracing.trace() as trace:
+            try:
+                payload = {"result": runner(query, **options), "error": None}
+            except Exception as e:
+                payload = {"result": None, "error": str(e) or type(e).__name__}
+        payload.update(timings=trace.as_list(), worker=pid)
+        results.put(("done", request_id, payload))
+
+
+class WorkerPool:
+    def __init__(self, workers=2, runner=run_query, before_fork=None):
+        self.size = workers
+        self.runner = runner
+        # e.g. closing database connections the children mustn't share
+        self.before_fork = before_fork
+
+        self._context = multiprocessing.get_context("fork")
+        self._tasks = queue.Queue()  # (request id, query, options) not yet handed out
+        self._idle = queue.Queue()  # (slot, process) free to take a query
+        self._results = self._context.SimpleQueue()
+        self._workers = []  # by slot; None while a dead one is being replaced
+        self._pipes = []  # by slot, the parent's end of the worker's task pipe
+        self._pending = {}  # request id -> (connection, send lock)
+        self._running = {}  # request id -> worker pid
+        self._lock = threading.Lock()
+        self._listener = None
+        self._stopping = threading.Event()
+        self.completed = 0
+        self.restarts = 0
+
+    # --- workers ---
+
+    def _fork(self):
+        if self.before_fork:
+            self.before_fork()
+        reader, writer = self._context.Pipe(duplex=False)
+        process = self._context.Process(target=_worker_main, args=(reader, self._results, self.runner),
+                                        name="scheduler-worker", daemon=True)
+        process.start()
+        reader.close()
+        return process, writer
+
+    def _add_worker(self, slot):
+        process, writer = self._fork()
+        with self._lock:
+            self._workers[slot] = process
+            self._pipes[slot] = writer
+        self._idle.put((slot, process))
+
+    def start(self):
+        """Fork the workers. Call once everything they should share is loaded."""
+        gc.collect()
+        gc.freeze()
+        # forked before any thread of ours exists; replacements later fork
+        # from a parent whose threads only ever block on sockets and queues
+        self._workers = [None] * self.size
+        self._pipes = [None] * self.size
+        for slot in range(self.size):
+            self._add_worker(slot)
+        threading.Thread(target=self._dispatch, name="pool-dispatch", daemon=True).start()
+        threading.Thread(target=self._route_results, name="pool-results", daemon=True).start()
+        threading.Thread(target=self._watch_workers, name="pool-watch", daemon=True).start()
+
+    def _dispatch(self):
+        while True:
+            item = self._tasks.get()
+            if item is None:
+                return
+            while True:
+                idle = self._idle.get()
+                if idle is None:
+                    return
+                slot, process = idle
+                with self._lock:
+                    if self._workers[slot] is not process:
+                        continue  # died while idle, its replacement queues itself
+                    # owned before it is sent: if the worker dies from here
+                    # on, _watch_workers finds the query and fails it
+                    self._running[item[0]] = process.pid
+                    writer = self._pipes[slot]
+                try:
+                    writer.send(item)
+                except OSError:
+                    pass  # dead already; _watch_workers fails it
+                break
+
+    def _watch_workers(self):
+        while not self._stopping.wait(0.5):
+            for slot, process in enumerate(self._workers):
+                if process is None or process.is_alive() or self._stopping.is_set():
+                    continue
+                print(f"⚠️ Scheduler worker {process.pid} exited ({process.exitcode}), forking a new one")
+                with self._lock:
+                    self._workers[slot] = None
+                    self._pipes[slot].close()
+                    lost = [rid for rid, pid in self._running.items() if pid == process.pid]
+                for request_id in lost:
+                    self._reply(request_id, {"result": None, "error": "scheduler worker died", "timings": [],
+                                             "worker": process.pid})
+                self._add_worker(slot)
+                self.restarts += 1
+
+    def _route_results(self):
+        while True:
+            try:
+                kind, request_id, data = self._results.get()
+            except (EOFError, OSError):
+                return
+            self._reply(request_id, data)
+            with self._lock:
+                idle = [(slot, process) for slot, process in enumerate(self._workers)
+                        if process is not None and process.pid == data["worker"]]
+            for item in idle:
+                self._idle.put(item)
+
+    def _reply(self, request_id, payload):
+        with self._lock:
+            target = self._pending.pop(request_id, None)
+            self._running.pop(request_id, None)
+            self.completed += 1
+        if target is None:
+            return
+        connection, send_lock = target
+        try:
+            with send_lock:
+                connection.send(("result", request_id, payload))
+        except (OSError, EOFError):
+            pass  # the client went away
+
+    # --- clients ---
+
+    def status(self):
+        with self._lock:
+            return {
+                "workers": [process.pid for process in self._workers if process is not None and process.is_alive()],
+                "size": self.size,
+                "queued": len(self._pending) - len(self._running),
+                "running": len(self._running),
+                "completed": self.completed,
+                "restarts": self.restarts,
+            }
+
+    def _serve_connection(self, connection):
+        send_lock = threading.Lock()
+        try:
+            while True:
+                message = connection.recv()
+                if message[0] == "run":
+                    _, request_id, query, options = message
+                    with self._lock:
+                        self._pending[request_id] = (connection, send_lock)
+                    self._tasks.put((request_id, query, options))
+                elif message[0] == "status":
+                    with send_lock:
+                        connection.send(("status", message[1], self.status()))
+        except (EOFError, OSError):
+            pass
+        finally:
+            connection.close()
+
+    def serve(self, address=DEFAULT_ADDRESS, authkey=b""):
+        """Accept clients until shutdown() (blocks). authkey is required."""
+        if not authkey:
+            # connections carry pickles; without a key anyone who can reach
+            # the socket can run code in the pool
+            raise PoolError("refusing to serve the scheduler pool without an authkey")
+        self._listener = Listener(parse_address(address), authkey=authkey)
+        print(f"🧵 Scheduler pool: {self.size} workers on {address}")
+        while not self._stopping.is_set():
+            try:
+                connection = self._listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                continue
+            if self._stopping.is_set():
+                connection.close()
+                break
+            threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+        self._listener.close()
+
+    def shutdown(self, address=None, authkey=b""):
+        self._stopping.set()
+        self._tasks.put(None)
+        self._idle.put(None)
+        with self._lock:
+            workers = [(process, writer) for process, writer in zip(self._workers, self._pipes) if process is not None]
+        for _, writer in workers:
+            try:
+                writer.send(None)
+            except OSError:
+                pass
+        for process, writer in workers:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+            writer.close()
+        if self._listener is not None and address is not None:
+            # wake the accept() in serve()
+            try:
+                Client(parse_address(address), authkey=authkey or None).close()
+            except OSError:
+                pass
+
+
+class PoolClient:
+    """The web tier's side: run a query on the pool and wait for the result.
+
+    Thread-safe; keeps a few idle connections around for reuse.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=b"", timeout=120):
+        self.address = parse_address(address)
+        self.authkey = authkey or None
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+
+    def _call(self, message, timeout):
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                connection = Client(self.address, authkey=self.authkey)
+            except OSError as e:
+                raise PoolError(f"scheduler pool unreachable at {self.address}: {e}") from None
+        try:
+            connection.send(message)
+            if not connection.poll(timeout):
+                raise PoolError(f"no answer from the scheduler pool in {timeout}s")
+            kind, request_id, payload = connection.recv()
+        except BaseException:
+            # a late answer would confuse the next caller, so don't reuse it
+            connection.close()
+            raise
+        self._idle.put(connection)
+        return payload
+
+    def run(self, query, timeout=None, **options):
+        """{"result", "error", "timings", "worker"} for one query."""
+        return self._call(("run", uuid.uuid4().hex, query, options), timeout or self.timeout)
+
+    def status(self, timeout=5):
+        return self._call(("status", uuid.uuid4().hex), timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preforked scheduler worker pool")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--address", default=os.getenv("SCHEDULER_POOL_ADDRESS", DEFAULT_ADDRESS))
+    parser.add_argument("--no-preload", action="store_true", help="let each worker load the model itself")
+    args = parser.parse_args()
+
+    authkey = os.getenv("SCHEDULER_POOL_AUTHKEY", "").encode()
+    if not authkey:
+        parser.error("set SCHEDULER_POOL_AUTHKEY to the key clients connect with")
+
+    preload(load_model=not args.no_preload)
+    pool = WorkerPool(args.workers)
+    pool.start()
+    try:
+        pool.serve(args.address, authkey)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()